@@ -0,0 +1,461 @@
+"""Admission control for model calls, shared by every process on the host.
+
+Each model call waits for a slot before it is sent. There are
+OMNISIGHT_LLM_CONCURRENCY slots in all, shared through admission.sqlite3
+next to the job queue. Calls also draw on their tenant's (and user's)
+token budget for the current minute. Calls have a priority class:
+
+    interactive   UI sessions: the candidate test and the recruiter pages
+    upload        queued API jobs
+    bulk          reevaluate.py
+
+Waiting calls are admitted highest class first, then in arrival order.
+Upload and bulk calls may not take the last OMNISIGHT_LLM_INTERACTIVE_RESERVE
+slots or the last part of a budget (BUDGET_SHARE), so interactive calls
+still get through while bulk work is running. A call that cannot be
+admitted within its class's deadline is shed with Overloaded rather than
+queueing behind the provider's rate limit.
+"""
+import argparse
+import contextlib
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app_logging import get_logger
+from instrumentation import current_span
+from tenancy import current_tenant, data_path
+
+# Relative to OMNISIGHT_DATA_DIR; one database serves every tenant and process
+ADMISSION_DB_PATH = os.environ.get("OMNISIGHT_ADMISSION_DB", "admission.sqlite3")
+LLM_CONCURRENCY = int(os.environ.get("OMNISIGHT_LLM_CONCURRENCY", 16))
+# Slots only interactive calls may take
+INTERACTIVE_RESERVE = int(os.environ.get("OMNISIGHT_LLM_INTERACTIVE_RESERVE", 4))
+# Bulk calls are only admitted while fewer than this many calls of any class
+# are in flight (see slot_limit)
+BULK_SLOTS = int(os.environ.get("OMNISIGHT_LLM_BULK_SLOTS", 4))
+# Tokens per minute; 0 means no budget. OMNISIGHT_TENANT_TOKEN_BUDGETS overrides
+# the tenant budget per tenant, e.g. "acme=400000,beta=100000"
+TENANT_TOKENS_PER_MINUTE = int(os.environ.get("OMNISIGHT_TENANT_TOKENS_PER_MINUTE", 0))
+USER_TOKENS_PER_MINUTE = int(os.environ.get("OMNISIGHT_USER_TOKENS_PER_MINUTE", 0))
+TENANT_TOKEN_BUDGETS = {
+    tenant.strip(): int(budget)
+    for tenant, _, budget in (
+        item.partition("=") for item in os.environ.get("OMNISIGHT_TENANT_TOKEN_BUDGETS", "").split(",") if item.strip()
+    )
+}
+# Header a reverse proxy sets to identify the recruiter (UI and API)
+USER_HEADER = "X-Omnisight-User"
+
+# Priority classes, highest first
+INTERACTIVE = "interactive"
+UPLOAD = "upload"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, UPLOAD, BULK)
+
+# Longest a call waits for admission before it is shed
+MAX_WAIT_SECONDS = {
+    INTERACTIVE: float(os.environ.get("OMNISIGHT_ADMISSION_WAIT_INTERACTIVE", 20)),
+    UPLOAD: float(os.environ.get("OMNISIGHT_ADMISSION_WAIT_UPLOAD", 300)),
+    BULK: float(os.environ.get("OMNISIGHT_ADMISSION_WAIT_BULK", 1800)),
+}
+# Fraction of a token budget each class may use, so uploads and re-scoring
+# cannot spend what interactive sessions need
+BUDGET_SHARE = {INTERACTIVE: 1.0, UPLOAD: 0.8, BULK: 0.5}
+POLL_SECONDS = {INTERACTIVE: 0.05, UPLOAD: 0.1, BULK: 0.25}
+WINDOW_SECONDS = 60
+# A slot held longer than this (e.g. by a process that died) is taken back
+SLOT_LEASE_SECONDS = 300
+# Waiters that stop polling (e.g. their process died) no longer hold up others
+WAITER_STALE_SECONDS = 10
+
+logger = get_logger("admission")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS waiting (
+    ticket TEXT PRIMARY KEY,
+    rank INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS waiting_order_idx ON waiting (rank, enqueued_at);
+CREATE TABLE IF NOT EXISTS inflight (
+    ticket TEXT PRIMARY KEY,
+    priority TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    lease_expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage (
+    tenant TEXT NOT NULL,
+    user TEXT NOT NULL,
+    window INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    PRIMARY KEY (tenant, user, window, priority)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    priority TEXT PRIMARY KEY,
+    admitted INTEGER NOT NULL DEFAULT 0,
+    shed INTEGER NOT NULL DEFAULT 0,
+    wait_seconds REAL NOT NULL DEFAULT 0
+);
+"""
+
+_priority = contextvars.ContextVar("omnisight_priority", default=UPLOAD)
+_user = contextvars.ContextVar("omnisight_user", default=None)
+# Set when a call in this context was shed, so a queued job can go back to
+# the queue without using up an attempt
+_shed = contextvars.ContextVar("omnisight_shed", default=False)
+
+_local = threading.local()
+# Wakes waiters in this process as soon as a slot is released
+_released = threading.Condition()
+
+
+class Overloaded(Exception):
+    """A model call was shed because it could not be admitted before its deadline."""
+
+    def __init__(self, message):
+        super().__init__(f"Overloaded: {message}")
+
+
+def _connect():
+    """Return this thread's connection to the admission database."""
+    path = data_path(ADMISSION_DB_PATH)
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+        _local.path = path
+    return conn
+
+
+@contextlib.contextmanager
+def _transaction(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def current_priority():
+    return _priority.get()
+
+
+def set_priority(priority):
+    """Make priority the class of every model call for the rest of the current context."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {priority!r}")
+    return _priority.set(priority)
+
+
+@contextlib.contextmanager
+def use_priority(priority):
+    """Run a block with its model calls in the given priority class."""
+    token = set_priority(priority)
+    try:
+        yield priority
+    finally:
+        _priority.reset(token)
+
+
+def current_user():
+    return _user.get()
+
+
+def set_user(user):
+    """Charge model calls for the rest of the current context to user's budget (None: no user budget)."""
+    return _user.set(str(user)[:128] if user else None)
+
+
+@contextlib.contextmanager
+def use_user(user):
+    token = set_user(user)
+    try:
+        yield user
+    finally:
+        _user.reset(token)
+
+
+def was_shed():
+    """Whether a model call in the current context has been shed since clear_shed()."""
+    return _shed.get()
+
+
+def clear_shed():
+    _shed.set(False)
+
+
+def slot_limit(priority):
+    """How many calls may be in flight, across all classes, for a call of this class to be admitted."""
+    shared = max(1, LLM_CONCURRENCY - INTERACTIVE_RESERVE)
+    return {INTERACTIVE: LLM_CONCURRENCY, UPLOAD: shared, BULK: min(BULK_SLOTS, shared)}[priority]
+
+
+def tenant_budget(tenant):
+    return TENANT_TOKEN_BUDGETS.get(tenant, TENANT_TOKENS_PER_MINUTE)
+
+
+class Ticket:
+    """One admitted model call: its slot and the tokens charged for it."""
+
+    def __init__(self, priority, tenant, user, estimated_tokens):
+        self.id = uuid.uuid4().hex
+        self.priority = priority
+        self.tenant = tenant
+        self.user = user or ""
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens = None
+        self.window = None
+        self.waited = 0.0
+
+    def record_usage(self, completion):
+        """Charge the call's actual token usage instead of the estimate once it is known."""
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            self.used_tokens = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+
+
+def _window_usage(conn, window, tenant, user=None):
+    query = "SELECT COALESCE(SUM(tokens), 0) FROM usage WHERE window = ? AND tenant = ?"
+    params = [window, tenant]
+    if user is not None:
+        query += " AND user = ?"
+        params.append(user)
+    return conn.execute(query, params).fetchone()[0]
+
+
+def _charge(conn, ticket, tokens):
+    conn.execute(
+        """INSERT INTO usage (tenant, user, window, priority, tokens) VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT (tenant, user, window, priority) DO UPDATE SET tokens = tokens + excluded.tokens""",
+        (ticket.tenant, ticket.user, ticket.window, ticket.priority, tokens),
+    )
+
+
+def _reserve_tokens(conn, ticket, now):
+    """Charge the ticket's estimate to this minute's budgets; False if that would exceed them."""
+    window = int(now // WINDOW_SECONDS)
+    share = BUDGET_SHARE[ticket.priority]
+    with _transaction(conn):
+        budget = tenant_budget(ticket.tenant)
+        if budget and _window_usage(conn, window, ticket.tenant) + ticket.estimated_tokens > budget * share:
+            return False
+        if ticket.user and USER_TOKENS_PER_MINUTE and (
+                _window_usage(conn, window, ticket.tenant, ticket.user) + ticket.estimated_tokens
+                > USER_TOKENS_PER_MINUTE * share):
+            return False
+        ticket.window = window
+        _charge(conn, ticket, ticket.estimated_tokens)
+        # Old windows are only kept for status()
+        conn.execute("DELETE FROM usage WHERE window < ?", (window - 60,))
+    return True
+
+
+def _slot_looks_free(conn, ticket, now):
+    """Read-only version of _try_take_slot's check, so waiting does not take the write lock."""
+    rank = PRIORITIES.index(ticket.priority)
+    ahead = conn.execute(
+        """SELECT COUNT(*) FROM waiting WHERE seen_at >= ? AND (rank < ? OR (rank = ? AND enqueued_at <
+           (SELECT enqueued_at FROM waiting WHERE ticket = ?)))""",
+        (now - WAITER_STALE_SECONDS, rank, rank, ticket.id),
+    ).fetchone()[0]
+    if ahead:
+        return False
+    inflight = conn.execute("SELECT COUNT(*) FROM inflight WHERE lease_expires >= ?", (now,)).fetchone()[0]
+    return inflight < slot_limit(ticket.priority)
+
+
+def _try_take_slot(conn, ticket, now):
+    """Take a slot if one is free for the ticket's class and no earlier or higher-class call is waiting."""
+    rank = PRIORITIES.index(ticket.priority)
+    with _transaction(conn):
+        conn.execute("DELETE FROM inflight WHERE lease_expires < ?", (now,))
+        conn.execute("DELETE FROM waiting WHERE seen_at < ?", (now - WAITER_STALE_SECONDS,))
+        conn.execute("UPDATE waiting SET seen_at = ? WHERE ticket = ?", (now, ticket.id))
+        ahead = conn.execute(
+            "SELECT COUNT(*) FROM waiting WHERE rank < ? OR (rank = ? AND enqueued_at < (SELECT enqueued_at FROM waiting WHERE ticket = ?))",
+            (rank, rank, ticket.id),
+        ).fetchone()[0]
+        if ahead or conn.execute("SELECT COUNT(*) FROM inflight").fetchone()[0] >= slot_limit(ticket.priority):
+            return False
+        conn.execute("DELETE FROM waiting WHERE ticket = ?", (ticket.id,))
+        conn.execute(
+            "INSERT INTO inflight (ticket, priority, tenant, started_at, lease_expires) VALUES (?, ?, ?, ?, ?)",
+            (ticket.id, ticket.priority, ticket.tenant, now, now + SLOT_LEASE_SECONDS),
+        )
+        conn.execute(
+            """INSERT INTO counters (priority, admitted, wait_seconds) VALUES (?, 1, ?)
+               ON CONFLICT (priority) DO UPDATE SET admitted = admitted + 1, wait_seconds = wait_seconds + excluded.wait_seconds""",
+            (ticket.priority, ticket.waited),
+        )
+    return True
+
+
+def _shed_call(conn, ticket, reason):
+    with _transaction(conn):
+        conn.execute("DELETE FROM waiting WHERE ticket = ?", (ticket.id,))
+        if ticket.window is not None:
+            _charge(conn, ticket, -ticket.estimated_tokens)
+        conn.execute(
+            "INSERT INTO counters (priority, shed) VALUES (?, 1) ON CONFLICT (priority) DO UPDATE SET shed = shed + 1",
+            (ticket.priority,),
+        )
+    _shed.set(True)
+    logger.warning("Model call shed", extra={
+        "priority": ticket.priority, "tenant": ticket.tenant, "reason": reason, "waited_s": round(ticket.waited, 3)})
+    raise Overloaded(f"{reason}; try again shortly")
+
+
+def acquire(estimated_tokens):
+    """Wait until a model call of the current class, tenant and user may be sent.
+
+    Returns a Ticket to pass to release(). Raises Overloaded when the call
+    cannot be admitted within MAX_WAIT_SECONDS for its class.
+    """
+    ticket = Ticket(current_priority(), current_tenant(), current_user(), estimated_tokens)
+    conn = _connect()
+    started = time.monotonic()
+    deadline = started + MAX_WAIT_SECONDS[ticket.priority]
+
+    while not _reserve_tokens(conn, ticket, time.time()):
+        ticket.waited = time.monotonic() - started
+        # Budgets refill at the next window; shed now if that is past the deadline
+        refill = WINDOW_SECONDS - time.time() % WINDOW_SECONDS
+        budget = tenant_budget(ticket.tenant)
+        if budget and estimated_tokens > budget * BUDGET_SHARE[ticket.priority]:
+            _shed_call(conn, ticket, f"call needs {estimated_tokens} tokens, more than the tenant's budget")
+        if time.monotonic() + refill > deadline:
+            _shed_call(conn, ticket, "token budget exhausted")
+        time.sleep(refill)
+
+    now = time.time()
+    conn.execute(
+        "INSERT INTO waiting (ticket, rank, priority, tenant, enqueued_at, seen_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (ticket.id, PRIORITIES.index(ticket.priority), ticket.priority, ticket.tenant, now, now),
+    )
+    seen = now
+    try:
+        while True:
+            ticket.waited = time.monotonic() - started
+            now = time.time()
+            if _slot_looks_free(conn, ticket, now):
+                if _try_take_slot(conn, ticket, now):
+                    break
+                seen = now
+            elif now - seen >= WAITER_STALE_SECONDS / 4:
+                # Keep the waiter from being dropped as stale
+                conn.execute("UPDATE waiting SET seen_at = ? WHERE ticket = ?", (now, ticket.id))
+                seen = now
+            if time.monotonic() >= deadline:
+                _shed_call(conn, ticket, f"no model call slot free within {MAX_WAIT_SECONDS[ticket.priority]:g}s")
+            with _released:
+                _released.wait(POLL_SECONDS[ticket.priority])
+    except BaseException:
+        with _transaction(conn):
+            conn.execute("DELETE FROM waiting WHERE ticket = ?", (ticket.id,))
+        raise
+
+    span = current_span()
+    if span is not None:
+        span.set("priority", ticket.priority)
+        span.set("admission_wait_s", round(ticket.waited, 3))
+    return ticket
+
+
+def release(ticket):
+    """Free the ticket's slot and settle its budget charge with the actual usage."""
+    conn = _connect()
+    with _transaction(conn):
+        conn.execute("DELETE FROM inflight WHERE ticket = ?", (ticket.id,))
+        if ticket.used_tokens is not None:
+            _charge(conn, ticket, ticket.used_tokens - ticket.estimated_tokens)
+    with _released:
+        _released.notify_all()
+
+
+@contextlib.contextmanager
+def admit(estimated_tokens):
+    """Hold an admission slot for the duration of one model call; see acquire."""
+    ticket = acquire(estimated_tokens)
+    try:
+        yield ticket
+    finally:
+        release(ticket)
+
+
+def status():
+    """Queue depth, slots in flight, admission counters and this minute's token use."""
+    conn = _connect()
+    now = time.time()
+    window = int(now // WINDOW_SECONDS)
+    classes = {
+        priority: {"waiting": 0, "oldest_wait_s": 0.0, "inflight": 0, "slot_limit": slot_limit(priority),
+                   "admitted": 0, "shed": 0, "mean_wait_s": None}
+        for priority in PRIORITIES
+    }
+    for row in conn.execute(
+            "SELECT priority, COUNT(*) AS n, MIN(enqueued_at) AS oldest FROM waiting WHERE seen_at >= ? GROUP BY priority",
+            (now - WAITER_STALE_SECONDS,)):
+        classes[row["priority"]].update(waiting=row["n"], oldest_wait_s=round(now - row["oldest"], 3))
+    for row in conn.execute(
+            "SELECT priority, COUNT(*) AS n FROM inflight WHERE lease_expires >= ? GROUP BY priority", (now,)):
+        classes[row["priority"]]["inflight"] = row["n"]
+    for row in conn.execute("SELECT * FROM counters"):
+        classes[row["priority"]].update(
+            admitted=row["admitted"], shed=row["shed"],
+            mean_wait_s=round(row["wait_seconds"] / row["admitted"], 3) if row["admitted"] else None)
+    tokens = {
+        row["tenant"]: {"tokens": row["tokens"], "budget": tenant_budget(row["tenant"]) or None}
+        for row in conn.execute(
+            "SELECT tenant, SUM(tokens) AS tokens FROM usage WHERE window = ? GROUP BY tenant", (window,))
+    }
+    return {"concurrency": LLM_CONCURRENCY, "classes": classes, "tokens_this_minute": tokens}
+
+
+def to_prometheus():
+    """Render admission queue metrics in the Prometheus text exposition format."""
+    classes = status()["classes"]
+    metrics = [
+        ("omnisight_admission_waiting", "gauge", "waiting", "Model calls waiting for admission."),
+        ("omnisight_admission_oldest_wait_seconds", "gauge", "oldest_wait_s", "Age of the oldest waiting model call."),
+        ("omnisight_admission_inflight", "gauge", "inflight", "Model calls holding a slot."),
+        ("omnisight_admission_admitted_total", "counter", "admitted", "Model calls admitted."),
+        ("omnisight_admission_shed_total", "counter", "shed", "Model calls shed under load."),
+    ]
+    lines = []
+    for name, kind, key, help_text in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for priority, values in classes.items():
+            lines.append(f'{name}{{priority="{priority}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model call admission status")
+    parser.add_argument("--prometheus", action="store_true", help="Print Prometheus metrics instead of JSON")
+    args = parser.parse_args()
+    if args.prometheus:
+        print(to_prometheus(), end="")
+    else:
+        print(json.dumps(status(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
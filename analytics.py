@@ -0,0 +1,439 @@
+"""Incrementally maintained cohort rollups for the analytics page.
+
+Every call to store.save_candidate_to_file updates per-day sums and score
+histograms in a small SQLite database, replacing the candidate's previous
+contribution when a record is re-saved. Dashboards read these rollups instead
+of rescanning every candidate file. The schools and employers on each resume
+(see entities.py) and its timeline flags (see timeline.py) are indexed the
+same way for the browser's filters.
+
+    python analytics.py rebuild     # backfill from the candidate store
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from entities import resume_entities
+from scoring import GRADER_CATEGORIES, PRIMARY_CATEGORIES, extract_scores
+from tenancy import set_tenant, tenant_path
+from timeline import timeline_flags
+
+ROLLUP_DB_PATH = os.environ.get("OMNISIGHT_ROLLUP_DB", "rollups.sqlite3")
+# Candidates whose resume score reaches this pass the screen
+PASS_SCORE = float(os.environ.get("OMNISIGHT_PASS_SCORE", 60))
+
+# Metric name -> (low, high, histogram bucket width)
+SCORE_METRICS = {
+    "resume_score": (20, 80, 5),
+    "reasoning_score": (20, 80, 5),
+    "overall_score": (20, 80, 5),
+    "skepticism_score": (1, 10, 1),
+}
+SCORE_METRICS.update({key: (1, 10, 1) for key in PRIMARY_CATEGORIES})
+SCORE_METRICS.update({key: (0, 10, 1) for key in GRADER_CATEGORIES})
+
+# Funnel stages, in order, counted per day
+FUNNEL_STAGES = ["submitted", "resume_evaluated", "assessment_completed", "overall_assessed", "passed"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contributions (
+    candidate_id TEXT PRIMARY KEY,
+    day TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    metrics TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    total_sq REAL NOT NULL,
+    PRIMARY KEY (day, reason, metric)
+);
+CREATE TABLE IF NOT EXISTS daily_histograms (
+    day TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    bucket REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, reason, metric, bucket)
+);
+CREATE TABLE IF NOT EXISTS entity_facets (
+    candidate_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    tier INTEGER,
+    PRIMARY KEY (candidate_id, kind, entity)
+);
+CREATE INDEX IF NOT EXISTS entity_facets_idx ON entity_facets (kind, entity);
+CREATE TABLE IF NOT EXISTS timeline_flags (
+    candidate_id TEXT NOT NULL,
+    flag TEXT NOT NULL,
+    PRIMARY KEY (candidate_id, flag)
+);
+CREATE INDEX IF NOT EXISTS timeline_flags_idx ON timeline_flags (flag);
+"""
+
+_local = threading.local()
+
+
+def _connect():
+    """Return this thread's connection to the current tenant's rollup database."""
+    path = tenant_path(ROLLUP_DB_PATH)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _migrate(conn)
+        conns[path] = conn
+    return conn
+
+
+def _migrate(conn):
+    """Replace the histograms of databases created before they were kept per day, from the contributions."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'histograms'").fetchone() is None:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated it first
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'histograms'").fetchone():
+            conn.execute("DELETE FROM daily_histograms")
+            for day, reason, metrics in conn.execute("SELECT day, reason, metrics FROM contributions").fetchall():
+                _apply_histograms(conn, day, reason, json.loads(metrics), 1)
+            conn.execute("DROP TABLE histograms")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _bucket(metric, value):
+    low, _, width = SCORE_METRICS[metric]
+    return low + ((value - low) // width) * width
+
+
+def candidate_metrics(candidate_data):
+    """Metric values one candidate contributes: scores plus 1.0 for each funnel stage reached."""
+    scores = extract_scores(candidate_data)
+    metrics = {metric: scores.get(metric) for metric in SCORE_METRICS if scores.get(metric) is not None}
+
+    stages = {
+        "submitted": bool(candidate_data.get("resume")),
+        "resume_evaluated": bool(candidate_data.get("resume_synthesis")),
+        "assessment_completed": bool(candidate_data.get("final_evaluation")),
+        "overall_assessed": bool(candidate_data.get("overall_assessment")),
+        "passed": (scores.get("resume_score") or 0) >= PASS_SCORE,
+    }
+    for stage, reached in stages.items():
+        if reached:
+            metrics[f"funnel:{stage}"] = 1.0
+    return metrics
+
+
+def _apply(conn, day, reason, metrics, sign):
+    for metric, value in metrics.items():
+        conn.execute(
+            """INSERT INTO daily_rollups (day, reason, metric, count, total, total_sq) VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (day, reason, metric) DO UPDATE SET
+               count = count + excluded.count, total = total + excluded.total, total_sq = total_sq + excluded.total_sq""",
+            (day, reason, metric, sign, sign * value, sign * value * value),
+        )
+    _apply_histograms(conn, day, reason, metrics, sign)
+
+
+def _apply_histograms(conn, day, reason, metrics, sign):
+    for metric, value in metrics.items():
+        if metric in SCORE_METRICS:
+            conn.execute(
+                """INSERT INTO daily_histograms (day, reason, metric, bucket, count) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (day, reason, metric, bucket) DO UPDATE SET count = count + excluded.count""",
+                (day, reason, metric, _bucket(metric, value), sign),
+            )
+
+
+def update_rollups(candidate_data):
+    """Replace a candidate's contribution to the rollups with its current values."""
+    candidate_id = candidate_data["candidate_id"]
+    submitted = datetime.fromisoformat(candidate_data["timestamp"]).date()
+    day = submitted.isoformat()
+    reason = candidate_data.get("reason") or ""
+    metrics = candidate_metrics(candidate_data)
+    facets = resume_entities(candidate_data.get("resume"))
+    # As of submission for resumes parsed before timelines were annotated
+    flags = timeline_flags(candidate_data.get("resume"), submitted)
+
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        old = conn.execute(
+            "SELECT day, reason, metrics FROM contributions WHERE candidate_id = ?", (candidate_id,)
+        ).fetchone()
+        if old is not None:
+            _apply(conn, old[0], old[1], json.loads(old[2]), -1)
+        _apply(conn, day, reason, metrics, 1)
+        conn.execute(
+            "INSERT OR REPLACE INTO contributions (candidate_id, day, reason, metrics) VALUES (?, ?, ?, ?)",
+            (candidate_id, day, reason, json.dumps(metrics)),
+        )
+        conn.execute("DELETE FROM entity_facets WHERE candidate_id = ?", (candidate_id,))
+        conn.executemany(
+            "INSERT INTO entity_facets (candidate_id, kind, entity, tier) VALUES (?, ?, ?, ?)",
+            [(candidate_id, kind, entity, tier) for (kind, entity), tier in facets.items()],
+        )
+        conn.execute("DELETE FROM timeline_flags WHERE candidate_id = ?", (candidate_id,))
+        conn.executemany("INSERT INTO timeline_flags (candidate_id, flag) VALUES (?, ?)",
+                         [(candidate_id, flag) for flag in flags])
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def remove_rollups(candidate_id):
+    """Drop a deleted candidate's contribution."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        old = conn.execute(
+            "SELECT day, reason, metrics FROM contributions WHERE candidate_id = ?", (candidate_id,)
+        ).fetchone()
+        if old is not None:
+            _apply(conn, old[0], old[1], json.loads(old[2]), -1)
+            conn.execute("DELETE FROM contributions WHERE candidate_id = ?", (candidate_id,))
+        conn.execute("DELETE FROM entity_facets WHERE candidate_id = ?", (candidate_id,))
+        conn.execute("DELETE FROM timeline_flags WHERE candidate_id = ?", (candidate_id,))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def rebuild_rollups():
+    """Recompute all rollups from the candidate store."""
+    from store import iter_candidates
+
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM contributions")
+    conn.execute("DELETE FROM daily_rollups")
+    conn.execute("DELETE FROM daily_histograms")
+    conn.execute("DELETE FROM entity_facets")
+    conn.execute("DELETE FROM timeline_flags")
+    conn.execute("COMMIT")
+    count = 0
+    for candidate_data in iter_candidates():
+        update_rollups(candidate_data)
+        count += 1
+    return count
+
+
+def _reason_clause(reasons):
+    if not reasons:
+        return "", []
+    return f" AND reason IN ({','.join('?' * len(reasons))})", list(reasons)
+
+
+def list_reasons():
+    rows = _connect().execute("SELECT DISTINCT reason FROM daily_rollups WHERE count > 0 ORDER BY reason").fetchall()
+    return [row[0] for row in rows]
+
+
+def category_summary(reasons=None, since=None):
+    """Count, mean and standard deviation per score metric, computed from the daily sums."""
+    clause, params = _reason_clause(reasons)
+    if since:
+        clause += " AND day >= ?"
+        params.append(since)
+    rows = _connect().execute(
+        f"""SELECT metric, SUM(count), SUM(total), SUM(total_sq) FROM daily_rollups
+            WHERE metric NOT LIKE 'funnel:%'{clause} GROUP BY metric""",
+        params,
+    ).fetchall()
+    if not rows:
+        return []
+
+    metrics = [row[0] for row in rows]
+    counts, totals, totals_sq = (np.array([row[i] for row in rows], dtype=float) for i in (1, 2, 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, totals / counts, np.nan)
+        variances = np.where(counts > 1, totals_sq / counts - means ** 2, np.nan)
+    stds = np.sqrt(np.clip(variances, 0, None))
+
+    order = {metric: i for i, metric in enumerate(SCORE_METRICS)}
+    summary = [
+        {"metric": metric, "count": int(count), "mean": round(float(mean), 2),
+         "std": None if np.isnan(std) else round(float(std), 2)}
+        for metric, count, mean, std in zip(metrics, counts, means, stds)
+        if count > 0
+    ]
+    return sorted(summary, key=lambda row: order.get(row["metric"], len(order)))
+
+
+def score_distribution(metric, reasons=None, since=None):
+    """Histogram buckets and percentiles for one score metric."""
+    clause, params = _reason_clause(reasons)
+    if since:
+        clause += " AND day >= ?"
+        params.append(since)
+    rows = _connect().execute(
+        f"""SELECT bucket, SUM(count) FROM daily_histograms WHERE metric = ?{clause}
+            GROUP BY bucket HAVING SUM(count) > 0 ORDER BY bucket""",
+        [metric] + params,
+    ).fetchall()
+    if not rows:
+        return {"buckets": [], "counts": [], "percentiles": {}}
+
+    buckets = np.array([row[0] for row in rows], dtype=float)
+    counts = np.array([row[1] for row in rows], dtype=float)
+    width = SCORE_METRICS[metric][2]
+    # Approximate percentiles by linear interpolation within buckets
+    cumulative = np.concatenate([[0.0], np.cumsum(counts)]) / counts.sum()
+    edges = np.concatenate([buckets, [buckets[-1] + width]])
+    percentiles = {f"p{q}": round(float(np.interp(q / 100, cumulative, edges)), 1) for q in (25, 50, 75, 90)}
+    return {"buckets": buckets.tolist(), "counts": counts.astype(int).tolist(), "percentiles": percentiles}
+
+
+def funnel(reasons=None, since=None):
+    """Candidates reaching each funnel stage and the share of submissions that reached it."""
+    clause, params = _reason_clause(reasons)
+    if since:
+        clause += " AND day >= ?"
+        params.append(since)
+    rows = dict(_connect().execute(
+        f"""SELECT metric, SUM(count) FROM daily_rollups WHERE metric LIKE 'funnel:%'{clause} GROUP BY metric""",
+        params,
+    ).fetchall())
+
+    counts = np.array([rows.get(f"funnel:{stage}", 0) for stage in FUNNEL_STAGES], dtype=float)
+    # API jobs may skip the reasoning test, so stages are not strictly nested; rates are relative to submissions
+    rates = counts / counts[0] if counts[0] > 0 else np.full(len(counts), np.nan)
+    return [
+        {"stage": stage, "count": int(count), "pass_through": None if np.isnan(rate) else round(float(rate), 3)}
+        for stage, count, rate in zip(FUNNEL_STAGES, counts, rates)
+    ]
+
+
+def daily_trend(metric, reasons=None, since=None, window=7):
+    """Daily count and mean of a metric plus a trailing `window`-day weighted mean."""
+    clause, params = _reason_clause(reasons)
+    if since:
+        clause += " AND day >= ?"
+        params.append(since)
+    rows = _connect().execute(
+        f"""SELECT day, SUM(count), SUM(total) FROM daily_rollups WHERE metric = ?{clause}
+            GROUP BY day HAVING SUM(count) > 0 ORDER BY day""",
+        [metric] + params,
+    ).fetchall()
+    if not rows:
+        return []
+
+    days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+    counts = np.array([row[1] for row in rows], dtype=float)
+    totals = np.array([row[2] for row in rows], dtype=float)
+
+    # Spread onto a continuous calendar so the rolling window covers calendar days
+    calendar = np.arange(days[0], days[-1] + 1)
+    index = (days - days[0]).astype(int)
+    full_counts = np.zeros(len(calendar))
+    full_totals = np.zeros(len(calendar))
+    full_counts[index] = counts
+    full_totals[index] = totals
+    kernel = np.ones(window)
+    rolling_counts = np.convolve(full_counts, kernel)[:len(calendar)]
+    rolling_totals = np.convolve(full_totals, kernel)[:len(calendar)]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = full_totals / full_counts
+        rolling_means = rolling_totals / rolling_counts
+    return [
+        {
+            "day": str(day),
+            "count": int(count),
+            "mean": None if np.isnan(mean) else round(float(mean), 2),
+            f"rolling_{window}d_mean": None if np.isnan(rolling) else round(float(rolling), 2),
+        }
+        for day, count, mean, rolling in zip(calendar, full_counts, means, rolling_means)
+    ]
+
+
+def entity_facets(kind):
+    """(entity, tier, candidate count) of every school or employer, most common first."""
+    return _connect().execute(
+        """SELECT entity, MIN(tier), COUNT(*) FROM entity_facets WHERE kind = ?
+           GROUP BY entity ORDER BY COUNT(*) DESC, entity""",
+        (kind,),
+    ).fetchall()
+
+
+def filter_by_entities(filters):
+    """Ids of candidates matching every filter.
+
+    `filters` maps a kind to (entities, max_tier). A candidate matches a kind
+    when it has any of the entities (if given) with a tier of at most
+    max_tier (if given). Returns None when no filter is set.
+    """
+    conn = _connect()
+    matched = None
+    for kind, (names, max_tier) in filters.items():
+        if not names and max_tier is None:
+            continue
+        query = "SELECT DISTINCT candidate_id FROM entity_facets WHERE kind = ?"
+        params = [kind]
+        if names:
+            query += f" AND entity IN ({','.join('?' * len(names))})"
+            params.extend(names)
+        if max_tier is not None:
+            query += " AND tier <= ?"
+            params.append(max_tier)
+        ids = {row[0] for row in conn.execute(query, params)}
+        matched = ids if matched is None else matched & ids
+    return matched
+
+
+def timeline_flag_counts():
+    """(flag, candidate count) of every timeline flag, most common first."""
+    return _connect().execute(
+        "SELECT flag, COUNT(*) FROM timeline_flags GROUP BY flag ORDER BY COUNT(*) DESC, flag"
+    ).fetchall()
+
+
+def filter_by_timeline_flags(flags):
+    """Ids of candidates with any of the timeline flags, or None when none are given."""
+    if not flags:
+        return None
+    return {row[0] for row in _connect().execute(
+        f"SELECT DISTINCT candidate_id FROM timeline_flags WHERE flag IN ({','.join('?' * len(flags))})",
+        list(flags),
+    )}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candidate analytics rollups")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="Recompute rollups from the candidate store")
+    subparsers.add_parser("summary", help="Print per-category averages and the funnel")
+    parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    if args.tenant:
+        set_tenant(args.tenant)
+
+    if args.command == "rebuild":
+        print(f"Rebuilt rollups from {rebuild_rollups()} candidates")
+    else:
+        print(json.dumps({"categories": category_summary(), "funnel": funnel()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Headless HTTP API for the evaluation pipeline.
+
+Run alongside the Streamlit UI with:
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+Submitted jobs go to the durable job queue (jobqueue.py), which this process
+drains with a bounded number of embedded worker threads. Additional workers can
+run as separate processes (`python jobqueue.py worker`) against the same queue
+file and candidate store.
+
+Requests act on the tenant named in the X-Omnisight-Tenant header (set by the
+reverse proxy), or the default tenant when it is absent. Model calls are
+charged to the user named in X-Omnisight-User, if any (see admission.py).
+"""
+import asyncio
+import json
+import os
+import threading
+import uuid
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, UploadFile
+
+import admission
+import jobqueue
+from app_logging import configure_logging, get_logger
+from pipeline import reasoning_questions, format_resume
+from store import load_candidate_data
+from tenancy import DEFAULT_TENANT, TENANT_HEADER, use_tenant, validate_tenant
+
+# Worker threads started inside the API process; bounds concurrent evaluations
+EMBEDDED_WORKERS = int(os.environ.get("OMNISIGHT_API_MAX_CONCURRENCY", 4))
+
+configure_logging()
+logger = get_logger("api")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    stop_event = threading.Event()
+    workers = [
+        threading.Thread(target=jobqueue.run_worker, kwargs={"stop_event": stop_event}, daemon=True)
+        for _ in range(EMBEDDED_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    yield
+    stop_event.set()
+    # In-flight jobs keep their checkpoints; an expired lease lets any worker resume them
+    for worker in workers:
+        await asyncio.to_thread(worker.join, 5)
+
+
+app = FastAPI(title="Omnisight Evaluation API", lifespan=lifespan)
+
+
+def request_tenant(tenant: str = Header(None, alias=TENANT_HEADER)):
+    try:
+        return validate_tenant(tenant or DEFAULT_TENANT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/health")
+async def health():
+    depth = await asyncio.to_thread(jobqueue.queue_depth)
+    admission_status = await asyncio.to_thread(admission.status)
+    return {"status": "ok", "queue": depth, "embedded_workers": EMBEDDED_WORKERS, "admission": admission_status}
+
+
+@app.get("/questions")
+async def questions():
+    return reasoning_questions
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(None),
+    resume_text: str = Form(""),
+    responses: str = Form("{}"),
+    reason: str = Form("API"),
+    webhook_url: str = Form(""),
+    tenant: str = Depends(request_tenant),
+    user: str = Header(None, alias=admission.USER_HEADER),
+):
+    """Submit a resume (file or text) and optional reasoning answers for evaluation.
+
+    `responses` is a JSON object mapping question id to answer text.
+    """
+    try:
+        responses = json.loads(responses or "{}")
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="responses must be a JSON object")
+    valid_ids = {q["id"] for q in reasoning_questions}
+    if not isinstance(responses, dict) or not set(responses) <= valid_ids:
+        raise HTTPException(status_code=422, detail=f"responses keys must be among {sorted(valid_ids)}")
+    if file is None and not resume_text.strip():
+        raise HTTPException(status_code=422, detail="Provide a resume file or resume_text")
+
+    payload = {
+        "resume_text": resume_text,
+        "responses": responses,
+        "reason": reason,
+        "webhook_url": webhook_url or None,
+        "user": user,
+    }
+    upload = (file.filename, file.content_type, await file.read()) if file is not None else None
+    with use_tenant(tenant):
+        # to_thread copies the context, so the job is recorded under this tenant
+        job_id = await asyncio.to_thread(jobqueue.enqueue, payload, None, jobqueue.QUEUED, upload)
+    return {"job_id": job_id, "status": jobqueue.QUEUED, "status_url": f"/jobs/{job_id}"}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str, tenant: str = Depends(request_tenant)):
+    job = await asyncio.to_thread(jobqueue.get_job, job_id, tenant)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobqueue.job_status(job)
+
+
+@app.get("/candidates/{candidate_id}")
+async def get_candidate(candidate_id: str, formatted: bool = False, tenant: str = Depends(request_tenant)):
+    try:
+        candidate_id = str(uuid.UUID(candidate_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    with use_tenant(tenant):
+        candidate_data = await asyncio.to_thread(load_candidate_data, candidate_id)
+    if candidate_data is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    if formatted:
+        candidate_data["formatted_resume"] = format_resume(candidate_data.get("resume"))
+    return candidate_data
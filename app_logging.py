@@ -0,0 +1,97 @@
+import contextvars
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+LOGGER_NAME = "omnisight"
+
+# Defaults can be overridden per deployment
+LOG_LEVEL = os.environ.get("OMNISIGHT_LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.environ.get("OMNISIGHT_LOG_FILE", os.path.join("logs", "omnisight.log"))
+LOG_MAX_BYTES = int(os.environ.get("OMNISIGHT_LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get("OMNISIGHT_LOG_BACKUP_COUNT", 5))
+DEBUG_MODE = os.environ.get("OMNISIGHT_DEBUG", "").lower() in ("1", "true", "yes")
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Debug logging switched on for one UI session (and the threads it starts)
+_session_debug = contextvars.ContextVar("omnisight_debug", default=False)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra=` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SessionLogger(logging.Logger):
+    """A logger that is also enabled for DEBUG in contexts that switched debug logging on."""
+
+    def isEnabledFor(self, level):
+        return (level >= logging.DEBUG and _session_debug.get()) or super().isEnabledFor(level)
+
+
+def _app_logger(name):
+    logger = logging.getLogger(name)
+    # App loggers only; the logger class of third-party libraries is left alone
+    if type(logger) is logging.Logger:
+        logger.__class__ = SessionLogger
+    return logger
+
+
+def configure_logging():
+    """Attach the file and console handlers once per process; safe to call on every rerun."""
+    logger = _app_logger(LOGGER_NAME)
+    if getattr(logger, "_omnisight_configured", False):
+        return logger
+
+    logger.setLevel(logging.DEBUG if DEBUG_MODE else LOG_LEVEL)
+    logger.propagate = False
+
+    if LOG_FILE:
+        os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+        file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+        file_handler.setFormatter(JsonFormatter())
+        logger.addHandler(file_handler)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(console_handler)
+
+    logger._omnisight_configured = True
+    return logger
+
+
+def set_debug_mode(enabled):
+    """Toggle verbose logging (raw resume text, prompts, model output) for the current context.
+
+    The logger level stays at LOG_LEVEL; only contexts that switched debug on
+    (e.g. one Streamlit session's rerun and the threads it starts) create
+    DEBUG records.
+    """
+    _session_debug.set(bool(enabled))
+
+
+def is_debug_mode():
+    """Whether debug records from the current context are written."""
+    return DEBUG_MODE or _session_debug.get()
+
+
+def get_logger(name=None):
+    """Return the app logger or one of its children (e.g. get_logger("parser"))."""
+    return _app_logger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
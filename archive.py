@@ -0,0 +1,462 @@
+"""Cold tier for old candidate records, and PII retention.
+
+Candidates saved more than OMNISIGHT_HOT_DAYS ago move out of the candidate
+store into gzip-compressed archive segments under <tenant root>/archive, one
+per month of the record's timestamp. A segment is a series of gzip members of
+up to ARCHIVE_MEMBER_RECORDS JSON lines, and an index records the member
+holding each candidate, so reading an archived record decompresses one member.
+store.py falls back to the archive for candidates not in the hot store;
+re-saving an archived candidate brings it back to the hot store.
+
+With OMNISIGHT_PII_RETENTION_DAYS set, candidates older than that lose their
+contact details and raw resume: contact_info is removed from the record and
+from its version history; the job queue's upload, extracted text and parse,
+and the upload cache's copies of them, are deleted; and this process's
+session cache drops them (other processes' expire with
+OMNISIGHT_SESSION_CACHE_TTL). Scores and evaluations are kept.
+
+Maintenance runs in bounded steps of OMNISIGHT_ARCHIVE_BATCH records, from
+idle queue workers every OMNISIGHT_ARCHIVE_INTERVAL seconds or from the CLI:
+
+    python archive.py run           # one step for every tenant
+    python archive.py status
+    python archive.py show CANDIDATE_ID
+"""
+import argparse
+import contextlib
+import fcntl
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+import versions
+from app_logging import get_logger
+from tenancy import list_tenants, set_tenant, tenant_path, use_tenant
+
+ARCHIVE_DIR = os.environ.get("OMNISIGHT_ARCHIVE_DIR", "archive")
+HOT_DAYS = float(os.environ.get("OMNISIGHT_HOT_DAYS", 90))
+# 0 keeps contact details for as long as the record exists
+PII_RETENTION_DAYS = float(os.environ.get("OMNISIGHT_PII_RETENTION_DAYS", 0))
+ARCHIVE_BATCH = int(os.environ.get("OMNISIGHT_ARCHIVE_BATCH", 200))
+ARCHIVE_INTERVAL = float(os.environ.get("OMNISIGHT_ARCHIVE_INTERVAL", 600))
+ARCHIVE_MEMBER_RECORDS = 50
+# Replaced segment files are kept this long for readers that looked up the old index row
+STALE_SEGMENT_SECONDS = 600
+INDEX_DB = "index.sqlite3"
+PII_PATH = ["resume", "contact_info"]
+
+logger = get_logger("archive")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived (
+    candidate_id TEXT PRIMARY KEY,
+    timestamp TEXT,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archived_member_idx ON archived (segment, offset);
+CREATE TABLE IF NOT EXISTS segments (
+    month TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS purged (
+    candidate_id TEXT PRIMARY KEY,
+    purged_at REAL NOT NULL
+);
+"""
+
+_local = threading.local()
+_last_maintenance = 0.0
+
+
+def _archive_dir():
+    return tenant_path(ARCHIVE_DIR)
+
+
+def _index_exists():
+    return os.path.exists(os.path.join(_archive_dir(), INDEX_DB))
+
+
+def _connect():
+    """Return this thread's connection to the current tenant's archive index."""
+    path = os.path.join(_archive_dir(), INDEX_DB)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+def _age_days(timestamp, now):
+    saved = datetime.fromisoformat(timestamp)
+    if saved.tzinfo is None:
+        saved = saved.replace(tzinfo=timezone.utc)
+    return (now - saved).total_seconds() / 86400
+
+
+def _read_member(segment, offset, length):
+    with open(os.path.join(_archive_dir(), segment), "rb") as f:
+        f.seek(offset)
+        data = gzip.decompress(f.read(length))
+    return [json.loads(line) for line in data.splitlines() if line]
+
+
+def _write_members(path, records):
+    """Append records to a segment file as gzip members; returns [(candidate_id, offset, length)]."""
+    placed = []
+    with open(path, "ab") as f:
+        for start in range(0, len(records), ARCHIVE_MEMBER_RECORDS):
+            batch = records[start:start + ARCHIVE_MEMBER_RECORDS]
+            data = gzip.compress("\n".join(json.dumps(r) for r in batch).encode())
+            offset = f.tell()
+            f.write(data)
+            placed.extend((r["candidate_id"], offset, len(data)) for r in batch)
+        f.flush()
+        os.fsync(f.fileno())
+    return placed
+
+
+def load(candidate_id):
+    """An archived record, or None if the candidate is not archived."""
+    if not _index_exists():
+        return None
+    conn = _connect()
+    # A segment rewritten between the index lookup and the read is looked up again
+    for _ in range(2):
+        row = conn.execute(
+            "SELECT segment, offset, length FROM archived WHERE candidate_id = ?", (candidate_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            records = _read_member(*row)
+        except FileNotFoundError:
+            continue
+        for candidate_data in records:
+            if candidate_data["candidate_id"] == candidate_id:
+                return candidate_data
+    return None
+
+
+def summaries():
+    """(candidate_id, timestamp) of every archived record, from the index."""
+    if not _index_exists():
+        return []
+    return _connect().execute("SELECT candidate_id, timestamp FROM archived").fetchall()
+
+
+def iter_records():
+    """Yield every archived record, decompressing one member at a time."""
+    if not _index_exists():
+        return
+    conn = _connect()
+    members = conn.execute("SELECT DISTINCT segment, offset, length FROM archived ORDER BY segment, offset").fetchall()
+    for segment, offset, length in members:
+        live = {row[0] for row in conn.execute(
+            "SELECT candidate_id FROM archived WHERE segment = ? AND offset = ?", (segment, offset))}
+        try:
+            records = _read_member(segment, offset, length)
+        except FileNotFoundError:
+            # Rewritten since the listing; its records are picked up by load() if needed
+            continue
+        for candidate_data in records:
+            # Copies of re-saved candidates stay in the segment until it is rewritten
+            if candidate_data["candidate_id"] in live:
+                yield candidate_data
+
+
+def forget(candidate_id):
+    """Drop a candidate from the archive index after it was saved to the hot store again."""
+    if _index_exists():
+        _connect().execute("DELETE FROM archived WHERE candidate_id = ?", (candidate_id,))
+
+
+def purge_pii(candidate_data, now=None):
+    """A copy of the record without contact details, stamped with when they were purged."""
+    now = now or datetime.now(timezone.utc)
+    purged = dict(candidate_data)
+    resume = purged.get("resume")
+    if isinstance(resume, dict):
+        purged["resume"] = {key: value for key, value in resume.items() if key != PII_PATH[-1]}
+    purged["pii_purged_at"] = now.isoformat()
+    return purged
+
+
+def _pii_due(timestamp, now):
+    return PII_RETENTION_DAYS > 0 and _age_days(timestamp, now) >= PII_RETENTION_DAYS
+
+
+def _purge_related(conn, candidate_id):
+    """Purge contact details from the version history and every copy of the raw resume, and record the purge."""
+    import jobqueue
+    import session_cache
+
+    versions.redact(candidate_id, PII_PATH)
+    for job_id in jobqueue.purge_candidate_inputs(candidate_id):
+        session_cache.invalidate_job(job_id)
+    session_cache.invalidate_candidate(candidate_id)
+    conn.execute("INSERT OR REPLACE INTO purged (candidate_id, purged_at) VALUES (?, ?)", (candidate_id, time.time()))
+
+
+def _purged_ids(conn):
+    return {row[0] for row in conn.execute("SELECT candidate_id FROM purged")}
+
+
+def _segment_file(conn, month):
+    row = conn.execute("SELECT file FROM segments WHERE month = ?", (month,)).fetchone()
+    if row is not None:
+        return row[0]
+    name = f"{month}.0.jsonl.gz"
+    conn.execute("INSERT INTO segments (month, file, generation) VALUES (?, ?, 0)", (month, name))
+    return name
+
+
+def archive_old(batch=ARCHIVE_BATCH, now=None):
+    """Move up to batch of the oldest records past OMNISIGHT_HOT_DAYS to the archive; returns how many."""
+    from store import get_store
+
+    now = now or datetime.now(timezone.utc)
+    store = get_store()
+    due = sorted((ts, cid) for cid, ts in store.summaries() if ts and _age_days(ts, now) >= HOT_DAYS)[:batch]
+    if not due:
+        return 0
+
+    conn = _connect()
+    purged_ids = _purged_ids(conn)
+    by_month = {}
+    for timestamp, candidate_id in due:
+        original = store.load(candidate_id)
+        if original is None:
+            continue
+        # Expired contact details never reach the archive
+        record = purge_pii(original, now) if _pii_due(timestamp, now) else original
+        by_month.setdefault(timestamp[:7], []).append((original, record))
+
+    moved = 0
+    for month, pairs in by_month.items():
+        segment = _segment_file(conn, month)
+        placed = _write_members(os.path.join(_archive_dir(), segment), [record for _, record in pairs])
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (candidate_id, offset, length), (_, record) in zip(placed, pairs):
+                conn.execute(
+                    "INSERT OR REPLACE INTO archived (candidate_id, timestamp, segment, offset, length) VALUES (?, ?, ?, ?, ?)",
+                    (candidate_id, record.get("timestamp"), segment, offset, length),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        for original, record in pairs:
+            candidate_id = original["candidate_id"]
+            # A record re-saved while it was being archived stays hot
+            if not store.delete_if_unchanged(candidate_id, original):
+                # Its contact details are left to purge_expired, which checks the hot record again
+                forget(candidate_id)
+                continue
+            moved += 1
+            if record is not original and candidate_id not in purged_ids:
+                _purge_related(conn, candidate_id)
+    return moved
+
+
+def _rewrite_segment(conn, month, now):
+    """Rewrite a month's segment with expired contact details purged and re-saved copies dropped.
+
+    Returns (records purged, records rewritten).
+    """
+    row = conn.execute("SELECT file, generation FROM segments WHERE month = ?", (month,)).fetchone()
+    old_file, generation = row
+    purged_ids = _purged_ids(conn)
+    records, newly_purged = [], []
+    members = conn.execute(
+        "SELECT DISTINCT offset, length FROM archived WHERE segment = ? ORDER BY offset", (old_file,)).fetchall()
+    for offset, length in members:
+        live = {r[0] for r in conn.execute(
+            "SELECT candidate_id FROM archived WHERE segment = ? AND offset = ?", (old_file, offset))}
+        for record in _read_member(old_file, offset, length):
+            if record["candidate_id"] not in live:
+                continue
+            if record["candidate_id"] not in purged_ids and record.get("timestamp") and _pii_due(record["timestamp"], now):
+                record = purge_pii(record, now)
+                newly_purged.append(record["candidate_id"])
+            records.append(record)
+
+    new_file = f"{month}.{generation + 1}.jsonl.gz"
+    placed = _write_members(os.path.join(_archive_dir(), new_file), records)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for candidate_id, offset, length in placed:
+            conn.execute("UPDATE archived SET segment = ?, offset = ?, length = ? WHERE candidate_id = ?",
+                         (new_file, offset, length, candidate_id))
+        conn.execute("UPDATE segments SET file = ?, generation = ? WHERE month = ?", (new_file, generation + 1, month))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    # Start the grace period for readers of the old file now
+    os.utime(os.path.join(_archive_dir(), old_file))
+    for candidate_id in newly_purged:
+        _purge_related(conn, candidate_id)
+    return len(newly_purged), len(records)
+
+
+def purge_expired(batch=ARCHIVE_BATCH, now=None):
+    """Purge contact details of records past OMNISIGHT_PII_RETENTION_DAYS; returns how many.
+
+    batch bounds the records written: hot records purged plus archived records
+    rewritten. A segment is rewritten whole, so the last one a step starts can
+    take it past batch.
+    """
+    from store import get_store
+
+    if PII_RETENTION_DAYS <= 0:
+        return 0
+    now = now or datetime.now(timezone.utc)
+    conn = _connect()
+    purged_ids = _purged_ids(conn)
+    count = written = 0
+
+    # Hot records, when the retention period is shorter than the hot period
+    store = get_store()
+    for candidate_id, timestamp in store.summaries():
+        if written >= batch:
+            return count
+        if candidate_id in purged_ids or not timestamp or not _pii_due(timestamp, now):
+            continue
+        candidate_data = store.load(candidate_id)
+        if candidate_data is None:
+            continue
+        # A record re-saved since the load is left for the next step
+        if not store.save_if_unchanged(purge_pii(candidate_data, now), candidate_data):
+            continue
+        _purge_related(conn, candidate_id)
+        count += 1
+        written += 1
+
+    # Archived records are purged a segment at a time
+    months = set()
+    for candidate_id, timestamp in summaries():
+        if candidate_id not in purged_ids and timestamp and _pii_due(timestamp, now):
+            months.add(timestamp[:7])
+    for month in sorted(months):
+        if written >= batch:
+            break
+        purged, rewritten = _rewrite_segment(conn, month, now)
+        count += purged
+        written += rewritten
+    return count
+
+
+def _remove_stale_segments(conn):
+    """Delete segment files replaced by a rewrite once their grace period has passed."""
+    current = {row[0] for row in conn.execute("SELECT file FROM segments")}
+    removed = 0
+    for entry in os.scandir(_archive_dir()):
+        if (entry.name.endswith(".jsonl.gz") and entry.name not in current
+                and time.time() - entry.stat().st_mtime > STALE_SEGMENT_SECONDS):
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+@contextlib.contextmanager
+def _maintenance_lock():
+    """Hold the tenant's maintenance lock, or yield False if another process holds it."""
+    os.makedirs(_archive_dir(), exist_ok=True)
+    with open(os.path.join(_archive_dir(), "maintenance.lock"), "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def maintain(batch=ARCHIVE_BATCH, now=None):
+    """One bounded maintenance step for the current tenant; None if another process is running one."""
+    with _maintenance_lock() as locked:
+        if not locked:
+            return None
+        return {
+            "archived": archive_old(batch, now),
+            "purged": purge_expired(batch, now),
+            "removed_segments": _remove_stale_segments(_connect()),
+        }
+
+
+def maybe_maintain():
+    """Run a maintenance step for every tenant if OMNISIGHT_ARCHIVE_INTERVAL has passed (idle workers call this)."""
+    global _last_maintenance
+    if time.monotonic() - _last_maintenance < ARCHIVE_INTERVAL:
+        return
+    _last_maintenance = time.monotonic()
+    for tenant in list_tenants():
+        with use_tenant(tenant):
+            try:
+                result = maintain()
+            except Exception:
+                logger.exception("Archive maintenance failed", extra={"tenant": tenant})
+                continue
+        if result and any(result.values()):
+            logger.info("Archive maintenance", extra={"tenant": tenant, **result})
+
+
+def status():
+    if not _index_exists():
+        return {"archived": 0, "segments": 0, "segment_bytes": 0, "pii_purged": 0}
+    conn = _connect()
+    files = [row[0] for row in conn.execute("SELECT file FROM segments")]
+    return {
+        "archived": conn.execute("SELECT COUNT(*) FROM archived").fetchone()[0],
+        "segments": len(files),
+        "segment_bytes": sum(os.path.getsize(os.path.join(_archive_dir(), f)) for f in files),
+        "pii_purged": conn.execute("SELECT COUNT(*) FROM purged").fetchone()[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candidate archive and PII retention")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run one maintenance step")
+    run_parser.add_argument("--batch", type=int, default=ARCHIVE_BATCH)
+    subparsers.add_parser("status", help="Print archive size")
+    show_parser = subparsers.add_parser("show", help="Print an archived record")
+    show_parser.add_argument("candidate_id")
+    parser.add_argument("--tenant", help="Tenant namespace (default: every tenant for run)")
+    args = parser.parse_args()
+
+    if args.tenant:
+        set_tenant(args.tenant)
+
+    if args.command == "run":
+        for tenant in [args.tenant] if args.tenant else list_tenants():
+            with use_tenant(tenant):
+                print(tenant, json.dumps(maintain(args.batch)))
+    elif args.command == "status":
+        print(json.dumps(status(), indent=2))
+    else:
+        candidate_data = load(args.candidate_id)
+        if candidate_data is None:
+            parser.error(f"Candidate {args.candidate_id} is not archived")
+        print(json.dumps(candidate_data, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare DOCX extraction speed and coverage: python-docx paragraph walk vs. the XML extractor.
+
+    python benchmarks/bench_docx_extraction.py --per-size 10 --repeat 5
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from benchmarks.fixtures import SIZES, docx_corpus
+from extraction import extract_docx_text
+
+
+def legacy_extract(docx_file):
+    """The previous extractor: body paragraphs only, built with string +=."""
+    doc = Document(docx_file)
+    text = ""
+    for paragraph in doc.paragraphs:
+        if paragraph.text.strip():
+            text += paragraph.text.strip() + "\n"
+    return text.strip()
+
+
+EXTRACTORS = {"python-docx paragraphs": legacy_extract, "xml stream": extract_docx_text}
+
+
+def run(per_size, repeat):
+    corpus = list(docx_corpus(per_size))
+    results = []
+    for label, extractor in EXTRACTORS.items():
+        for size in SIZES:
+            files = [(data, markers) for name, data, markers in corpus if name.startswith(size)]
+            found = total = 0
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for data, markers in files:
+                    text = extractor(io.BytesIO(data))
+                    found += sum(1 for m in markers if m in text)
+                    total += len(markers)
+            elapsed = time.perf_counter() - started
+            runs = len(files) * repeat
+            results.append({
+                "extractor": label,
+                "size": size,
+                "files": len(files),
+                "ms_per_file": round(elapsed / runs * 1000, 3),
+                "files_per_s": round(runs / elapsed, 1),
+                "coverage": round(found / total, 3),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-size", type=int, default=5, help="Fixtures per size class")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    header = f"{'extractor':<24}{'size':<8}{'ms/file':>10}{'files/s':>10}{'coverage':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in run(args.per_size, args.repeat):
+        print(f"{row['extractor']:<24}{row['size']:<8}{row['ms_per_file']:>10}{row['files_per_s']:>10}{row['coverage']:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Measure school and employer lookups: the entity dictionary vs. a naive alias scan.
+
+Generates --names names the way resumes write them: canonical names, aliases,
+added suffixes ("Inc.", "- Summer Internship"), different case and
+punctuation, and names that are not in the dictionary. Each name is looked up
+with a scan that tests every alias in turn, with the dictionary's lookup
+cache cleared before each name (cold), and with the cache filled (warm). The
+scan's matches are compared with the dictionary's.
+
+    python benchmarks/bench_entities.py --names 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import entities
+
+NOISE_PREFIXES = ["", "", "", "The ", "Intern at "]
+NOISE_SUFFIXES = ["", "", "", ", Inc.", " LLC", " - Summer Internship", " (Remote)", ", New York"]
+UNLISTED = ["Acme Widgets", "Riverside Community College", "Blue Harbor Analytics", "Smith & Sons Plumbing",
+            "Northfield Regional Hospital", "Lakeside Academy", "Brightpath Consulting", "Granite Peak Capital"]
+
+
+def synthetic_names(count, seed=0):
+    """(kind, name) pairs: mostly dictionary names with noise, about a fifth unlisted."""
+    rng = random.Random(seed)
+    entries = entities._builtin_entries()
+    names = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            name, kind = rng.choice(UNLISTED), rng.choice((entities.SCHOOL, entities.EMPLOYER))
+        else:
+            entry = rng.choice(entries)
+            kind = entry["kind"]
+            name = rng.choice([entry["name"]] + entry["aliases"]).lstrip("=")
+            name = rng.choice(NOISE_PREFIXES) + name + rng.choice(NOISE_SUFFIXES)
+            name = rng.choice([name, name.upper(), name.lower()])
+        names.append((kind, name))
+    return names
+
+
+class NaiveScan:
+    """Normalize each name and test every alias, longest match wins."""
+
+    def __init__(self, entries):
+        self.aliases = []
+        for entry in entries:
+            aliases = [entry["name"]] + entry["aliases"]
+            whole_only = {entities.normalize(alias[1:]) for alias in aliases if alias.startswith("=")}
+            for alias in aliases:
+                tokens = entities.normalize(alias.lstrip("="))
+                self.aliases.append((tokens, tokens in whole_only, entry["kind"], entry["name"]))
+
+    def lookup(self, name, kind):
+        tokens = entities.normalize(name)
+        best = None
+        for alias, whole_only, alias_kind, canonical in self.aliases:
+            if kind == entities.SCHOOL and alias_kind != entities.SCHOOL:
+                continue
+            n = len(alias)
+            if whole_only:
+                found = alias == tokens
+            else:
+                found = any(tokens[i:i + n] == alias for i in range(len(tokens) - n + 1))
+            if found and (best is None or alias == tokens or (best[0] != tokens and n > len(best[0]))):
+                best = (alias, canonical)
+        return best[1] if best else None
+
+
+def timed(fn, names):
+    start = time.perf_counter()
+    results = [fn(name, kind) for kind, name in names]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    names = synthetic_names(args.names, args.seed)
+    entries = entities._builtin_entries()
+
+    start = time.perf_counter()
+    dictionary = entities.EntityDictionary(entries)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    naive = NaiveScan(entries)
+    naive_s, naive_results = timed(naive.lookup, names)
+
+    def cold(name, kind):
+        dictionary._cache.clear()
+        return (dictionary.lookup(name, kind) or {}).get("name")
+
+    cold_s, cold_results = timed(cold, names)
+    timed(dictionary.lookup, names)
+    warm_s, _ = timed(dictionary.lookup, names)
+
+    agree = sum(a == b for a, b in zip(naive_results, cold_results))
+    matched = sum(result is not None for result in cold_results)
+    print(f"{len(names)} names, {len(entries)} entities, dictionary built in {build_ms:.1f} ms")
+    print(f"matched {matched} ({matched / len(names):.0%}); naive scan agrees on {agree / len(names):.1%}")
+    header = f"{'method':<22}{'lookups/s':>14}{'lookups/min':>16}{'us/lookup':>12}"
+    print(header)
+    print("-" * len(header))
+    for label, seconds in (("naive alias scan", naive_s), ("dictionary (cold)", cold_s),
+                           ("dictionary (warm)", warm_s)):
+        rate = len(names) / seconds
+        print(f"{label:<22}{rate:>14,.0f}{rate * 60:>16,.0f}{seconds / len(names) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure the typed data model against plain dicts: memory per record and encode/decode throughput.
+
+Builds --records synthetic candidate records (see
+bench_overall_context.build_record) and reports, for whole records and for
+the parsed resume alone:
+
+- the Python heap held by the decoded records: dicts from json.loads vs.
+  models.decode_record / decode_resume objects;
+- decoding: json.loads alone vs. json.loads plus validation into the model;
+- encoding: the old pretty-printed json.dumps vs. the canonical encoding the
+  store uses (models.encode_record, models.canonical_resume), which validates
+  dict to dict without building the objects;
+- stored bytes per record, pretty-printed vs. canonical compact JSON.
+
+    python benchmarks/bench_models.py --records 2000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+from benchmarks.bench_overall_context import build_record
+
+
+def heap_bytes(build):
+    """Bytes still allocated by what build() returns."""
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def throughput(fn, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return len(items) * repeat / (time.perf_counter() - start)
+
+
+def run(records, repeat):
+    corpus = [build_record(seed, resaved=True) for seed in range(records)]
+    results = {}
+    for label, pick, decode, encode in (
+        ("record", lambda record: record, models.decode_record, models.encode_record),
+        ("resume", lambda record: record["resume"], models.decode_resume,
+         lambda resume: models.dumps(models.canonical_resume(resume))),
+    ):
+        items = [pick(record) for record in corpus]
+        pretty = [json.dumps(item, indent=2) for item in items]
+        canonical = [encode(item) for item in items]
+        results[label] = {
+            "dict bytes/record": heap_bytes(lambda: [json.loads(text) for text in canonical]) / records,
+            "model bytes/record": heap_bytes(lambda: [decode(json.loads(text)) for text in canonical]) / records,
+            "json.loads/s": throughput(json.loads, canonical, repeat),
+            "json.loads + decode/s": throughput(lambda text: decode(json.loads(text)), canonical, repeat),
+            "pretty json.dumps/s": throughput(lambda item: json.dumps(item, indent=2), items, repeat),
+            "canonical encode/s": throughput(encode, items, repeat),
+            "pretty bytes/record": sum(map(len, pretty)) / records,
+            "canonical bytes/record": sum(map(len, canonical)) / records,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus per throughput figure")
+    args = parser.parse_args()
+
+    results = run(args.records, args.repeat)
+    header = f"{'metric':<26}" + "".join(f"{label:>14}" for label in results)
+    print(header)
+    print("-" * len(header))
+    for metric in next(iter(results.values())):
+        print(f"{metric:<26}" + "".join(f"{values[metric]:>14,.0f}" for values in results.values()))
+
+
+if __name__ == "__main__":
+    main()
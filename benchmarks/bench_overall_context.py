@@ -0,0 +1,108 @@
+"""Compare the overall assessment's prompt size: the old context vs. build_overall_assessment_context.
+
+Builds synthetic candidate records (mock stage outputs, answers of several
+lengths, with and without a previous overall assessment as on re-saved
+records) and reports the estimated prompt tokens of both contexts.
+
+    python benchmarks/bench_overall_context.py --records 30
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import SIZES, resume_text
+from benchmarks.mock_llm import COMPLETION_TOKENS, completion_text
+from pipeline import (
+    OVERALL_ASSESSMENT_PROMPT,
+    build_overall_assessment_context,
+    estimate_tokens,
+    reasoning_questions,
+    stamp_prompt_versions,
+)
+
+ANSWER_WORDS = (60, 250, 900)
+WORDS = "pricing market assumption risk customers survey sample estimate cost competitor trial revenue".split()
+
+
+def legacy_context(candidate_data):
+    """The previous context: the whole record as JSON, then its evaluations again."""
+    return f"""Candidate Profile:
+{json.dumps(candidate_data, indent=2)}
+
+Resume Evaluation:
+Primary Evaluator: {candidate_data.get('primary_evaluator_output', 'Not available')}
+Skeptic: {candidate_data.get('skeptic_evaluator_output', 'Not available')}
+Synthesizer: {candidate_data.get('resume_synthesis', 'Not available')}
+
+Reasoning Assessment:
+Final Evaluation: {candidate_data.get('final_evaluation', 'Not available')}"""
+
+
+def _output(stage, rng, user_text=""):
+    return completion_text(stage, [{"role": "user", "content": user_text}], COMPLETION_TOKENS[stage][0], rng)
+
+
+def build_record(seed, resaved):
+    rng = random.Random(seed)
+    sizes = list(SIZES.values())
+    answer_words = ANSWER_WORDS[seed % len(ANSWER_WORDS)]
+    responses = {q["id"]: " ".join(rng.choice(WORDS) for _ in range(answer_words)) for q in reasoning_questions}
+    record = {
+        "candidate_id": f"{seed:08d}-bench",
+        "timestamp": "2025-01-01T00:00:00+00:00",
+        "reason": "BENCH",
+        "test_type": "reasoning",
+        "resume": json.loads(_output("parse", rng, resume_text(seed, sizes[seed % len(sizes)]))),
+        "responses": responses,
+        "evaluations": {q_id: _output("grade", rng) for q_id in responses},
+        "final_evaluation": _output("combined", rng),
+        "resume_synthesis": _output("synthesizer", rng),
+        "primary_evaluator_output": _output("primary", rng),
+        "skeptic_evaluator_output": _output("skeptic", rng),
+    }
+    if resaved:
+        record["overall_assessment"] = _output("overall", rng)
+    return stamp_prompt_versions(record)
+
+
+def run(records):
+    system_tokens = estimate_tokens(OVERALL_ASSESSMENT_PROMPT)
+    rows = []
+    for resaved in (False, True):
+        before = after = 0
+        for seed in range(records):
+            record = build_record(seed, resaved)
+            before += estimate_tokens(legacy_context(record)) + system_tokens
+            after += estimate_tokens(build_overall_assessment_context(record)) + system_tokens
+        rows.append(("re-saved record" if resaved else "first assessment", before / records, after / records))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=30)
+    args = parser.parse_args()
+
+    header = f"{'record':<20}{'before tok':>12}{'after tok':>12}{'saved':>8}"
+    print(header)
+    print("-" * len(header))
+    for label, before, after in run(args.records):
+        print(f"{label:<20}{before:>12.0f}{after:>12.0f}{1 - after / before:>8.0%}")
+    note = "" if _has_tiktoken() else " (estimated at 4 characters per token; install tiktoken for exact counts)"
+    print(f"Prompt tokens per call (system + user), mean over records{note}")
+
+
+def _has_tiktoken():
+    try:
+        import tiktoken  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare PDF extraction modes on two-column and single-column resumes.
+
+    python benchmarks/bench_pdf_extraction.py --per-size 10 --repeat 5
+
+"plain" is PyPDF2's stream order (the previous behaviour); "columns" is the
+layout-aware mode. Line recall is the share of expected lines that come back
+intact; in order means the whole document matched the expected reading order.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import SIZES, pdf_corpus
+from extraction import _pdf_text, extract_pdf_text
+
+
+def run(per_size, repeat):
+    corpus = list(pdf_corpus(per_size))
+    groups = [f"{size}_{columns}col" for columns in (2, 1) for size in SIZES]
+    results = []
+    for layout in ("plain", "columns"):
+        for group in groups:
+            files = [(data, expected) for name, data, expected in corpus if name.startswith(group + "_")]
+            recalled = total = in_order = 0
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for data, expected in files:
+                    lines = _pdf_text(data, layout).split("\n")
+                    present = set(lines)
+                    recalled += sum(1 for line in expected if line in present)
+                    total += len(expected)
+                    in_order += lines == expected
+            elapsed = time.perf_counter() - started
+            runs = len(files) * repeat
+            results.append({
+                "layout": layout,
+                "fixtures": group,
+                "ms_per_file": round(elapsed / runs * 1000, 3),
+                "line_recall": recalled / total,
+                "in_order": in_order / runs,
+            })
+    return results
+
+
+def cached_hit_ms(per_size):
+    """Average time for a repeat extraction of an already-seen file."""
+    files = [data for _, data, _ in pdf_corpus(per_size)]
+    for data in files:
+        extract_pdf_text(io.BytesIO(data))
+    started = time.perf_counter()
+    for data in files:
+        extract_pdf_text(io.BytesIO(data))
+    return (time.perf_counter() - started) / len(files) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-size", type=int, default=5, help="Fixtures per size class and layout")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    header = f"{'layout':<10}{'fixtures':<14}{'ms/file':>10}{'line recall':>14}{'in order':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in run(args.per_size, args.repeat):
+        print(f"{row['layout']:<10}{row['fixtures']:<14}{row['ms_per_file']:>10}"
+              f"{row['line_recall']:>14.1%}{row['in_order']:>10.0%}")
+    print(f"\ncached re-extraction: {cached_hit_ms(args.per_size):.3f} ms/file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""End-to-end load test of the evaluation pipeline against the mock LLM server.
+
+Enqueues synthetic candidates (PDF, DOCX and pasted text, in several sizes,
+with reasoning answers) and drains them with concurrent queue workers through
+the real pipeline: extract -> parse -> primary/skeptic/synthesizer -> grading
+-> combined -> overall -> save. Reports throughput, per-stage and per-job
+p50/p95/p99 latency, and memory high-water marks.
+
+    python benchmarks/bench_pipeline.py --jobs 60 --concurrency 8
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/baselines/default.json
+    python benchmarks/bench_pipeline.py --compare benchmarks/baselines/default.json
+
+With --compare the exit status is 1 when any metric regresses by more than
+--tolerance against the baseline. Each run uses a throwaway data directory.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import SIZES, build_docx, build_pdf, resume_text
+from benchmarks.mock_llm import MockConfig, start_mock_server
+
+KINDS = ("pdf", "docx", "text")
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+ANSWER = (
+    "I would rank athletes by prior biological passport anomalies and sudden performance jumps, then "
+    "randomize a share of tests so the selection cannot be gamed. The drawback is false confidence in priors."
+)
+
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def build_jobs(count, kinds, answers, questions):
+    """Yield (payload, upload) for count synthetic candidates, cycling kinds and sizes."""
+    sizes = list(SIZES.items())
+    responses = {q["id"]: ANSWER for q in questions[:answers]}
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        _, entries = sizes[(i // len(kinds)) % len(sizes)]
+        payload = {"reason": "LOADTEST", "responses": responses}
+        upload = None
+        if kind == "pdf":
+            upload = (f"resume_{i}.pdf", PDF_MIME, build_pdf(i, entries, columns=1 + i % 2)[0])
+        elif kind == "docx":
+            upload = (f"resume_{i}.docx", DOCX_MIME, build_docx(i, entries)[0])
+        else:
+            payload["resume_text"] = resume_text(i, entries)
+        yield payload, upload
+
+
+def run(args):
+    """Run one load test and return its metrics."""
+    # Point the pipeline at the mock and a throwaway data directory before it is imported
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        config = MockConfig(args.median_ms, args.sigma, args.tokens_per_s, args.error_rate, args.seed)
+        server, base_url = start_mock_server(config)
+    data_dir = tempfile.mkdtemp(prefix="omnisight-bench-")
+    os.environ.update({"OPENAI_BASE_URL": base_url, "OPENAI_API_KEY": "mock", "OMNISIGHT_DATA_DIR": data_dir})
+
+    import jobqueue
+    from instrumentation import percentile, recorder
+    from pipeline import reasoning_questions
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_before = _max_rss_mb()
+
+    for payload, upload in build_jobs(args.jobs, args.kinds, args.answers, reasoning_questions):
+        jobqueue.enqueue(payload, upload=upload)
+    recorder.clear()
+
+    job_seconds = []
+    lock = threading.Lock()
+
+    def worker(n):
+        worker_id = f"bench-{n}"
+        while True:
+            started = time.perf_counter()
+            if not jobqueue.run_one(worker_id):
+                return
+            with lock:
+                job_seconds.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    depth = jobqueue.queue_depth()
+    stages = {}
+    for s in recorder.spans():
+        stages.setdefault(s.stage, []).append(s.duration)
+
+    def latency(values):
+        return {
+            "count": len(values),
+            "p50_s": round(percentile(values, 50), 4),
+            "p95_s": round(percentile(values, 95), 4),
+            "p99_s": round(percentile(values, 99), 4),
+        }
+
+    metrics = {
+        "config": {
+            "jobs": args.jobs, "concurrency": args.concurrency, "kinds": list(args.kinds), "answers": args.answers,
+            "median_ms": args.median_ms, "sigma": args.sigma, "tokens_per_s": args.tokens_per_s,
+            "error_rate": args.error_rate, "external_llm": bool(args.base_url),
+        },
+        "completed": depth.get(jobqueue.COMPLETED, 0),
+        "failed": depth.get(jobqueue.FAILED, 0),
+        "wall_s": round(wall, 3),
+        "throughput_jobs_per_s": round(depth.get(jobqueue.COMPLETED, 0) / wall, 3),
+        "job": latency(job_seconds),
+        "stages": {stage: latency(values) for stage, values in sorted(stages.items())},
+        "rss_peak_mb": round(_max_rss_mb(), 1),
+        "rss_growth_mb": round(_max_rss_mb() - rss_before, 1),
+    }
+    if args.tracemalloc:
+        metrics["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+        tracemalloc.stop()
+    if server:
+        server.shutdown()
+    if args.keep_data:
+        print(f"Data directory kept at {data_dir}")
+    else:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return metrics
+
+
+# (metric path, direction): "lower" means an increase is a regression
+COMPARED_METRICS = [
+    ("throughput_jobs_per_s", "higher"), ("rss_peak_mb", "lower"), ("job.p50_s", "lower"), ("job.p95_s", "lower"),
+]
+# Latency changes smaller than this are timer and scheduler noise, whatever the ratio
+MIN_LATENCY_CHANGE_S = 0.02
+
+
+def _lookup(metrics, path):
+    for part in path.split("."):
+        metrics = (metrics or {}).get(part)
+    return metrics
+
+
+def compare(metrics, baseline, tolerance):
+    """Return a list of (metric, baseline, current, change) regressions beyond tolerance."""
+    # Per-stage tails are too noisy at load-test sample sizes; compare their medians
+    paths = list(COMPARED_METRICS) + [(f"stages.{stage}.p50_s", "lower") for stage in baseline.get("stages", {})]
+
+    regressions = []
+    for path, direction in paths:
+        before, after = _lookup(baseline, path), _lookup(metrics, path)
+        if not before or after is None:
+            continue
+        if path.endswith("_s") and abs(after - before) < MIN_LATENCY_CHANGE_S:
+            continue
+        change = (after - before) / before
+        if (direction == "lower" and change > tolerance) or (direction == "higher" and change < -tolerance):
+            regressions.append((path, before, after, change))
+    return regressions
+
+
+def print_report(metrics):
+    print(f"{metrics['completed']} jobs completed, {metrics['failed']} failed in {metrics['wall_s']}s "
+          f"({metrics['throughput_jobs_per_s']} jobs/s)")
+    header = f"{'stage':<24}{'count':>7}{'p50 s':>10}{'p95 s':>10}{'p99 s':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = [("job (end to end)", metrics["job"])] + list(metrics["stages"].items())
+    for name, row in rows:
+        print(f"{name:<24}{row['count']:>7}{row['p50_s']:>10}{row['p95_s']:>10}{row['p99_s']:>10}")
+    memory = f"peak RSS {metrics['rss_peak_mb']} MB (+{metrics['rss_growth_mb']} MB during run)"
+    if "python_peak_mb" in metrics:
+        memory += f", Python heap peak {metrics['python_peak_mb']} MB"
+    print(memory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=6, help="Concurrent queue workers")
+    parser.add_argument("--kinds", default=",".join(KINDS), help="Comma-separated mix of pdf, docx, text")
+    parser.add_argument("--answers", type=int, default=2, help="Reasoning answers per candidate")
+    parser.add_argument("--median-ms", type=float, default=50.0, help="Mock LLM median latency")
+    parser.add_argument("--sigma", type=float, default=0.35, help="Mock LLM log-normal latency spread")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="Mock LLM generation speed; 0 disables")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock requests that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base-url", help="Use an already running OpenAI-compatible server instead")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report the Python heap peak (slower)")
+    parser.add_argument("--keep-data", action="store_true", help="Keep the run's data directory for inspection")
+    parser.add_argument("--json", help="Write the metrics to this file")
+    parser.add_argument("--save-baseline", help="Write the metrics as a baseline to this file")
+    parser.add_argument("--compare", help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression")
+    args = parser.parse_args()
+    args.kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    if not set(args.kinds) <= set(KINDS):
+        parser.error(f"--kinds must be among {', '.join(KINDS)}")
+
+    metrics = run(args)
+    print_report(metrics)
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(metrics, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != metrics["config"]:
+            print("warning: baseline was recorded with a different configuration")
+        regressions = compare(metrics, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for path, before, after, change in regressions:
+                print(f"  {path}: {before} -> {after} ({change:+.0%})")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
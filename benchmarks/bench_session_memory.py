@@ -0,0 +1,190 @@
+"""Measure Streamlit session memory: bodies in session state vs. ids plus the shared cache.
+
+Seeds a throwaway data directory with completed jobs and candidate records
+shaped like production output (see mock_llm.py), then builds the state of
+--sessions concurrent sessions two ways and reports the Python heap each
+layout retains per session:
+
+    full bodies  what main.py used to keep per session: parsed resume, formatted
+                 markdown, agent outputs, responses, evaluations, combined text
+    ids + cache  job id and question index per session; bodies fetched through
+                 session_cache.py, whose size is bounded
+
+It also reports the heap peak of one candidate browser rerun, which used to
+load every record and now lists ids and timestamps only.
+
+    python benchmarks/bench_session_memory.py --sessions 200 --candidates 500
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import SIZES, resume_text
+from benchmarks.mock_llm import COMPLETION_TOKENS, completion_text
+
+EVALUATION_STAGES = ("primary", "skeptic", "synthesizer")
+
+
+def _stage_output(stage, rng, user_text=""):
+    messages = [{"role": "user", "content": user_text}]
+    return completion_text(stage, messages, COMPLETION_TOKENS[stage][0], rng)
+
+
+def seed_jobs(count, questions, jobqueue, seed=0):
+    """Enqueue count jobs with every interactive stage checkpointed; returns their ids."""
+    rng = random.Random(seed)
+    sizes = list(SIZES.values())
+    job_ids = []
+    for i in range(count):
+        job_id = jobqueue.enqueue({"reason": "BENCH", "source": "ui"}, status=jobqueue.INTERACTIVE)
+        parsed = json.loads(_stage_output("parse", rng, resume_text(i, sizes[i % len(sizes)])))
+        jobqueue.put_checkpoint(job_id, "parse", parsed)
+        for stage in EVALUATION_STAGES:
+            jobqueue.put_checkpoint(job_id, stage, _stage_output(stage, rng))
+        for question in questions:
+            jobqueue.put_checkpoint(job_id, jobqueue.grade_stage_key(question["id"]),
+                                    {"response": "A considered answer. " * 20, "evaluation": _stage_output("grade", rng)})
+        jobqueue.put_checkpoint(job_id, "combined", _stage_output("combined", rng))
+        job_ids.append(job_id)
+    return job_ids
+
+
+def full_body_session(job_id, jobqueue, questions, format_resume):
+    """Session state as main.py kept it before: every body copied into the session."""
+    checkpoints = jobqueue.load_checkpoints(job_id)
+    graded = [checkpoints[jobqueue.grade_stage_key(q["id"])] for q in questions]
+    return {
+        "job_id": job_id,
+        "current_page": "combined_evaluation",
+        "question_index": len(questions) - 1,
+        "resume_parsed": True,
+        "parsed_resume_data": checkpoints["parse"],
+        "formatted_resume": format_resume(checkpoints["parse"]),
+        "primary_evaluator_output": checkpoints["primary"],
+        "skeptic_evaluator_output": checkpoints["skeptic"],
+        "resume_synthesized_evaluation": checkpoints["synthesizer"],
+        "responses": {q["id"]: g["response"] for q, g in zip(questions, graded)},
+        "evaluations": {q["id"]: g["evaluation"] for q, g in zip(questions, graded)},
+        "combined_evaluation": checkpoints["combined"],
+    }
+
+
+def cached_session(job_id, jobqueue, questions, session_cache):
+    """Session state as main.py keeps it now; rendering pulls bodies through the cache."""
+    state = {"job_id": job_id, "current_page": "combined_evaluation",
+             "question_index": len(questions) - 1, "failed_grades": {}}
+    session_cache.formatted_resume(job_id)
+    for stage in EVALUATION_STAGES + ("combined",):
+        session_cache.checkpoint(job_id, stage)
+    for question in questions:
+        session_cache.checkpoint(job_id, jobqueue.grade_stage_key(question["id"]))
+    return state
+
+
+def retained_bytes(build):
+    """Heap bytes still held after build() returns (its result is kept alive)."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] - before, kept
+
+
+def peak_bytes(fn):
+    gc.collect()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    fn()
+    return tracemalloc.get_traced_memory()[1] - before
+
+
+def run(args):
+    data_dir = tempfile.mkdtemp(prefix="omnisight-bench-")
+    os.environ["OMNISIGHT_DATA_DIR"] = data_dir
+    os.environ["OMNISIGHT_SESSION_CACHE_SIZE"] = str(args.cache_size)
+
+    import jobqueue
+    import session_cache
+    from pipeline import format_resume, reasoning_questions
+    from store import iter_candidates, save_candidate_to_file
+
+    try:
+        job_ids = seed_jobs(args.sessions, reasoning_questions, jobqueue)
+        for i in range(args.candidates):
+            job_id = job_ids[i % len(job_ids)]
+            record = full_body_session(job_id, jobqueue, reasoning_questions, format_resume)
+            save_candidate_to_file({
+                "reason": "BENCH", "test_type": "reasoning", "resume": record["parsed_resume_data"],
+                "responses": record["responses"], "evaluations": record["evaluations"],
+                "final_evaluation": record["combined_evaluation"], "resume_synthesis": record["resume_synthesized_evaluation"],
+                "primary_evaluator_output": record["primary_evaluator_output"],
+                "skeptic_evaluator_output": record["skeptic_evaluator_output"],
+            })
+
+        tracemalloc.start()
+        full, kept = retained_bytes(
+            lambda: [full_body_session(j, jobqueue, reasoning_questions, format_resume) for j in job_ids])
+        del kept
+        session_cache.clear()
+        cached, kept = retained_bytes(
+            lambda: [cached_session(j, jobqueue, reasoning_questions, session_cache) for j in job_ids])
+        cache_entries = session_cache.cache_stats()["entries"]
+        del kept
+
+        def legacy_browser():
+            candidates = list(iter_candidates())
+            candidates.sort(key=lambda c: c["timestamp"], reverse=True)
+            return candidates[0]
+
+        def cached_browser():
+            summaries = session_cache.candidate_summaries()
+            return session_cache.candidate(summaries[0][0])
+
+        session_cache.clear()
+        browser_full = peak_bytes(legacy_browser)
+        session_cache.clear()
+        browser_cached = peak_bytes(cached_browser)
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        "sessions": args.sessions,
+        "candidates": args.candidates,
+        "cache_size": args.cache_size,
+        "cache_entries": cache_entries,
+        "full_bodies_kb_per_session": round(full / args.sessions / 1024, 1),
+        "ids_and_cache_kb_per_session": round(cached / args.sessions / 1024, 1),
+        "browser_rerun_peak_kb": {"full_records": round(browser_full / 1024, 1),
+                                  "summaries": round(browser_cached / 1024, 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200, help="Concurrent sessions to simulate")
+    parser.add_argument("--candidates", type=int, default=500, help="Stored candidates for the browser rerun")
+    parser.add_argument("--cache-size", type=int, default=256, help="OMNISIGHT_SESSION_CACHE_SIZE for the run")
+    args = parser.parse_args()
+
+    m = run(args)
+    print(f"{m['sessions']} sessions, {m['candidates']} stored candidates, "
+          f"cache {m['cache_entries']}/{m['cache_size']} entries")
+    print(f"{'layout':<16}{'KB per session':>16}{'MB total':>12}")
+    for label, key in (("full bodies", "full_bodies_kb_per_session"), ("ids + cache", "ids_and_cache_kb_per_session")):
+        print(f"{label:<16}{m[key]:>16}{m[key] * m['sessions'] / 1024:>12.1f}")
+    browser = m["browser_rerun_peak_kb"]
+    print(f"browser rerun heap peak: {browser['full_records'] / 1024:.1f} MB loading every record, "
+          f"{browser['summaries'] / 1024:.1f} MB listing summaries")
+
+
+if __name__ == "__main__":
+    main()
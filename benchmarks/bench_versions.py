@@ -0,0 +1,112 @@
+"""Measure version history storage across re-scoring runs: full copies vs. deltas.
+
+Saves --records synthetic candidates (see bench_overall_context.build_record),
+then re-scores them --runs times the way reevaluate.py does: new resume agent
+and overall outputs, the old ones appended to evaluation_history. After each
+run it reports what keeping a full JSON copy of every version would take
+against what versions.py stores, plus the time to read the latest version and
+to rebuild version 1.
+
+    python benchmarks/bench_versions.py --records 100 --runs 5
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_overall_context import _output, build_record
+
+RESCORED_FIELDS = {
+    "primary": "primary_evaluator_output",
+    "skeptic": "skeptic_evaluator_output",
+    "synthesizer": "resume_synthesis",
+    "overall": "overall_assessment",
+}
+
+
+def rescore(record, rng, run):
+    """The record after one re-scoring run, shaped like reevaluate.reevaluate_candidate's output."""
+    updated = dict(record)
+    for stage, field in RESCORED_FIELDS.items():
+        updated[field] = _output(stage, rng)
+    history_entry = {
+        "evaluated_at": record.get("evaluated_at", record["timestamp"]),
+        "superseded_at": f"2025-02-{run + 1:02d}T00:00:00+00:00",
+        "prompt_versions": record.get("prompt_versions") or {},
+        "outputs": {field: record.get(field) for field in RESCORED_FIELDS.values()},
+    }
+    updated["evaluation_history"] = list(record.get("evaluation_history") or []) + [history_entry]
+    updated["evaluated_at"] = history_entry["superseded_at"]
+    return updated
+
+
+def run(records, runs, compact_every):
+    data_dir = tempfile.mkdtemp(prefix="omnisight-bench-")
+    os.environ["OMNISIGHT_DATA_DIR"] = data_dir
+
+    import versions
+    from store import load_candidate_data, save_candidate_to_file
+
+    rng = random.Random(0)
+    rows = []
+    try:
+        current = []
+        full_copies = 0
+        for seed in range(records):
+            record = build_record(seed, resaved=True)
+            save_candidate_to_file(record)
+            full_copies += len(json.dumps(record))
+            current.append(record)
+        rows.append((0, full_copies, versions.storage_stats()["stored_bytes"]))
+
+        for i in range(runs):
+            current = [rescore(record, rng, i) for record in current]
+            for record in current:
+                save_candidate_to_file(record)
+                full_copies += len(json.dumps(record))
+            if compact_every:
+                versions.compact(compact_every)
+            rows.append((i + 1, full_copies, versions.storage_stats()["stored_bytes"]))
+
+        candidate_id = current[0]["candidate_id"]
+        timings = {}
+        for label, fn in (
+            ("store.load (latest)", lambda: load_candidate_data(candidate_id)),
+            ("versions.load_version (latest)", lambda: versions.load_version(candidate_id)),
+            ("versions.load_version (v1)", lambda: versions.load_version(candidate_id, 1)),
+        ):
+            start = time.perf_counter()
+            for _ in range(50):
+                fn()
+            timings[label] = (time.perf_counter() - start) / 50 * 1000
+        assert versions.load_version(candidate_id) == current[0]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return rows, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5, help="Re-scoring runs")
+    parser.add_argument("--compact-every", type=int, default=3, help="Snapshot chains this long after each run")
+    args = parser.parse_args()
+
+    rows, timings = run(args.records, args.runs, args.compact_every)
+    header = f"{'run':<6}{'full copies MB':>16}{'versions MB':>14}{'ratio':>8}"
+    print(header)
+    print("-" * len(header))
+    for i, full, stored in rows:
+        print(f"{i:<6}{full / 2**20:>16.2f}{stored / 2**20:>14.2f}{full / stored:>8.1f}x")
+    for label, ms in timings.items():
+        print(f"{label:<34}{ms:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
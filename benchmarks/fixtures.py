@@ -0,0 +1,329 @@
+"""Synthetic resume fixtures for extraction and pipeline benchmarks.
+
+Fixtures are generated deterministically from a seed, so the corpus does not
+need to be checked in:
+
+    python benchmarks/fixtures.py --out /tmp/omnisight-fixtures
+
+Every DOCX fixture places marker tokens (BODY_*, TABLE_*, TEXTBOX_*, HEADER_*,
+FOOTER_*) in a different part of the document, so extraction coverage can be
+measured by counting which markers come back. PDF fixtures use a two-column
+layout (sidebar plus main column under a full-width name banner) and come with
+the lines in their expected reading order.
+"""
+import argparse
+import io
+import os
+import random
+import textwrap
+import zipfile
+from xml.sax.saxutils import escape
+
+SIZES = {"small": 3, "medium": 12, "large": 60}
+
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Avery", "Quinn"]
+LAST_NAMES = ["Chen", "Patel", "Garcia", "Kim", "Okafor", "Novak", "Silva", "Cohen"]
+SCHOOLS = ["University of Pennsylvania", "Stanford University", "Ohio State University", "MIT", "UCLA"]
+COMPANIES = ["Goldman Sachs", "Meta", "Bridgewater Associates", "Acme Robotics", "Jane Street", "Local Bakery"]
+POSITIONS = ["Software Engineering Intern", "Summer Analyst", "Research Assistant", "Incoming Summer Associate"]
+VERBS = ["Built", "Led", "Designed", "Analyzed", "Automated", "Shipped", "Reduced", "Scaled"]
+OBJECTS = ["a data pipeline", "the onboarding flow", "pricing models", "a React dashboard", "ETL jobs"]
+RESULTS = ["cutting latency 40%", "serving 10k users", "saving $200k annually", "for 3 product teams"]
+SKILLS = ["Python", "SQL", "React", "Excel", "Tableau", "Go", "PyTorch", "Financial Modeling"]
+
+
+def resume_sections(seed, entries):
+    """Deterministic resume content: contact line, education, experience bullets and skills."""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    contact = f"{name} | {name.split()[0].lower()}@example.com | 555-010-{rng.randint(1000, 9999)} | New York, NY"
+    education = [
+        f"{rng.choice(SCHOOLS)} — B.S. Computer Science, GPA {rng.uniform(3.0, 4.0):.2f}, May {rng.randint(2024, 2027)}"
+    ]
+    experience = []
+    for i in range(entries):
+        start = rng.randint(2018, 2025)
+        experience.append({
+            "title": f"{rng.choice(POSITIONS)}, {rng.choice(COMPANIES)} ({start}–{start + rng.randint(0, 2)})",
+            "bullets": [
+                f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(RESULTS)}"
+                for _ in range(rng.randint(2, 4))
+            ],
+        })
+    skills = ", ".join(rng.sample(SKILLS, 5))
+    return {"name": name, "contact": contact, "education": education, "experience": experience, "skills": skills}
+
+
+def resume_text(seed, entries):
+    """Plain-text rendering of the synthetic resume."""
+    sections = resume_sections(seed, entries)
+    lines = [sections["name"], sections["contact"], "", "EDUCATION", *sections["education"], "", "EXPERIENCE"]
+    for job in sections["experience"]:
+        lines.append(job["title"])
+        lines.extend(f"- {bullet}" for bullet in job["bullets"])
+    lines += ["", "SKILLS", sections["skills"]]
+    return "\n".join(lines)
+
+
+# --- DOCX ---------------------------------------------------------------
+
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_NS = (
+    f'xmlns:w="{_W}" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:v="urn:schemas-microsoft-com:vml" '
+    'mc:Ignorable="wps"'
+)
+
+
+def _p(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _table(rows):
+    cells = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{''.join(_p(line) for line in cell)}</w:tc>" for cell in row) + "</w:tr>"
+        for row in rows
+    )
+    return f"<w:tbl>{cells}</w:tbl>"
+
+
+def _textbox(paragraphs):
+    """A floating text box as Word writes it: DrawingML choice plus a VML fallback copy."""
+    content = "".join(_p(text) for text in paragraphs)
+    return (
+        "<w:p><w:r><mc:AlternateContent>"
+        "<mc:Choice Requires=\"wps\"><w:drawing><wp:anchor><a:graphic><a:graphicData>"
+        f"<wps:wsp><wps:txbx><w:txbxContent>{content}</w:txbxContent></wps:txbx></wps:wsp>"
+        "</a:graphicData></a:graphic></wp:anchor></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><v:shape><v:textbox><w:txbxContent>{content}</w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+
+
+def build_docx(seed, entries):
+    """Build a DOCX resume as bytes; returns (bytes, expected marker tokens)."""
+    sections = resume_sections(seed, entries)
+    markers = []
+
+    def mark(kind, text):
+        token = f"{kind}_{len(markers)}"
+        markers.append(token)
+        return f"{token} {text}"
+
+    body = [_p(mark("BODY", sections["name"]))]
+    # Sidebar text box with contact and skills, as in two-column templates
+    body.append(_textbox([mark("TEXTBOX", sections["contact"]), mark("TEXTBOX", sections["skills"])]))
+    body.append(_p("EDUCATION"))
+    body += [_p(mark("BODY", line)) for line in sections["education"]]
+    body.append(_p("EXPERIENCE"))
+    # Experience laid out as a two-column table: title | bullets
+    rows = [
+        [[mark("TABLE", job["title"])], [mark("TABLE", bullet) for bullet in job["bullets"]]]
+        for job in sections["experience"]
+    ]
+    body.append(_table(rows))
+
+    header = _p(mark("HEADER", f"{sections['name']} — Resume"))
+    footer = _p(mark("FOOTER", "References available on request"))
+
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {_NS}><w:body>'
+        + "".join(body)
+        + '<w:sectPr><w:headerReference w:type="default" r:id="rIdHeader1"/>'
+        '<w:footerReference w:type="default" r:id="rIdFooter1"/></w:sectPr></w:body></w:document>'
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '<Override PartName="/word/header1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>'
+        '<Override PartName="/word/footer1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml"/>'
+        '</Types>'
+    )
+    package_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/></Relationships>'
+    )
+    document_rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rIdHeader1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/header" '
+        'Target="header1.xml"/>'
+        '<Relationship Id="rIdFooter1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/footer" '
+        'Target="footer1.xml"/></Relationships>'
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", content_types)
+        archive.writestr("_rels/.rels", package_rels)
+        archive.writestr("word/_rels/document.xml.rels", document_rels)
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/header1.xml", f'<?xml version="1.0" encoding="UTF-8"?><w:hdr {_NS}>{header}</w:hdr>')
+        archive.writestr("word/footer1.xml", f'<?xml version="1.0" encoding="UTF-8"?><w:ftr {_NS}>{footer}</w:ftr>')
+    return buffer.getvalue(), markers
+
+
+# --- PDF ----------------------------------------------------------------
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 40
+SIDEBAR_WIDTH = 160
+GUTTER = 30
+FONT_SIZE = 10
+LEADING = 14
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("cp1252", "replace")
+
+
+def _wrap(text, width):
+    # Helvetica averages about half an em per glyph
+    return textwrap.wrap(text, int(width / (FONT_SIZE * 0.5))) or [""]
+
+
+def _write_pdf(pages):
+    """Serialize pages of (x, y, size, text) runs as a minimal PDF with Helvetica text."""
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    for runs in pages:
+        stream = b"".join(
+            b"BT /F1 %d Tf %.2f %.2f Td (%s) Tj ET\n" % (size, x, y, _pdf_escape(text)) for x, y, size, text in runs
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    pages_id = len(objects) + len(pages) + 1
+    kids = []
+    for i in range(len(pages)):
+        objects.append(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 1 0 R >> >> "
+            b"/Contents %d 0 R >>" % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, i + 2)
+        )
+        kids.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref))
+    return out.getvalue()
+
+
+def build_pdf(seed, entries, columns=2):
+    """Build a PDF resume; returns (bytes, lines in expected reading order).
+
+    columns=2 puts contact, education and skills in a left sidebar next to the
+    experience column; columns=1 is a single column with right-aligned dates.
+    Runs are written row by row across the page, as most PDF producers do.
+    """
+    sections = resume_sections(seed, entries)
+    top = PAGE_HEIGHT - MARGIN - 40
+    per_page = (top - MARGIN) // LEADING
+
+    if columns == 1:
+        width = PAGE_WIDTH - 2 * MARGIN
+        rows = [[(MARGIN, sections["contact"])], [(MARGIN, "EDUCATION")]]
+        rows += [[(MARGIN, line)] for text in sections["education"] for line in _wrap(text, width)]
+        rows.append([(MARGIN, "EXPERIENCE")])
+        for job in sections["experience"]:
+            title, dates = job["title"].rsplit(" (", 1)
+            rows.append([(MARGIN, title), (PAGE_WIDTH - MARGIN - 60, f"({dates}")])
+            rows += [[(MARGIN, line)] for bullet in job["bullets"] for line in _wrap(f"- {bullet}", width)]
+        rows += [[(MARGIN, "SKILLS")], [(MARGIN, sections["skills"])]]
+        page_rows = [rows[i:i + per_page] for i in range(0, len(rows), per_page)]
+        expected_pages = [[" ".join(text for _, text in row) for row in chunk] for chunk in page_rows]
+    else:
+        sidebar = ["CONTACT", *_wrap(sections["contact"], SIDEBAR_WIDTH), "EDUCATION"]
+        for line in sections["education"]:
+            sidebar += _wrap(line, SIDEBAR_WIDTH)
+        sidebar += ["SKILLS", *_wrap(sections["skills"], SIDEBAR_WIDTH)]
+        main_x = MARGIN + SIDEBAR_WIDTH + GUTTER
+        main_width = PAGE_WIDTH - MARGIN - main_x
+        main = ["EXPERIENCE"]
+        for job in sections["experience"]:
+            main += _wrap(job["title"], main_width)
+            for bullet in job["bullets"]:
+                main += _wrap(f"- {bullet}", main_width)
+        page_rows, expected_pages = [], []
+        for p in range(max(1, -(-len(main) // per_page), -(-len(sidebar) // per_page))):
+            left = sidebar[p * per_page:(p + 1) * per_page]
+            right = main[p * per_page:(p + 1) * per_page]
+            rows = [[] for _ in range(max(len(left), len(right)))]
+            for i, line in enumerate(left):
+                rows[i].append((MARGIN, line))
+            for i, line in enumerate(right):
+                rows[i].append((main_x, line))
+            page_rows.append(rows)
+            expected_pages.append(left + right)
+
+    pages, expected = [], []
+    for rows, lines in zip(page_rows, expected_pages):
+        runs = [(MARGIN, PAGE_HEIGHT - MARGIN, 18, sections["name"])]
+        for i, row in enumerate(rows):
+            runs += [(x, top - i * LEADING, FONT_SIZE, text) for x, text in row]
+        pages.append(runs)
+        expected += [sections["name"], *lines]
+    return _write_pdf(pages), expected
+
+
+def pdf_corpus(count_per_size=5, seed=0):
+    """Yield (name, bytes, expected_lines) for every PDF fixture: two-column and single-column."""
+    for columns in (2, 1):
+        for size, entries in SIZES.items():
+            for i in range(count_per_size):
+                data, expected = build_pdf(seed + i, entries, columns)
+                yield f"{size}_{columns}col_{i:02d}.pdf", data, expected
+
+
+def docx_corpus(count_per_size=5, seed=0):
+    """Yield (name, bytes, markers) for every DOCX fixture in the corpus."""
+    for size, entries in SIZES.items():
+        for i in range(count_per_size):
+            data, markers = build_docx(seed + i, entries)
+            yield f"{size}_{i:02d}.docx", data, markers
+
+
+def write_corpus(out_dir, count_per_size=5, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    written = 0
+    for name, data, _ in [*docx_corpus(count_per_size, seed), *pdf_corpus(count_per_size, seed)]:
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(data)
+        written += 1
+    for size, entries in SIZES.items():
+        for i in range(count_per_size):
+            with open(os.path.join(out_dir, f"{size}_{i:02d}.txt"), "w") as f:
+                f.write(resume_text(seed + i, entries))
+            written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the synthetic resume fixture corpus")
+    parser.add_argument("--out", default="benchmarks/fixtures")
+    parser.add_argument("--per-size", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"Wrote {write_corpus(args.out, args.per_size, args.seed)} fixtures to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
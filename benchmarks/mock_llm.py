@@ -0,0 +1,251 @@
+"""Local mock of the OpenAI chat completions endpoint for load tests.
+
+Responses are shaped like the real pipeline stages' output (parser JSON,
+evaluator ratings, final scores) so downstream parsing and score extraction
+behave as in production. Latency is log-normal around a median plus a
+per-token generation time; completion lengths are drawn per stage.
+Requests with "stream": true get server-sent chunks paced over the
+generation time.
+
+    python benchmarks/mock_llm.py --port 8100 --median-ms 800 --tokens-per-s 80
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock streamlit run main.py
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# (mean, stddev) of completion tokens per stage, roughly matching production output
+COMPLETION_TOKENS = {
+    "parse": (700, 150),
+    "primary": (900, 200),
+    "skeptic": (600, 150),
+    "synthesizer": (450, 100),
+    "grade": (350, 80),
+    "combined": (800, 150),
+    "overall": (700, 150),
+    "other": (200, 50),
+}
+
+# First words of each stage's system prompt
+STAGE_MARKERS = [
+    ("You are a resume parser", "parse"),
+    ("You are a detailed, structured resume reviewer", "primary"),
+    ("You are a resume red teamer", "skeptic"),
+    ("You are a hiring manager making a final judgment", "synthesizer"),
+    ("You are a senior hiring manager", "overall"),
+    ("You are analyzing a candidate's responses", "combined"),
+    ("You are evaluating a job candidate's response", "grade"),
+]
+
+# Characters per streamed chunk (about four tokens)
+STREAM_CHUNK_CHARS = 16
+
+FILLER = (
+    "The candidate shows credible progression with specific, quantified outcomes and a clear account of "
+    "their own contribution relative to the team. "
+)
+
+
+class MockConfig:
+    def __init__(self, median_ms=500.0, sigma=0.35, tokens_per_s=0.0, error_rate=0.0, seed=None):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        # 0 disables per-token generation time
+        self.tokens_per_s = tokens_per_s
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def sample(self, stage):
+        with self.lock:
+            self.requests += 1
+            mean, stddev = COMPLETION_TOKENS[stage]
+            tokens = max(20, int(self.rng.gauss(mean, stddev)))
+            latency = self.median_ms / 1000 * math.exp(self.rng.gauss(0, self.sigma))
+            fail = self.rng.random() < self.error_rate
+        if self.tokens_per_s:
+            latency += tokens / self.tokens_per_s
+        return tokens, latency, fail
+
+
+def detect_stage(messages):
+    text = " ".join(m.get("content") or "" for m in messages)
+    for marker, stage in STAGE_MARKERS:
+        if marker in text:
+            return stage
+    return "other"
+
+
+def _pad(text, tokens):
+    # About four characters per token
+    missing = tokens * 4 - len(text)
+    if missing > 0:
+        text += "\n\n" + (FILLER * (missing // len(FILLER) + 1))[:missing]
+    return text
+
+
+def _parsed_resume(user_text):
+    lines = [line.strip() for line in user_text.splitlines() if line.strip()]
+    name = lines[0] if lines else "Candidate"
+    experience = [
+        {"company": "Acme", "position": line[:60], "dates": "2022-2023", "location": "",
+         "responsibilities": [line[:120]]}
+        for line in lines[1:6]
+    ]
+    return json.dumps({
+        "contact_info": {"name": name, "email": "candidate@example.com", "phone": "", "location": ""},
+        "summary": "",
+        "education": [{"institution": "University of Example", "degree": "B.S.", "major": "Economics",
+                       "graduation_date": "2025", "gpa": "3.7"}],
+        "experience": experience,
+        "projects": [],
+        "extracurriculars": [],
+        "sports": [],
+        "skills": [{"category": "Technical", "items": ["Python", "SQL"]}],
+    }, indent=2)
+
+
+def completion_text(stage, messages, tokens, rng):
+    score = rng.randint(35, 75)
+    if stage == "parse":
+        user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        return _parsed_resume(user)
+    if stage == "primary":
+        ratings = "\n".join(
+            f"**{label} (1–10):** {rng.randint(3, 9)}"
+            for label in ["Believability", "Role Depth & Function", "Pedigree (Contextualized)",
+                          "Impact & Specificity", "Writing & Communication", "Consistency", "Trajectory"]
+        )
+        return _pad(f"### Category Ratings\n{ratings}", tokens)
+    if stage == "skeptic":
+        return _pad(f"### Skepticism Score (1–10)\n{rng.randint(2, 8)}", tokens)
+    if stage == "synthesizer":
+        return _pad(f"### Final Resume Score (20–80)\n{score}", tokens)
+    if stage == "grade":
+        ratings = "\n".join(
+            f"{label}: {rng.randint(3, 9)}"
+            for label in ["Clarity", "Logical reasoning", "Originality", "Specificity and realism of strategy"]
+        )
+        return _pad(ratings, tokens)
+    if stage == "combined":
+        return _pad(f"### Final Score (20–80)\n{score}", tokens)
+    if stage == "overall":
+        return _pad(f"### Overall Candidate Score (20–80)\n{score}", tokens)
+    return _pad("OK", tokens)
+
+
+def make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+
+            messages = request.get("messages") or []
+            stage = detect_stage(messages)
+            tokens, latency, fail = config.sample(stage)
+            streamed = bool(request.get("stream"))
+            # Streams pay the base latency before the first token and generation time while streaming
+            generation = tokens / config.tokens_per_s if streamed and config.tokens_per_s else 0.0
+            time.sleep(latency - generation)
+            if fail:
+                self._send(500, {"error": {"message": "mock server error", "type": "server_error"}})
+                return
+
+            content = completion_text(stage, messages, tokens, config.rng)
+            prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+            completion_tokens = len(content) // 4
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                     "total_tokens": prompt_tokens + completion_tokens}
+            if streamed:
+                include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+                self._stream(request, content, usage if include_usage else None, generation)
+                return
+            self._send(200, {
+                "id": f"chatcmpl-mock-{config.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        def _stream(self, request, content, usage, generation):
+            """Send content as server-sent chat.completion.chunk events, spread over generation seconds."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            base = {"id": f"chatcmpl-mock-{config.requests}", "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": request.get("model", "mock")}
+            pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+            events = [dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": piece},
+                                           "finish_reason": None}]) for piece in pieces]
+            events.append(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+            if usage:
+                events.append(dict(base, choices=[], usage=usage))
+            for event in events:
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+                if generation:
+                    time.sleep(generation / len(events))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def start_mock_server(config=None, host="127.0.0.1", port=0):
+    """Start the mock in a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config or MockConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--median-ms", type=float, default=500.0, help="Median base latency per request")
+    parser.add_argument("--sigma", type=float, default=0.35, help="Log-normal spread of the base latency")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="Generation speed; 0 disables")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(args.median_ms, args.sigma, args.tokens_per_s, args.error_rate, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"Mock LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""Canonical names and tiers for schools and employers.
+
+The parser copies `education[].institution` and `experience[].company` from
+the resume as written, so "UPenn", "Penn" and "The Wharton School, University
+of Pennsylvania" are different strings. Each name is matched against a local
+dictionary. An exact alias is looked up first. Otherwise an Aho-Corasick
+automaton over name tokens finds the longest alias inside the name. A
+recognised entry gets an `entity` with the canonical name, category and tier
+(1 = most selective or best known, 3 = widely recognised).
+
+The built-in dictionary covers well-known universities and employers. Each
+tenant can extend or override it with entities.json (OMNISIGHT_ENTITIES) in
+its directory:
+
+    [{"name": "Acme Capital", "kind": "employer", "category": "fund", "tier": 1,
+      "aliases": ["Acme", "=ACP"]}]
+
+Aliases starting with "=" only match the whole name; short or ambiguous
+names such as "Penn" or "Columbia" are listed that way.
+
+    python entities.py lookup "Wharton School of the University of Pennsylvania"
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import deque
+
+from app_logging import get_logger
+from tenancy import set_tenant, tenant_path
+
+ENTITIES_PATH = os.environ.get("OMNISIGHT_ENTITIES", "entities.json")
+# Distinct names remembered per dictionary; resumes repeat the same few thousand
+LOOKUP_CACHE_SIZE = 100_000
+
+SCHOOL = "school"
+EMPLOYER = "employer"
+
+# kind|category|tier|canonical name|aliases
+_BUILTIN = """
+school|university|1|Harvard University|Harvard,Harvard College,Harvard Business School,=HBS
+school|continuing education|3|Harvard Extension School|Harvard Extension
+school|university|1|Stanford University|Stanford,Stanford Graduate School of Business,=Stanford GSB
+school|continuing education|3|Stanford Continuing Studies|
+school|university|1|Massachusetts Institute of Technology|=MIT,MIT Sloan,Sloan School of Management
+school|university|1|Princeton University|Princeton
+school|university|1|Yale University|Yale,Yale College,Yale School of Management
+school|university|1|University of Pennsylvania|=Penn,=UPenn,U Penn,Wharton,The Wharton School,Wharton School
+school|university|1|Columbia University|=Columbia,Columbia Business School,Columbia Engineering
+school|university|1|California Institute of Technology|Caltech
+school|university|1|University of Chicago|=UChicago,Chicago Booth,Booth School of Business
+school|university|1|Duke University|=Duke,Fuqua School of Business
+school|university|1|Brown University|=Brown
+school|university|1|Dartmouth College|Dartmouth,Tuck School of Business
+school|university|1|Cornell University|Cornell
+school|university|1|Northwestern University|Northwestern,Kellogg School of Management
+school|university|1|Johns Hopkins University|Johns Hopkins,=JHU
+school|university|1|Carnegie Mellon University|Carnegie Mellon,=CMU
+school|university|1|University of Oxford|Oxford University,=Oxford
+school|university|1|University of Cambridge|Cambridge University,=Cambridge
+school|university|2|University of California, Berkeley|UC Berkeley,=Berkeley,=Cal,Haas School of Business
+school|university|2|University of California, Los Angeles|UCLA
+school|university|2|University of California, San Diego|UC San Diego,=UCSD
+school|university|3|University of California, Davis|UC Davis
+school|university|3|University of California, Irvine|UC Irvine,=UCI
+school|university|3|University of California, Santa Barbara|UC Santa Barbara,=UCSB
+school|university|2|University of Michigan|=Michigan,=UMich,Michigan Ross,Ross School of Business
+school|university|3|Michigan State University|Michigan State
+school|university|2|Georgia Institute of Technology|Georgia Tech
+school|university|2|University of Illinois Urbana-Champaign|=UIUC,University of Illinois at Urbana-Champaign,=University of Illinois
+school|university|2|University of Texas at Austin|UT Austin,McCombs School of Business
+school|university|2|New York University|=NYU,NYU Stern,Stern School of Business
+school|university|2|University of Southern California|=USC
+school|university|2|Rice University|=Rice
+school|university|2|Vanderbilt University|Vanderbilt
+school|university|2|Washington University in St. Louis|WashU,=WUSTL,Washington University in St Louis
+school|university|2|University of Notre Dame|Notre Dame
+school|university|2|Georgetown University|Georgetown
+school|university|2|University of Virginia|=UVA
+school|university|2|University of North Carolina at Chapel Hill|=UNC,UNC Chapel Hill
+school|university|2|Emory University|Emory
+school|university|2|Tufts University|Tufts
+school|university|2|Boston College|
+school|university|2|University of Wisconsin-Madison|UW-Madison,UW Madison,=University of Wisconsin
+school|university|2|University of Washington|=UW Seattle
+school|university|2|Purdue University|Purdue
+school|university|2|Imperial College London|Imperial College
+school|university|2|London School of Economics|=LSE,London School of Economics and Political Science
+school|university|2|ETH Zurich|=ETH
+school|university|2|University of Toronto|=UofT,U of T
+school|university|2|University of Waterloo|Waterloo
+school|university|2|Tsinghua University|Tsinghua
+school|university|2|Peking University|
+school|university|2|National University of Singapore|=NUS
+school|university|3|Pennsylvania State University|Penn State
+school|university|3|Ohio State University|Ohio State,The Ohio State University
+school|university|3|Boston University|=BU
+school|university|3|Northeastern University|Northeastern
+school|university|3|Rutgers University|Rutgers
+school|university|3|University of Maryland|=UMD,University of Maryland College Park
+school|university|3|University of Minnesota|
+school|university|3|Arizona State University|Arizona State,=ASU
+school|university|3|Texas A&M University|Texas A&M,=TAMU
+school|university|3|University of Florida|=UF
+school|university|3|Virginia Tech|Virginia Polytechnic Institute
+school|university|3|Indiana University|Kelley School of Business
+school|university|3|Syracuse University|Syracuse
+school|university|3|McGill University|McGill
+school|university|3|University of British Columbia|=UBC
+employer|tech|1|Google|Alphabet,Google DeepMind,DeepMind,Google LLC
+employer|tech|1|Meta|=Meta,Meta Platforms,Facebook
+employer|tech|1|Apple|=Apple,Apple Inc
+employer|tech|1|Amazon|=Amazon,Amazon Web Services,=AWS
+employer|tech|1|Microsoft|Microsoft Research
+employer|tech|1|Netflix|
+employer|tech|1|NVIDIA|
+employer|tech|1|OpenAI|
+employer|tech|1|Stripe|=Stripe
+employer|tech|1|SpaceX|
+employer|tech|2|Palantir|Palantir Technologies
+employer|tech|2|Databricks|
+employer|tech|2|Airbnb|
+employer|tech|2|Uber|=Uber,Uber Technologies
+employer|tech|2|LinkedIn|
+employer|tech|2|Salesforce|
+employer|tech|2|Tesla|=Tesla,Tesla Motors
+employer|tech|2|Oracle|=Oracle
+employer|tech|2|Adobe|=Adobe
+employer|tech|2|Intel|=Intel
+employer|tech|2|IBM|IBM Research
+employer|tech|3|Cisco|Cisco Systems
+employer|tech|3|Qualcomm|
+employer|tech|3|AMD|Advanced Micro Devices
+employer|tech|3|Dell|=Dell,Dell Technologies
+employer|trading|1|Jane Street|Jane Street Capital
+employer|trading|1|Citadel|=Citadel,Citadel Securities,Citadel LLC
+employer|trading|1|Two Sigma|
+employer|trading|1|D. E. Shaw|DE Shaw,D.E. Shaw,D. E. Shaw & Co
+employer|trading|1|Hudson River Trading|=HRT
+employer|trading|1|Jump Trading|
+employer|trading|1|Renaissance Technologies|
+employer|trading|2|Susquehanna International Group|Susquehanna,=SIG
+employer|trading|2|Optiver|
+employer|trading|2|IMC Trading|=IMC
+employer|trading|2|Point72|Point72 Asset Management
+employer|trading|2|Millennium Management|=Millennium
+employer|investment bank|1|Goldman Sachs|Goldman,Goldman Sachs & Co
+employer|investment bank|1|Morgan Stanley|
+employer|investment bank|1|J.P. Morgan|JP Morgan,JPMorgan,JPMorgan Chase,J.P. Morgan Chase,JP Morgan Chase,=Chase
+employer|investment bank|1|Centerview Partners|Centerview
+employer|investment bank|1|Evercore|
+employer|investment bank|2|Lazard|
+employer|investment bank|2|Moelis & Company|Moelis
+employer|investment bank|2|PJT Partners|
+employer|investment bank|2|Bank of America|=BofA,BofA Securities,Merrill Lynch,=Merrill
+employer|investment bank|2|Citi|=Citi,Citigroup,Citibank
+employer|investment bank|2|Barclays|
+employer|investment bank|2|UBS|=UBS
+employer|investment bank|2|Deutsche Bank|
+employer|bank|3|Wells Fargo|
+employer|bank|3|Capital One|
+employer|asset management|1|Bridgewater Associates|Bridgewater
+employer|asset management|2|BlackRock|
+employer|asset management|3|Fidelity Investments|=Fidelity
+employer|asset management|3|Vanguard|=Vanguard
+employer|private equity|1|Blackstone|
+employer|private equity|1|KKR|Kohlberg Kravis Roberts
+employer|private equity|1|Bain Capital|
+employer|private equity|2|Carlyle Group|=Carlyle,The Carlyle Group
+employer|private equity|2|Apollo Global Management|=Apollo
+employer|consulting|1|McKinsey & Company|McKinsey
+employer|consulting|1|Boston Consulting Group|=BCG
+employer|consulting|1|Bain & Company|=Bain,Bain and Co,Bain & Co
+employer|consulting|2|Oliver Wyman|
+employer|consulting|2|L.E.K. Consulting|LEK Consulting,L.E.K.
+employer|consulting|2|Kearney|=Kearney,A.T. Kearney
+employer|consulting|3|Deloitte|
+employer|consulting|3|PwC|PricewaterhouseCoopers
+employer|consulting|3|EY|=EY,Ernst & Young
+employer|consulting|3|KPMG|
+employer|consulting|3|Accenture|
+"""
+
+# Company suffixes dropped from the end of a name before matching
+_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "plc", "gmbh", "ag", "lp", "llp"}
+_DROP = re.compile(r"[.'’]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+logger = get_logger("entities")
+
+_dictionaries = {}
+_lock = threading.Lock()
+
+
+def normalize(name):
+    """Lowercase ASCII tokens of a name, without punctuation or trailing company suffixes."""
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    tokens = _SEPARATORS.sub(" ", _DROP.sub("", text.replace("&", " and "))).split()
+    while len(tokens) > 1 and tokens[-1] in _SUFFIXES:
+        tokens.pop()
+    return tuple(tokens)
+
+
+class _Matcher:
+    """Aho-Corasick automaton over tokens; finds the longest alias inside a name."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        # (alias length, entity) of the longest alias ending at each node
+        self.out = [None]
+
+    def add(self, tokens, entity):
+        node = 0
+        for token in tokens:
+            child = self.goto[node].get(token)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][token] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(None)
+            node = child
+        if self.out[node] is None:
+            self.out[node] = (len(tokens), entity)
+
+    def build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(token, 0)
+                self.fail[child] = target if target != child else 0
+                # A node's own alias is longer than any alias ending in its suffix
+                if self.out[child] is None:
+                    self.out[child] = self.out[self.fail[child]]
+
+    def search(self, tokens):
+        node = 0
+        best = None
+        for token in tokens:
+            while node and token not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(token, 0)
+            found = self.out[node]
+            if found is not None and (best is None or found[0] > best[0]):
+                best = found
+        return best[1] if best else None
+
+
+class EntityDictionary:
+    """Entities by alias, with a matcher for schools and one for every entity."""
+
+    def __init__(self, entries):
+        self.entities = []
+        self._exact = {SCHOOL: {}, EMPLOYER: {}}
+        self._matchers = {SCHOOL: _Matcher(), EMPLOYER: _Matcher()}
+        self._cache = {}
+        for entry in entries:
+            entity = {"name": entry["name"], "category": entry.get("category", ""), "tier": entry.get("tier")}
+            kind = entry.get("kind", EMPLOYER)
+            self.entities.append(entity)
+            # Schools also employ people (research assistants, lab staff)
+            aliases = [entry["name"]] + list(entry.get("aliases") or [])
+            # "=Apple" keeps the canonical name "Apple" from matching inside "Apple Valley Dental"
+            whole_only = {normalize(alias[1:]) for alias in aliases if alias.startswith("=")}
+            for lookup_kind in ((SCHOOL, EMPLOYER) if kind == SCHOOL else (EMPLOYER,)):
+                for alias in aliases:
+                    tokens = normalize(alias.lstrip("="))
+                    if not tokens:
+                        continue
+                    self._exact[lookup_kind].setdefault(tokens, entity)
+                    if tokens not in whole_only:
+                        self._matchers[lookup_kind].add(tokens, entity)
+        for matcher in self._matchers.values():
+            matcher.build()
+
+    def lookup(self, name, kind=EMPLOYER):
+        """The entity a school or employer name refers to, or None."""
+        key = (kind, name)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        tokens = normalize(name or "")
+        entity = self._exact[kind].get(tokens) or self._matchers[kind].search(tokens)
+        if len(self._cache) >= LOOKUP_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = entity
+        return entity
+
+
+def _builtin_entries():
+    entries = []
+    for line in _BUILTIN.strip().splitlines():
+        kind, category, tier, name, aliases = line.split("|")
+        entries.append({"kind": kind, "category": category, "tier": int(tier), "name": name,
+                        "aliases": [a.strip() for a in aliases.split(",") if a.strip()]})
+    return entries
+
+
+def dictionary():
+    """The current tenant's dictionary: built-ins plus entities.json (reloaded when the file changes)."""
+    path = tenant_path(ENTITIES_PATH)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    cached = _dictionaries.get(path)
+    if cached is None or cached[0] != mtime:
+        with _lock:
+            cached = _dictionaries.get(path)
+            if cached is None or cached[0] != mtime:
+                entries = {entry["name"]: entry for entry in _builtin_entries()}
+                if mtime is not None:
+                    try:
+                        with open(path) as f:
+                            entries.update((entry["name"], entry) for entry in json.load(f))
+                    except (OSError, ValueError, KeyError, TypeError):
+                        logger.exception("Ignoring invalid entity dictionary", extra={"path": path})
+                cached = _dictionaries[path] = (mtime, EntityDictionary(list(entries.values())))
+    return cached[1]
+
+
+def annotate_resume(parsed_data):
+    """Copy of a parsed resume with an `entity` on each recognised education and experience entry."""
+    if not isinstance(parsed_data, dict):
+        return parsed_data
+    entities = dictionary()
+    annotated = dict(parsed_data)
+    for section, field, kind in (("education", "institution", SCHOOL), ("experience", "company", EMPLOYER)):
+        entries = []
+        for entry in parsed_data.get(section) or []:
+            if isinstance(entry, dict):
+                entry = {k: v for k, v in entry.items() if k != "entity"}
+                entity = entities.lookup(entry.get(field) or "", kind)
+                if entity is not None:
+                    entry["entity"] = dict(entity)
+            entries.append(entry)
+        if section in parsed_data:
+            annotated[section] = entries
+    return annotated
+
+
+def strip_annotations(parsed_data):
+    """Copy of a parsed resume without the `entity` annotations."""
+    if not isinstance(parsed_data, dict):
+        return parsed_data
+    stripped = dict(parsed_data)
+    for section in ("education", "experience"):
+        if parsed_data.get(section):
+            stripped[section] = [
+                {k: v for k, v in entry.items() if k != "entity"} if isinstance(entry, dict) else entry
+                for entry in parsed_data[section]
+            ]
+    return stripped
+
+
+def resume_entities(parsed_data):
+    """{(kind, canonical name): tier} for the schools and employers on a resume."""
+    entities = dictionary()
+    found = {}
+    for section, field, kind in (("education", "institution", SCHOOL), ("experience", "company", EMPLOYER)):
+        for entry in (parsed_data or {}).get(section) or []:
+            entity = entities.lookup(entry.get(field) or "", kind) if isinstance(entry, dict) else None
+            if entity is not None:
+                found[(kind, entity["name"])] = entity["tier"]
+    return found
+
+
+def pedigree_summary(parsed_data):
+    """One line per school and employer: the name as written, and what it was matched to."""
+    entities = dictionary()
+    lines = []
+    for section, field, kind, label in (("education", "institution", SCHOOL, "Education"),
+                                        ("experience", "company", EMPLOYER, "Experience")):
+        names = []
+        for entry in (parsed_data or {}).get(section) or []:
+            name = entry.get(field) if isinstance(entry, dict) else None
+            if not name:
+                continue
+            entity = entities.lookup(name, kind)
+            if entity is None:
+                names.append(f'"{name}": not listed')
+            else:
+                names.append(f'"{name}": {entity["name"]} ({entity["category"]}, tier {entity["tier"]})')
+        if names:
+            lines.append(f"- {label}: " + "; ".join(names))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="School and employer dictionary")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    lookup_parser = subparsers.add_parser("lookup", help="Match names against the dictionary")
+    lookup_parser.add_argument("names", nargs="+")
+    lookup_parser.add_argument("--kind", choices=(SCHOOL, EMPLOYER), default=EMPLOYER)
+    parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    if args.tenant:
+        set_tenant(args.tenant)
+    entities = dictionary()
+    for name in args.names:
+        print(json.dumps({"name": name, "entity": entities.lookup(name, args.kind)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Streaming export of candidate records to CSV, JSONL or Parquet.
+
+Records are read one at a time from the store and flattened into columns
+(contact info, education/experience summaries, timeline flags, extracted
+scores), so memory stays constant regardless of how many candidates are
+exported.
+
+    python export.py candidates.csv
+    python export.py snapshot.parquet --since 2025-01-01 --min-score 60
+"""
+import argparse
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+from scoring import extract_scores
+from store import iter_candidates
+from tenancy import set_tenant
+from timeline import timeline_flags
+
+FORMATS = ("csv", "jsonl", "parquet")
+# Rows buffered per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 10_000
+
+COLUMNS = [
+    "candidate_id",
+    "timestamp",
+    "reason",
+    "test_type",
+    "name",
+    "email",
+    "phone",
+    "location",
+    "institutions",
+    "degrees",
+    "majors",
+    "graduation_dates",
+    "gpa",
+    "education_count",
+    "companies",
+    "positions",
+    "experience_count",
+    "responsibility_count",
+    "project_count",
+    "extracurricular_count",
+    "sports_count",
+    "skills",
+    "timeline_flags",
+    "questions_answered",
+    "questions_skipped",
+    "resume_score",
+    "reasoning_score",
+    "overall_score",
+    "skepticism_score",
+    "believability",
+    "role_depth",
+    "pedigree",
+    "impact",
+    "writing",
+    "consistency",
+    "trajectory",
+    "clarity",
+    "logic",
+    "originality",
+    "specificity",
+]
+NUMERIC_COLUMNS = {
+    "education_count", "experience_count", "responsibility_count", "project_count", "extracurricular_count",
+    "sports_count", "questions_answered", "questions_skipped", "resume_score", "reasoning_score",
+    "overall_score", "skepticism_score", "believability", "role_depth", "pedigree", "impact", "writing",
+    "consistency", "trajectory", "clarity", "logic", "originality", "specificity",
+}
+# Multi-valued columns are joined with this separator
+LIST_SEPARATOR = "; "
+
+
+def _join(values):
+    return LIST_SEPARATOR.join(str(v) for v in values if v)
+
+
+def flatten_candidate(candidate_data):
+    """Flatten a candidate record into a single row of scalar columns."""
+    resume = candidate_data.get("resume") or {}
+    contact_info = resume.get("contact_info") or {}
+    education = resume.get("education") or []
+    experience = resume.get("experience") or []
+    responses = candidate_data.get("responses") or {}
+    submitted = _parse_time(candidate_data.get("timestamp"))
+
+    row = {
+        "candidate_id": candidate_data.get("candidate_id"),
+        "timestamp": candidate_data.get("timestamp"),
+        "reason": candidate_data.get("reason"),
+        "test_type": candidate_data.get("test_type"),
+        "name": contact_info.get("name"),
+        "email": contact_info.get("email"),
+        "phone": contact_info.get("phone"),
+        "location": contact_info.get("location"),
+        "institutions": _join(e.get("institution") for e in education),
+        "degrees": _join(e.get("degree") for e in education),
+        "majors": _join(e.get("major") for e in education),
+        "graduation_dates": _join(e.get("graduation_date") for e in education),
+        "gpa": _join(e.get("gpa") for e in education),
+        "education_count": len(education),
+        "companies": _join(e.get("company") for e in experience),
+        "positions": _join(e.get("position") for e in experience),
+        "experience_count": len(experience),
+        "responsibility_count": sum(len(e.get("responsibilities") or []) for e in experience),
+        "project_count": len(resume.get("projects") or []),
+        "extracurricular_count": len(resume.get("extracurriculars") or []),
+        "sports_count": len(resume.get("sports") or []),
+        "skills": _join(item for group in resume.get("skills") or [] for item in group.get("items") or []),
+        "timeline_flags": _join(timeline_flags(resume, submitted.date() if submitted else None)),
+        "questions_answered": sum(1 for r in responses.values() if r and r != "[SKIPPED]"),
+        "questions_skipped": sum(1 for r in responses.values() if r == "[SKIPPED]"),
+    }
+    row.update(extract_scores(candidate_data))
+    return row
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def build_filter(since=None, until=None, reasons=None, score_field="resume_score", min_score=None, max_score=None):
+    """Return a predicate over flattened rows for date range, reason and score band."""
+    since, until = _parse_time(since), _parse_time(until)
+    reasons = set(reasons) if reasons else None
+
+    def predicate(row):
+        if since or until:
+            timestamp = _parse_time(row.get("timestamp"))
+            if timestamp is None or (since and timestamp < since) or (until and timestamp >= until):
+                return False
+        if reasons and row.get("reason") not in reasons:
+            return False
+        if min_score is not None or max_score is not None:
+            score = row.get(score_field)
+            if score is None or (min_score is not None and score < min_score) or (max_score is not None and score > max_score):
+                return False
+        return True
+
+    return predicate
+
+
+def iter_rows(predicate=None):
+    """Yield flattened rows from the store, one record in memory at a time."""
+    for candidate_data in iter_candidates():
+        row = flatten_candidate(candidate_data)
+        if predicate is None or predicate(row):
+            yield row
+
+
+def write_csv(rows, out):
+    writer = csv.DictWriter(out, fieldnames=COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, out):
+    count = 0
+    for row in rows:
+        out.write(json.dumps(row) + "\n")
+        count += 1
+    return count
+
+
+def write_parquet(rows, out, row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """Write rows as Parquet, flushing one row group at a time."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        (column, pa.float64() if column in NUMERIC_COLUMNS else pa.string()) for column in COLUMNS
+    ])
+    count = 0
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def export(rows, fmt, out):
+    """Write rows to a binary stream `out` in the given format; returns the row count."""
+    if fmt == "parquet":
+        return write_parquet(rows, out)
+    text_out = io.TextIOWrapper(out, encoding="utf-8", newline="")
+    try:
+        return write_csv(rows, text_out) if fmt == "csv" else write_jsonl(rows, text_out)
+    finally:
+        # Detach so closing the wrapper does not close the caller's stream
+        text_out.flush()
+        text_out.detach()
+
+
+def export_bytes(fmt, predicate=None):
+    """Export to an in-memory buffer, for browser downloads."""
+    buffer = io.BytesIO()
+    count = export(iter_rows(predicate), fmt, buffer)
+    return buffer.getvalue(), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export candidate data")
+    parser.add_argument("output", help="Output file; format is inferred from the extension unless --format is given")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--since", help="Only candidates at or after this ISO date/time")
+    parser.add_argument("--until", help="Only candidates before this ISO date/time")
+    parser.add_argument("--reason", action="append", help="Only candidates with this reason (repeatable)")
+    parser.add_argument("--score-field", default="resume_score",
+                        choices=[c for c in COLUMNS if c.endswith("_score")], help="Score used for the band filter")
+    parser.add_argument("--min-score", type=float)
+    parser.add_argument("--max-score", type=float)
+    parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    fmt = args.format or args.output.rsplit(".", 1)[-1].lower()
+    if fmt not in FORMATS:
+        parser.error(f"Cannot infer format from {args.output}; use --format")
+
+    if args.tenant:
+        set_tenant(args.tenant)
+    predicate = build_filter(args.since, args.until, args.reason, args.score_field, args.min_score, args.max_score)
+    with open(args.output, "wb") as out:
+        count = export(iter_rows(predicate), fmt, out)
+    print(f"Exported {count} candidates to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
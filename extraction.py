@@ -0,0 +1,274 @@
+"""Resume text extraction that reads document formats directly."""
+import hashlib
+import io
+import os
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from PyPDF2 import PdfReader
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+
+_W_P = f"{{{W_NS}}}p"
+_W_T = f"{{{W_NS}}}t"
+_W_TAB = f"{{{W_NS}}}tab"
+_W_BR = f"{{{W_NS}}}br"
+_W_CR = f"{{{W_NS}}}cr"
+_MC_FALLBACK = f"{{{MC_NS}}}Fallback"
+
+
+def _iter_docx_part_paragraphs(part):
+    """Yield paragraph texts of one WordprocessingML part in document order.
+
+    Streams with iterparse, so body paragraphs, table cells, text boxes and
+    header/footer content are all seen as w:p elements. Text boxes appear twice
+    (DrawingML inside mc:Choice and a VML copy inside mc:Fallback); the fallback
+    copy is skipped.
+    """
+    # Paragraphs nest when a text box is anchored inside a paragraph
+    stack = []
+    fallback_depth = 0
+    for event, elem in ET.iterparse(part, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _MC_FALLBACK:
+                fallback_depth += 1
+            elif tag == _W_P and not fallback_depth:
+                stack.append([])
+            continue
+
+        if tag == _MC_FALLBACK:
+            fallback_depth -= 1
+            elem.clear()
+        elif fallback_depth or not stack:
+            continue
+        elif tag == _W_T:
+            if elem.text:
+                stack[-1].append(elem.text)
+        elif tag == _W_TAB:
+            stack[-1].append("\t")
+        elif tag in (_W_BR, _W_CR):
+            stack[-1].append("\n")
+        elif tag == _W_P:
+            text = "".join(stack.pop()).strip()
+            # Free the subtree; everything needed has been collected
+            elem.clear()
+            if text:
+                yield text
+
+
+def _docx_parts(archive, prefix):
+    names = [n for n in archive.namelist() if n.startswith(f"word/{prefix}") and n.endswith(".xml")]
+    # header1.xml, header2.xml, ..., header10.xml
+    return sorted(names, key=lambda n: (len(n), n))
+
+
+def extract_docx_text(docx_file):
+    """Extract all text from a DOCX file: headers, body (incl. tables and text boxes), footers."""
+    lines = []
+    with zipfile.ZipFile(docx_file) as archive:
+        # Headers and footers often repeat per section; keep each distinct line once
+        seen_headers = set()
+        for name in _docx_parts(archive, "header"):
+            with archive.open(name) as part:
+                for text in _iter_docx_part_paragraphs(part):
+                    if text not in seen_headers:
+                        seen_headers.add(text)
+                        lines.append(text)
+
+        with archive.open("word/document.xml") as part:
+            lines.extend(_iter_docx_part_paragraphs(part))
+
+        seen_footers = set()
+        for name in _docx_parts(archive, "footer"):
+            with archive.open(name) as part:
+                for text in _iter_docx_part_paragraphs(part):
+                    if text not in seen_footers:
+                        seen_footers.add(text)
+                        lines.append(text)
+    return "\n".join(lines)
+
+
+# --- PDF -----------------------------------------------------------------
+
+# "columns" reorders text runs by layout; "plain" is PyPDF2's own stream order
+PDF_LAYOUT = os.environ.get("OMNISIGHT_PDF_LAYOUT", "columns")
+PDF_CACHE_SIZE = int(os.environ.get("OMNISIGHT_PDF_CACHE_SIZE", 128))
+# Narrowest vertical gap (pt) treated as a column gutter
+GUTTER_MIN_WIDTH = 12
+# Average glyph width as a fraction of font size, used to estimate run extents
+AVG_CHAR_WIDTH = 0.5
+# Fewest runs each side of a gutter must hold, so stray margin items (page
+# numbers, icons) do not make a column
+MIN_COLUMN_RUNS = 3
+# Share of a side's lines that must directly follow the previous one (within
+# two font sizes). Columns are runs of consecutive lines; right-aligned dates
+# in a single-column resume are isolated and fail this.
+MIN_CONSECUTIVE_SHARE = 0.5
+MAX_COLUMN_DEPTH = 2
+
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+
+
+def _collect_pdf_runs(page):
+    """Return positioned text runs (x, y, width, size, text) for one page."""
+    runs = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        # Text space -> user space: the text matrix applied through the CTM
+        x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        size = abs(font_size * tm[3] * cm[3]) or font_size or 10
+        for i, piece in enumerate(text.split("\n")):
+            piece = piece.strip()
+            if piece:
+                runs.append((x, y - i * size, len(piece) * size * AVG_CHAR_WIDTH, size, piece))
+
+    page.extract_text(visitor_text=visitor)
+    return runs
+
+
+def _group_lines(runs):
+    """Group runs sharing a baseline into lines, top to bottom, each sorted left to right."""
+    lines = []
+    for run in sorted(runs, key=lambda r: (-r[1], r[0])):
+        if lines and abs(lines[-1][0] - run[1]) <= run[3] * 0.4:
+            lines[-1][1].append(run)
+        else:
+            lines.append((run[1], [run]))
+    return [sorted(line, key=lambda r: r[0]) for _, line in lines]
+
+
+def _find_gutter(runs):
+    """Return (left, right) x bounds of the widest column gutter, or None."""
+    if len(runs) < 4:
+        return None
+    start = int(min(r[0] for r in runs))
+    end = int(max(r[0] + r[2] for r in runs)) + 1
+    # Coverage of each 1pt bin by run extents, via a difference array
+    delta = [0] * (end - start + 2)
+    for x, _, width, _, _ in runs:
+        delta[int(x) - start] += 1
+        delta[int(x + width) - start + 1] -= 1
+    # Headings spanning both columns may cross the gutter
+    allowed = max(1, len(runs) // 20)
+    span = end - start
+    best = None
+    covered, gap_start = 0, None
+    for i in range(span + 1):
+        covered += delta[i]
+        interior = 0.15 * span <= i <= 0.85 * span
+        if covered <= allowed and interior:
+            if gap_start is None:
+                gap_start = i
+        elif gap_start is not None:
+            if i - gap_start >= GUTTER_MIN_WIDTH and (best is None or i - gap_start > best[1] - best[0]):
+                best = (gap_start, i)
+            gap_start = None
+    if best is None:
+        return None
+
+    left, right = best[0] + start, best[1] + start
+    if not (_is_column([r for r in runs if r[0] + r[2] <= left])
+            and _is_column([r for r in runs if r[0] >= right])):
+        return None
+    return left, right
+
+
+def _is_column(runs):
+    if len(runs) < MIN_COLUMN_RUNS:
+        return False
+    runs = sorted(runs, key=lambda r: -r[1])
+    consecutive = sum(1 for a, b in zip(runs, runs[1:]) if a[1] - b[1] <= 2 * a[3])
+    return consecutive / (len(runs) - 1) >= MIN_CONSECUTIVE_SHARE
+
+
+def _layout_lines(runs, depth=0):
+    """Order runs into text lines, reading each column top to bottom.
+
+    Lines with a run bridging the gutter (a name banner or full-width heading)
+    split the page into bands; within a band the left column is read before
+    the right one.
+    """
+    gutter = _find_gutter(runs) if depth < MAX_COLUMN_DEPTH else None
+    if gutter is None:
+        return [" ".join(r[4] for r in line) for line in _group_lines(runs)]
+
+    left_edge, right_edge = gutter
+    out, left, right = [], [], []
+
+    def flush():
+        out.extend(_layout_lines(left, depth + 1))
+        out.extend(_layout_lines(right, depth + 1))
+        left.clear()
+        right.clear()
+
+    for line in _group_lines(runs):
+        if any(r[0] < left_edge and r[0] + r[2] > right_edge for r in line):
+            flush()
+            out.append(" ".join(r[4] for r in line))
+            continue
+        for run in line:
+            # Width is an estimate, so a run is placed by where it starts
+            (left if run[0] < left_edge else right).append(run)
+    flush()
+    return out
+
+
+def _pdf_pages(data, layout):
+    reader = PdfReader(io.BytesIO(data))
+    pages = []
+    for page in reader.pages:
+        if layout == "columns":
+            runs = _collect_pdf_runs(page)
+            # Pages without positioned runs (e.g. odd encodings) fall back to stream order
+            pages.append("\n".join(_layout_lines(runs)) if runs else page.extract_text() or "")
+        else:
+            pages.append(page.extract_text() or "")
+    return pages
+
+
+def _pdf_text(data, layout):
+    return "\n".join(_pdf_pages(data, layout)).strip()
+
+
+def _read_bytes(file):
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if hasattr(file, "read"):
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return file.read()
+    with open(file, "rb") as f:
+        return f.read()
+
+
+def extract_pdf_pages(pdf_file, layout=None):
+    """Extract the text layer of each page of a PDF, in column reading order unless layout="plain".
+
+    Results are cached in-process by content hash, so re-extracting the same
+    upload (e.g. on a Streamlit rerun) is free.
+    """
+    layout = layout or PDF_LAYOUT
+    data = _read_bytes(pdf_file)
+    key = (hashlib.sha256(data).hexdigest(), layout)
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            return _pdf_cache[key]
+
+    pages = _pdf_pages(data, layout)
+    with _pdf_cache_lock:
+        _pdf_cache[key] = pages
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)
+    return pages
+
+
+def extract_pdf_text(pdf_file, layout=None):
+    """Extract text from a PDF, in column reading order unless layout="plain"."""
+    return "\n".join(extract_pdf_pages(pdf_file, layout)).strip()
@@ -0,0 +1,272 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# USD per 1M tokens: (prompt, cached prompt, completion)
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+# Number of finished spans kept in memory for the Ops page and exporters
+SPAN_BUFFER_SIZE = 5000
+
+_current_span = contextvars.ContextVar("omnisight_current_span", default=None)
+
+
+class Span:
+    """A single timed pipeline stage with token usage and cost attributes."""
+
+    def __init__(self, stage, parent=None, **attributes):
+        self.stage = stage
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.duration = None
+        self.error = None
+        self._start_perf = time.perf_counter()
+
+    def set(self, key, value):
+        """Attach an attribute (model, cache_hit, ...) to the span."""
+        self.attributes[key] = value
+
+    def record_usage(self, completion, model=None):
+        """Record token usage and cost from an OpenAI chat completion."""
+        model = model or getattr(completion, "model", None)
+        usage = getattr(completion, "usage", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+
+        # A stage may make several calls (e.g. retries), so accumulate
+        self.attributes["model"] = model
+        self.attributes["prompt_tokens"] = self.attributes.get("prompt_tokens", 0) + prompt_tokens
+        self.attributes["completion_tokens"] = self.attributes.get("completion_tokens", 0) + completion_tokens
+        self.attributes["cached_tokens"] = self.attributes.get("cached_tokens", 0) + cached_tokens
+        self.attributes["cost_usd"] = self.attributes.get("cost_usd", 0.0) + estimate_cost(
+            model, prompt_tokens, completion_tokens, cached_tokens
+        )
+
+    def finish(self, error=None):
+        self.duration = time.perf_counter() - self._start_perf
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self):
+        return {
+            "stage": self.stage,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": dict(self.attributes),
+        }
+
+
+class SpanRecorder:
+    """Thread-safe rolling buffer of finished spans shared by all sessions."""
+
+    def __init__(self, maxlen=SPAN_BUFFER_SIZE):
+        self._spans = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        # Lifetime totals for Prometheus counters, unaffected by the rolling window
+        self._totals = {}
+
+    def add(self, span):
+        with self._lock:
+            self._spans.append(span)
+            totals = self._totals.setdefault(span.stage, {
+                "count": 0, "errors": 0, "duration_sum": 0.0, "prompt_tokens": 0,
+                "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0, "cache_hits": 0,
+            })
+            totals["count"] += 1
+            totals["errors"] += 1 if span.error else 0
+            totals["duration_sum"] += span.duration
+            totals["cache_hits"] += 1 if span.attributes.get("cache_hit") else 0
+            for key in ("prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd"):
+                totals[key] += span.attributes.get(key, 0) or 0
+
+    def spans(self, window_seconds=None):
+        """Return finished spans, optionally limited to the last window_seconds."""
+        with self._lock:
+            spans = list(self._spans)
+        if window_seconds is None:
+            return spans
+        cutoff = time.time_ns() - int(window_seconds * 1e9)
+        return [s for s in spans if s.end_ns >= cutoff]
+
+    def totals(self):
+        with self._lock:
+            return {stage: dict(values) for stage, values in self._totals.items()}
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._totals.clear()
+
+
+recorder = SpanRecorder()
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """Estimate the USD cost of a call from the pricing table."""
+    pricing = MODEL_PRICING.get(model or "")
+    if pricing is None:
+        # Dated snapshots such as gpt-4o-mini-2024-07-18 share the base price
+        pricing = next((p for name, p in MODEL_PRICING.items() if (model or "").startswith(name)), None)
+    if pricing is None:
+        return 0.0
+    prompt_price, cached_price, completion_price = pricing
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * prompt_price + cached_tokens * cached_price + completion_tokens * completion_price) / 1_000_000
+
+
+@contextmanager
+def span(stage, **attributes):
+    """Time a pipeline stage; nested spans share the enclosing trace."""
+    current = Span(stage, parent=_current_span.get(), **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(error=e)
+        raise
+    else:
+        current.finish()
+    finally:
+        _current_span.reset(token)
+        recorder.add(current)
+
+
+def current_span():
+    """Return the innermost active span, or None outside of any span."""
+    return _current_span.get()
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of a list of numbers (q in 0-100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def stage_summary(window_seconds=None):
+    """Aggregate latency percentiles, tokens and cost per stage."""
+    by_stage = {}
+    for s in recorder.spans(window_seconds):
+        by_stage.setdefault(s.stage, []).append(s)
+
+    summary = []
+    for stage, spans in sorted(by_stage.items()):
+        durations = [s.duration for s in spans]
+        summary.append({
+            "stage": stage,
+            "count": len(spans),
+            "p50_s": round(percentile(durations, 50), 3),
+            "p95_s": round(percentile(durations, 95), 3),
+            "max_s": round(max(durations), 3),
+            "errors": sum(1 for s in spans if s.error),
+            "cache_hits": sum(1 for s in spans if s.attributes.get("cache_hit")),
+            "prompt_tokens": sum(s.attributes.get("prompt_tokens", 0) for s in spans),
+            "completion_tokens": sum(s.attributes.get("completion_tokens", 0) for s in spans),
+            "cached_tokens": sum(s.attributes.get("cached_tokens", 0) for s in spans),
+            "cost_usd": round(sum(s.attributes.get("cost_usd", 0.0) for s in spans), 6),
+        })
+    return summary
+
+
+def _prom_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(window_seconds=None):
+    """Render this process's stage metrics in the Prometheus text exposition format.
+
+    The duration summary (quantiles, _sum and _count) covers the buffered spans
+    in the window; the _total counters are lifetime totals.
+    """
+    lines = [
+        "# HELP omnisight_stage_duration_seconds Wall time per pipeline stage.",
+        "# TYPE omnisight_stage_duration_seconds summary",
+    ]
+    by_stage = {}
+    for s in recorder.spans(window_seconds):
+        by_stage.setdefault(s.stage, []).append(s.duration)
+    totals = recorder.totals()
+
+    for stage, durations in sorted(by_stage.items()):
+        label = _prom_label(stage)
+        for q in (0.5, 0.95, 0.99):
+            lines.append(f'omnisight_stage_duration_seconds{{stage="{label}",quantile="{q}"}} {percentile(durations, q * 100):.6f}')
+        lines.append(f'omnisight_stage_duration_seconds_sum{{stage="{label}"}} {sum(durations):.6f}')
+        lines.append(f'omnisight_stage_duration_seconds_count{{stage="{label}"}} {len(durations)}')
+
+    counters = [
+        ("omnisight_stage_errors_total", "errors", "Failed stage executions."),
+        ("omnisight_stage_cache_hits_total", "cache_hits", "Stage executions served from cache."),
+        ("omnisight_prompt_tokens_total", "prompt_tokens", "Prompt tokens sent to the model."),
+        ("omnisight_completion_tokens_total", "completion_tokens", "Completion tokens returned by the model."),
+        ("omnisight_cached_tokens_total", "cached_tokens", "Prompt tokens served from the provider cache."),
+        ("omnisight_cost_usd_total", "cost_usd", "Estimated model spend in USD."),
+    ]
+    for name, key, help_text in counters:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for stage, values in sorted(totals.items()):
+            lines.append(f'{name}{{stage="{_prom_label(stage)}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp_json(window_seconds=None, service_name="omnisight"):
+    """Render spans as an OTLP/JSON trace export payload."""
+    spans = []
+    for s in recorder.spans(window_seconds):
+        attributes = [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items() if v is not None]
+        otlp_span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.stage,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": attributes,
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        spans.append(otlp_span)
+
+    return json.dumps({
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "omnisight.instrumentation"}, "spans": spans}],
+        }]
+    })
@@ -0,0 +1,617 @@
+"""Durable SQLite-backed job queue with checkpointed pipeline stages.
+
+Every pipeline stage result is stored under an idempotent (job_id, stage_key)
+checkpoint, so a job interrupted by a crash, restart or dead Streamlit session
+resumes from the last completed stage instead of paying for the model calls
+again. Workers in several processes on the same machine can share one queue
+file; jobs are claimed with a lease that another worker takes over if it
+expires.
+
+Run workers with:
+
+    python jobqueue.py worker --processes 4
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+
+import admission
+import archive
+from app_logging import configure_logging, get_logger
+import entities
+import models
+import ocr
+from pipeline import (
+    extract_text_from_docx,
+    extract_text_from_pdf,
+    generate_combined_evaluation,
+    generate_overall_assessment,
+    get_completion_evaluation,
+    is_error_result,
+    parse_resume,
+    parser_version,
+    run_primary_evaluator,
+    run_skeptic_evaluator,
+    run_synthesizer,
+    stamp_prompt_versions,
+)
+import prescreen
+from store import save_candidate_to_file
+from tenancy import DEFAULT_TENANT, current_tenant, data_path, use_tenant
+import timeline
+import upload_cache
+
+# Relative to OMNISIGHT_DATA_DIR; one queue serves every tenant
+QUEUE_DB_PATH = os.environ.get("OMNISIGHT_QUEUE_DB", "jobs.sqlite3")
+LEASE_SECONDS = int(os.environ.get("OMNISIGHT_QUEUE_LEASE_SECONDS", 120))
+MAX_ATTEMPTS = int(os.environ.get("OMNISIGHT_QUEUE_MAX_ATTEMPTS", 3))
+POLL_INTERVAL_SECONDS = 1.0
+WEBHOOK_TIMEOUT_SECONDS = 10
+
+# Job statuses. Interactive jobs are driven by a UI session and never claimed by workers.
+# Deferred jobs (prescreened clear rejects) are claimed only when nothing is queued.
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+INTERACTIVE = "interactive"
+DEFERRED = "deferred"
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+# Checkpoint holding the upload's content hash (its key in the upload cache)
+UPLOAD_HASH_STAGE = "upload_hash"
+
+logger = get_logger("jobqueue")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    current_stage TEXT,
+    candidate_id TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim_idx ON jobs (status, lease_expires, created_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    job_id TEXT NOT NULL,
+    stage_key TEXT NOT NULL,
+    result TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage_key)
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    job_id TEXT PRIMARY KEY,
+    filename TEXT,
+    content_type TEXT,
+    data BLOB NOT NULL
+);
+"""
+
+_local = threading.local()
+
+
+def _connect():
+    """Return this thread's connection to the queue database."""
+    path = data_path(QUEUE_DB_PATH)
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+        _local.path = path
+    return conn
+
+
+def _migrate(conn):
+    """Add the tenant column to queues created before tenants existed."""
+    columns = [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]
+    if columns and "tenant" not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN tenant TEXT NOT NULL DEFAULT ''")
+        conn.execute("UPDATE jobs SET tenant = ?", (DEFAULT_TENANT,))
+
+
+def _job_dict(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+def enqueue(payload, job_id=None, status=QUEUED, upload=None):
+    """Create a job for the current tenant; re-enqueueing an existing job_id is a no-op.
+
+    `upload` is an optional (filename, content_type, bytes) tuple.
+    """
+    job_id = job_id or str(uuid.uuid4())
+    now = time.time()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            """INSERT OR IGNORE INTO jobs (job_id, status, tenant, payload, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (job_id, status, current_tenant(), json.dumps(payload), now, now),
+        )
+        if upload is not None:
+            filename, content_type, data = upload
+            conn.execute(
+                "INSERT OR IGNORE INTO uploads (job_id, filename, content_type, data) VALUES (?, ?, ?, ?)",
+                (job_id, filename, content_type, data),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return job_id
+
+
+def get_job(job_id, tenant=None):
+    """Return a job, or None; with `tenant`, jobs of other tenants are not found."""
+    row = _connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    job = _job_dict(row)
+    if job is not None and tenant is not None and job["tenant"] != tenant:
+        return None
+    return job
+
+
+def queue_depth():
+    """Count jobs per status."""
+    rows = _connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+    return {row["status"]: row["n"] for row in rows}
+
+
+def claim(worker_id, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """Atomically claim the oldest queued job, or a running job whose lease expired; deferred jobs go last.
+
+    A job whose lease expired after its last attempt (its worker crashed every
+    time, e.g. out of memory) fails instead of taking down another worker.
+    """
+    now = time.time()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            """UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+               WHERE status = ? AND lease_expires < ? AND attempts >= ?""",
+            (FAILED, "Worker lease expired on every attempt", now, RUNNING, now, max_attempts),
+        )
+        row = conn.execute(
+            """SELECT job_id FROM jobs
+               WHERE status IN (?, ?) OR (status = ? AND lease_expires < ?)
+               ORDER BY status = ?, created_at LIMIT 1""",
+            (QUEUED, DEFERRED, RUNNING, now, DEFERRED),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            """UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+               WHERE job_id = ?""",
+            (RUNNING, worker_id, now + lease_seconds, now, row["job_id"]),
+        )
+        job = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return _job_dict(job)
+
+
+def heartbeat(job_id, worker_id, lease_seconds=LEASE_SECONDS):
+    """Extend a lease; returns False if the job was taken over by another worker."""
+    cursor = _connect().execute(
+        "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE job_id = ? AND lease_owner = ? AND status = ?",
+        (time.time() + lease_seconds, time.time(), job_id, worker_id, RUNNING),
+    )
+    return cursor.rowcount == 1
+
+
+def set_stage(job_id, stage_key):
+    _connect().execute(
+        "UPDATE jobs SET current_stage = ?, updated_at = ? WHERE job_id = ?", (stage_key, time.time(), job_id)
+    )
+
+
+def _owned(worker_id):
+    """SQL condition and parameters limiting an update to the lease owner's job (any job without worker_id)."""
+    return (" AND lease_owner = ?", (worker_id,)) if worker_id else ("", ())
+
+
+def complete(job_id, candidate_id=None, worker_id=None):
+    """Mark a job completed; with worker_id, only while that worker holds the lease. Returns whether it did."""
+    owned, params = _owned(worker_id)
+    conn = _connect()
+    cursor = conn.execute(
+        f"""UPDATE jobs SET status = ?, candidate_id = COALESCE(?, candidate_id), lease_owner = NULL,
+           lease_expires = NULL, error = NULL, updated_at = ? WHERE job_id = ?{owned}""",
+        (COMPLETED, candidate_id, time.time(), job_id, *params),
+    )
+    if cursor.rowcount != 1:
+        return False
+    conn.execute("DELETE FROM uploads WHERE job_id = ?", (job_id,))
+    return True
+
+
+def defer(job_id, status=DEFERRED, worker_id=None):
+    """Give back a claimed job without using up an attempt.
+
+    It goes to the low-priority batch (prescreened rejects), or with
+    status=QUEUED back to the queue (its model calls were shed under load).
+    """
+    owned, params = _owned(worker_id)
+    _connect().execute(
+        f"""UPDATE jobs SET status = ?, attempts = attempts - 1, lease_owner = NULL, lease_expires = NULL,
+           updated_at = ? WHERE job_id = ?{owned}""",
+        (status, time.time(), job_id, *params),
+    )
+
+
+def fail(job_id, error, max_attempts=MAX_ATTEMPTS, worker_id=None):
+    """Record a failure; the job is re-queued until it runs out of attempts. Returns the job's status.
+
+    With worker_id, a worker whose lease was taken over leaves the job to its
+    new owner and gets None.
+    """
+    owned, params = _owned(worker_id)
+    conn = _connect()
+    cursor = conn.execute(
+        f"""UPDATE jobs SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, error = ?,
+           lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE job_id = ?{owned}""",
+        (max_attempts, QUEUED, FAILED, error, time.time(), job_id, *params),
+    )
+    if cursor.rowcount != 1:
+        return None
+    return get_job(job_id)["status"]
+
+
+def purge_candidate_inputs(candidate_id, tenant=None):
+    """Delete the raw resume kept by a candidate's jobs and the upload cache; returns the job ids.
+
+    That is the upload, extracted text, parse and pasted text of each job, and
+    the upload cache's text and parses of the same resume.
+    """
+    tenant = tenant or current_tenant()
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT job_id, payload FROM jobs WHERE tenant = ? AND (job_id = ? OR candidate_id = ?)",
+        (tenant, candidate_id, candidate_id),
+    ).fetchall()
+    for row in rows:
+        payload = json.loads(row["payload"])
+        text = payload.pop("resume_text", None)
+        with use_tenant(tenant):
+            upload_cache.purge(get_checkpoint(row["job_id"], UPLOAD_HASH_STAGE),
+                               [text, get_checkpoint(row["job_id"], "extract")])
+        conn.execute("DELETE FROM uploads WHERE job_id = ?", (row["job_id"],))
+        conn.execute("DELETE FROM checkpoints WHERE job_id = ? AND stage_key IN ('extract', 'parse', ?)",
+                     (row["job_id"], UPLOAD_HASH_STAGE))
+        if text is not None:
+            conn.execute("UPDATE jobs SET payload = ? WHERE job_id = ?", (json.dumps(payload), row["job_id"]))
+    return [row["job_id"] for row in rows]
+
+
+def get_upload(job_id):
+    row = _connect().execute(
+        "SELECT filename, content_type, data FROM uploads WHERE job_id = ?", (job_id,)
+    ).fetchone()
+    return (row["filename"], row["content_type"], bytes(row["data"])) if row else None
+
+
+def get_checkpoint(job_id, stage_key, default=None):
+    row = _connect().execute(
+        "SELECT result FROM checkpoints WHERE job_id = ? AND stage_key = ?", (job_id, stage_key)
+    ).fetchone()
+    return json.loads(row["result"]) if row else default
+
+
+def put_checkpoint(job_id, stage_key, result):
+    """Store a stage result; the first writer wins so stages stay idempotent."""
+    _connect().execute(
+        "INSERT OR IGNORE INTO checkpoints (job_id, stage_key, result, completed_at) VALUES (?, ?, ?, ?)",
+        (job_id, stage_key, json.dumps(result), time.time()),
+    )
+    return get_checkpoint(job_id, stage_key)
+
+
+def load_checkpoints(job_id):
+    """Return every completed stage of a job as {stage_key: result}."""
+    rows = _connect().execute(
+        "SELECT stage_key, result FROM checkpoints WHERE job_id = ? ORDER BY completed_at", (job_id,)
+    ).fetchall()
+    return {row["stage_key"]: json.loads(row["result"]) for row in rows}
+
+
+def checkpointed(job_id, stage_key, fn):
+    """Return the stored result for a stage, or run fn and checkpoint its result.
+
+    Failed results (None or "Error..." strings) are returned but not stored,
+    so the stage is retried on the next attempt.
+    """
+    result = get_checkpoint(job_id, stage_key)
+    if result is not None:
+        return result
+    set_stage(job_id, stage_key)
+    result = fn()
+    if result is None or is_error_result(result):
+        return result
+    return put_checkpoint(job_id, stage_key, result)
+
+
+def evaluate_resume(job_id, parsed_data):
+    """Run (or resume) the three resume agents of a job, checkpointing each.
+
+    Returns (primary, skeptic, synthesizer) outputs; on failure the first
+    element is the error string and the others are empty.
+    """
+    primary_output = checkpointed(job_id, "primary", lambda: run_primary_evaluator(parsed_data))
+    if is_error_result(primary_output):
+        return primary_output, "", ""
+    skeptic_output = checkpointed(job_id, "skeptic", lambda: run_skeptic_evaluator(parsed_data, primary_output))
+    if is_error_result(skeptic_output):
+        return skeptic_output, "", ""
+    synthesizer_output = checkpointed(
+        job_id, "synthesizer", lambda: run_synthesizer(parsed_data, primary_output, skeptic_output))
+    if is_error_result(synthesizer_output):
+        return synthesizer_output, "", ""
+    return primary_output, skeptic_output, synthesizer_output
+
+
+def grade_stage_key(question_id):
+    return f"grade:{question_id}"
+
+
+def grade_answer(answer):
+    """Grade one reasoning answer; the checkpoint keeps the answer with its evaluation."""
+    evaluation = get_completion_evaluation(answer)
+    if is_error_result(evaluation):
+        return evaluation
+    return {"response": answer, "evaluation": evaluation}
+
+
+def extract_upload_text(filename, content_type, data):
+    """Extract resume text from uploaded bytes based on MIME type or extension."""
+    name = (filename or "").lower()
+    if content_type == PDF_MIME or name.endswith(".pdf"):
+        return extract_text_from_pdf(io.BytesIO(data))
+    if content_type == DOCX_MIME or name.endswith(".docx"):
+        return extract_text_from_docx(io.BytesIO(data))
+    raise ValueError("Unsupported file type; upload a PDF or DOCX")
+
+
+def extract_upload_text_cached(upload_hash, filename, content_type, data, job_id=None):
+    """extract_upload_text, cached by the upload's content hash across sessions.
+
+    The hash is kept with job_id's checkpoints, so a PII purge can find the cache entries.
+    """
+    if job_id:
+        put_checkpoint(job_id, UPLOAD_HASH_STAGE, upload_hash)
+    key = upload_cache.text_key(upload_hash, ocr.cache_variant())
+    return upload_cache.cached(key, lambda: extract_upload_text(filename, content_type, data))
+
+
+def parse_resume_cached(resume_text):
+    """parse_resume, cached by the text's hash and the parser prompt version, with entity and timeline annotations."""
+    key = upload_cache.parse_key(resume_text, parser_version())
+    # Annotated after the cache, so dictionary edits apply without parsing again
+    # and a resubmitted resume's timeline is as of the resubmission
+    parsed_data = upload_cache.cached(key, lambda: parse_resume(resume_text))
+    # Parses cached before the data model was versioned are upgraded here
+    try:
+        parsed_data = models.canonical_resume(parsed_data)
+    except models.SchemaError:
+        logger.exception("Cached parse does not match the data model")
+        return None
+    return timeline.annotate_resume(entities.annotate_resume(parsed_data))
+
+
+def process_job(job):
+    """Run (or resume) every pipeline stage of a queued evaluation job in its tenant's namespace."""
+    with use_tenant(job["tenant"]), admission.use_priority(admission.UPLOAD), \
+            admission.use_user(job["payload"].get("user")):
+        return _process_job(job)
+
+
+class JobDeferred(Exception):
+    """Raised by a job that the prescreen moved to the low-priority batch."""
+
+
+def _process_job(job):
+    job_id = job["job_id"]
+    payload = job["payload"]
+
+    def stage(stage_key, fn):
+        result = checkpointed(job_id, stage_key, fn)
+        if result is None or is_error_result(result):
+            raise RuntimeError(result or f"Stage {stage_key} failed")
+        return result
+
+    def extract():
+        upload = get_upload(job_id)
+        if upload:
+            filename, content_type, data = upload
+            text = extract_upload_text_cached(upload_cache.content_hash(data), filename, content_type, data, job_id)
+        else:
+            text = payload.get("resume_text", "")
+        if not text.strip():
+            raise ValueError("No resume text could be extracted")
+        return text
+
+    resume_text = stage("extract", extract)
+    parsed_data = stage("parse", lambda: parse_resume_cached(resume_text))
+    screening = stage("prescreen", lambda: prescreen.prescreen(parsed_data))
+    if screening["action"] == prescreen.DEFER and get_checkpoint(job_id, "deferred") is None:
+        put_checkpoint(job_id, "deferred", screening)
+        raise JobDeferred(f"Predicted resume score {screening['predicted_score']}")
+    if screening["action"] == prescreen.SKIP:
+        primary_output = skeptic_output = synthesizer_output = ""
+    else:
+        primary_output, skeptic_output, synthesizer_output = evaluate_resume(job_id, parsed_data)
+    if is_error_result(primary_output):
+        raise RuntimeError(primary_output)
+
+    responses = payload.get("responses") or {}
+    evaluations = {}
+    for q_id, answer in responses.items():
+        evaluations[q_id] = stage(grade_stage_key(q_id), lambda answer=answer: grade_answer(answer))["evaluation"]
+    final_evaluation = stage("combined", lambda: generate_combined_evaluation(responses, evaluations)) if responses else ""
+
+    candidate_data = {
+        "candidate_id": payload.get("candidate_id") or job_id,
+        "reason": payload.get("reason", "API"),
+        "test_type": "reasoning",
+        "resume": parsed_data,
+        "responses": responses,
+        "evaluations": evaluations,
+        "final_evaluation": final_evaluation,
+        "resume_synthesis": synthesizer_output,
+        "primary_evaluator_output": primary_output,
+        "skeptic_evaluator_output": skeptic_output,
+    }
+    if screening["action"] == prescreen.SKIP:
+        candidate_data["prescreen"] = screening
+    else:
+        candidate_data["overall_assessment"] = stage("overall", lambda: generate_overall_assessment(candidate_data))
+    stamp_prompt_versions(candidate_data)
+    return stage("save", lambda: save_candidate_to_file(candidate_data))
+
+
+def post_webhook(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}, method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT_SECONDS) as response:
+        return response.status
+
+
+def job_status(job):
+    """Public view of a job for API responses and webhooks."""
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "stage": job["current_stage"],
+        "attempts": job["attempts"],
+        "candidate_id": job["candidate_id"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+def _keep_lease(job_id, worker_id, stop):
+    while not stop.wait(LEASE_SECONDS / 3):
+        if not heartbeat(job_id, worker_id):
+            logger.warning("Lost lease on job", extra={"job_id": job_id, "worker_id": worker_id})
+            return
+
+
+def run_one(worker_id):
+    """Claim and process a single job. Returns False when the queue is empty."""
+    job = claim(worker_id)
+    if job is None:
+        return False
+
+    stop = threading.Event()
+    keeper = threading.Thread(target=_keep_lease, args=(job["job_id"], worker_id, stop), daemon=True)
+    keeper.start()
+    admission.clear_shed()
+    owner = True
+    try:
+        candidate_id = process_job(job)
+        owner = complete(job["job_id"], candidate_id, worker_id)
+        if owner:
+            logger.info("Job completed", extra={"job_id": job["job_id"], "candidate_id": candidate_id})
+        else:
+            logger.warning("Job taken over before it completed", extra={"job_id": job["job_id"]})
+    except JobDeferred as e:
+        defer(job["job_id"], worker_id=worker_id)
+        logger.info("Job deferred", extra={"job_id": job["job_id"], "reason": str(e)})
+    except Exception as e:
+        if admission.was_shed():
+            # Overload is not the job's fault; its checkpoints keep the finished stages
+            defer(job["job_id"], QUEUED, worker_id)
+            logger.warning("Job requeued under load", extra={"job_id": job["job_id"], "error": str(e)})
+        else:
+            status = fail(job["job_id"], str(e), worker_id=worker_id)
+            owner = status is not None
+            logger.exception("Job failed", extra={"job_id": job["job_id"], "requeued": status == QUEUED})
+    finally:
+        stop.set()
+        keeper.join()
+
+    job = get_job(job["job_id"])
+    webhook_url = job["payload"].get("webhook_url")
+    # A job taken over is reported by its new owner
+    if webhook_url and owner and job["status"] in (COMPLETED, FAILED):
+        try:
+            post_webhook(webhook_url, job_status(job))
+        except Exception:
+            logger.exception("Webhook delivery failed", extra={"job_id": job["job_id"]})
+    return True
+
+
+def run_worker(worker_id=None, stop_event=None, poll_interval=POLL_INTERVAL_SECONDS):
+    """Process jobs until stop_event is set, sleeping while the queue is empty."""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    stop_event = stop_event or threading.Event()
+    logger.info("Worker started", extra={"worker_id": worker_id})
+    while not stop_event.is_set():
+        try:
+            if not run_one(worker_id):
+                # Idle: move old candidates to the archive and purge expired contact details
+                archive.maybe_maintain()
+                stop_event.wait(poll_interval)
+        except Exception:
+            logger.exception("Worker loop error", extra={"worker_id": worker_id})
+            stop_event.wait(poll_interval)
+
+
+def _worker_process():
+    configure_logging()
+    run_worker()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Omnisight evaluation job queue")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker_parser = subparsers.add_parser("worker", help="Run queue workers")
+    worker_parser.add_argument("--processes", type=int, default=1, help="Number of worker processes")
+    subparsers.add_parser("status", help="Show job counts per status")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.command == "status":
+        print(json.dumps(queue_depth(), indent=2))
+    elif args.processes <= 1:
+        run_worker()
+    else:
+        processes = [multiprocessing.Process(target=_worker_process) for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+"""Typed, slotted records for parsed resumes and candidates.
+
+The parser returns JSON shaped by RESUME_PARSER_PROMPT and records are stored
+as JSON, so the rest of the app passes plain dicts around. This module is the
+one place that knows their shape. decode_resume() and decode_record() check a
+dict and coerce it into slotted dataclasses:
+
+- numbers become text and text is stripped;
+- a single string where a list is expected becomes a one-item list;
+- blank resume fields are dropped;
+- keys the model does not know are kept in `extra`.
+
+to_dict() gives the canonical form back. Known fields come first in
+declaration order, then the extra keys, and missing fields are left out.
+dumps() writes it as compact JSON. encode_record() and canonical_resume()
+validate a dict straight into the canonical form without building the
+objects, which are only built where the typed view is used (format_resume,
+`check`). Records are mostly model output text: decoded, a record holds only
+about 6% less memory than its dict (bench_models.py), so the app keeps
+passing dicts.
+
+Encoded resumes and records carry `schema_version`. Decoding an older
+version runs its upgrades first. Dicts without a version are version 0: raw
+parser output, and records saved before this module existed.
+
+    python models.py check      # decode every stored record and report failures
+"""
+import argparse
+import json
+import math
+from collections import Counter
+from dataclasses import dataclass, field, fields
+
+SCHEMA_VERSION = 1
+
+
+class SchemaError(ValueError):
+    """A resume or record that does not match the data model."""
+
+
+def dumps(data):
+    """Compact JSON for a canonical dict."""
+    return json.dumps(data, separators=(",", ":"))
+
+
+# Field decoders: value -> decoded value, None for missing. Errors carry the
+# location inside the value ("[2].gpa: ...") and each level prefixes its own.
+
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (int, float)):
+        # json.dumps would write NaN/Infinity, which is not JSON
+        if isinstance(value, float) and not math.isfinite(value):
+            raise SchemaError(f": expected text, got {value!r}")
+        return str(value)
+    raise SchemaError(f": expected text, got {type(value).__name__}")
+
+
+def _texts(value):
+    if value is None:
+        return None
+    if isinstance(value, (str, int, float)):
+        value = [value]
+    elif not isinstance(value, list):
+        raise SchemaError(f": expected a list of text, got {type(value).__name__}")
+    items = []
+    for i, item in enumerate(value):
+        try:
+            item = _text(item)
+        except SchemaError as e:
+            raise SchemaError(f"[{i}]{e}") from None
+        if item is not None:
+            items.append(item)
+    return items or None
+
+
+def _integer(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise SchemaError(f": expected an integer, got {type(value).__name__}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise SchemaError(f": expected an integer, got {value!r}") from None
+    if not math.isfinite(number) or number != int(number):
+        raise SchemaError(f": expected an integer, got {value!r}")
+    return int(number)
+
+
+def _raw_text(value):
+    """Model output and bookkeeping text, kept exactly as written."""
+    if value is None or isinstance(value, str):
+        return value
+    raise SchemaError(f": expected text, got {type(value).__name__}")
+
+
+def _text_map(value):
+    """{key: text}, such as answers by question id."""
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        raise SchemaError(f": expected an object, got {type(value).__name__}")
+    for key, item in value.items():
+        try:
+            _raw_text(item)
+        except SchemaError as e:
+            raise SchemaError(f".{key}{e}") from None
+    return value
+
+
+def _outputs(value):
+    """{record field: output} of a re-scoring run: text, or answers' evaluations by question id."""
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        raise SchemaError(f": expected an object, got {type(value).__name__}")
+    for key, item in value.items():
+        try:
+            if isinstance(item, dict):
+                _text_map(item)
+            else:
+                _raw_text(item)
+        except SchemaError as e:
+            raise SchemaError(f".{key}{e}") from None
+    return value
+
+
+def _object(value):
+    """A JSON object whose inside is owned by another module (prescreen results)."""
+    if value is None or isinstance(value, dict):
+        return value
+    raise SchemaError(f": expected an object, got {type(value).__name__}")
+
+
+# Nested decoders come in pairs: .canonical builds the canonical dict instead of the object
+
+def _one(model, build="_decode"):
+    make = getattr(model, build)
+
+    def decode(value):
+        return None if value is None else make(value)
+    if build == "_decode":
+        decode.canonical = _one(model, "_canonical")
+    return decode
+
+
+def _many(model, build="_decode"):
+    make = getattr(model, build)
+
+    def decode(value):
+        if value is None:
+            return None
+        if isinstance(value, dict):
+            value = [value]
+        elif not isinstance(value, list):
+            raise SchemaError(f": expected a list, got {type(value).__name__}")
+        items = []
+        for i, item in enumerate(value):
+            try:
+                items.append(make(item))
+            except SchemaError as e:
+                raise SchemaError(f"[{i}]{e}") from None
+        return items or None
+    if build == "_decode":
+        decode.canonical = _many(model, "_canonical")
+    return decode
+
+
+def _versioned(model, build="_decode"):
+    def decode(value):
+        return _upgrade(model, value, build)
+    if build == "_decode":
+        decode.canonical = _versioned(model, "_canonical")
+    return decode
+
+
+def _field(decode):
+    return field(default=None, metadata={"decode": decode})
+
+
+def _plain(value, annotations):
+    if isinstance(value, _Model):
+        return value.to_dict(annotations)
+    if isinstance(value, list):
+        return [_plain(item, annotations) for item in value]
+    return value
+
+
+class _Model:
+    __slots__ = ()
+    # Fields added locally after parsing (entity matches, timelines, the schema version)
+    _annotations = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Decode and validate a dict; raises SchemaError."""
+        try:
+            return cls._decode(data)
+        except SchemaError as e:
+            raise SchemaError(f"{cls.__name__}{e}") from None
+
+    @classmethod
+    def _decode(cls, data):
+        if not isinstance(data, dict):
+            raise SchemaError(f": expected an object, got {type(data).__name__}")
+        decoders = cls._decoders
+        values = {}
+        extra = None
+        for key, value in data.items():
+            decode = decoders.get(key)
+            if decode is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            try:
+                values[key] = decode(value)
+            except SchemaError as e:
+                raise SchemaError(f".{key}{e}") from None
+        return cls(**values, extra=extra)
+
+    @classmethod
+    def _canonical(cls, data):
+        """What _decode(data).to_dict() returns, without building the objects."""
+        if not isinstance(data, dict):
+            raise SchemaError(f": expected an object, got {type(data).__name__}")
+        canonicals = cls._canonicals
+        values = {}
+        extra = None
+        for key, value in data.items():
+            canonical = canonicals.get(key)
+            if canonical is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            try:
+                values[key] = canonical(value)
+            except SchemaError as e:
+                raise SchemaError(f".{key}{e}") from None
+        ordered = {name: value for name in cls._names if (value := values.get(name)) is not None}
+        if extra:
+            ordered.update(extra)
+        return ordered
+
+    def to_dict(self, annotations=True):
+        """Canonical dict; annotations=False leaves out what was added after parsing."""
+        data = {}
+        for name in self._names:
+            value = getattr(self, name)
+            if value is not None and (annotations or name not in self._annotations):
+                data[name] = _plain(value, annotations)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+def _model(cls):
+    """Make a slotted dataclass of a _Model subclass and index its decoders."""
+    cls = dataclass(slots=True)(cls)
+    cls._decoders = {f.name: f.metadata["decode"] for f in fields(cls) if f.name != "extra"}
+    cls._canonicals = {name: getattr(decode, "canonical", decode) for name, decode in cls._decoders.items()}
+    cls._names = tuple(cls._decoders)
+    return cls
+
+
+@_model
+class ContactInfo(_Model):
+    name: str | None = _field(_text)
+    email: str | None = _field(_text)
+    phone: str | None = _field(_text)
+    location: str | None = _field(_text)
+    extra: dict | None = None
+
+
+@_model
+class Entity(_Model):
+    """A recognised school or employer (see entities.py)."""
+    name: str | None = _field(_text)
+    category: str | None = _field(_text)
+    tier: int | None = _field(_integer)
+    extra: dict | None = None
+
+
+@_model
+class Education(_Model):
+    institution: str | None = _field(_text)
+    location: str | None = _field(_text)
+    degree: str | None = _field(_text)
+    major: str | None = _field(_text)
+    minor: str | None = _field(_text)
+    additional_majors: list[str] | None = _field(_texts)
+    additional_minors: list[str] | None = _field(_texts)
+    dates: str | None = _field(_text)
+    graduation_date: str | None = _field(_text)
+    gpa: str | None = _field(_text)
+    test_scores: str | None = _field(_text)
+    relevant_coursework: list[str] | None = _field(_texts)
+    honors: list[str] | None = _field(_texts)
+    entity: Entity | None = _field(_one(Entity))
+    extra: dict | None = None
+    _annotations = ("entity",)
+
+
+@_model
+class Experience(_Model):
+    company: str | None = _field(_text)
+    location: str | None = _field(_text)
+    position: str | None = _field(_text)
+    dates: str | None = _field(_text)
+    responsibilities: list[str] | None = _field(_texts)
+    entity: Entity | None = _field(_one(Entity))
+    extra: dict | None = None
+    _annotations = ("entity",)
+
+
+@_model
+class Project(_Model):
+    name: str | None = _field(_text)
+    description: str | None = _field(_text)
+    technologies: list[str] | None = _field(_texts)
+    achievements: list[str] | None = _field(_texts)
+    extra: dict | None = None
+
+
+@_model
+class Extracurricular(_Model):
+    organization: str | None = _field(_text)
+    role: str | None = _field(_text)
+    dates: str | None = _field(_text)
+    achievements: list[str] | None = _field(_texts)
+    extra: dict | None = None
+
+
+@_model
+class Sport(_Model):
+    activity: str | None = _field(_text)
+    level: str | None = _field(_text)
+    dates: str | None = _field(_text)
+    achievements: list[str] | None = _field(_texts)
+    extra: dict | None = None
+
+
+@_model
+class SkillGroup(_Model):
+    category: str | None = _field(_text)
+    items: list[str] | None = _field(_texts)
+    extra: dict | None = None
+
+
+@_model
+class Timeline(_Model):
+    """Date flags computed at parse time (see timeline.py)."""
+    as_of: str | None = _field(_text)
+    flags: list[str] | None = _field(_texts)
+    extra: dict | None = None
+
+
+@_model
+class ParsedResume(_Model):
+    schema_version: int | None = _field(_integer)
+    contact_info: ContactInfo | None = _field(_one(ContactInfo))
+    summary: str | None = _field(_text)
+    education: list[Education] | None = _field(_many(Education))
+    experience: list[Experience] | None = _field(_many(Experience))
+    projects: list[Project] | None = _field(_many(Project))
+    extracurriculars: list[Extracurricular] | None = _field(_many(Extracurricular))
+    sports: list[Sport] | None = _field(_many(Sport))
+    skills: list[SkillGroup] | None = _field(_many(SkillGroup))
+    timeline: Timeline | None = _field(_one(Timeline))
+    extra: dict | None = None
+    _annotations = ("schema_version", "timeline")
+
+
+@_model
+class EvaluationRun(_Model):
+    """Outputs a re-scoring run replaced (see reevaluate.py)."""
+    evaluated_at: str | None = _field(_raw_text)
+    superseded_at: str | None = _field(_raw_text)
+    prompt_versions: dict | None = _field(_text_map)
+    outputs: dict | None = _field(_outputs)
+    extra: dict | None = None
+
+
+@_model
+class CandidateRecord(_Model):
+    schema_version: int | None = _field(_integer)
+    candidate_id: str | None = _field(_raw_text)
+    timestamp: str | None = _field(_raw_text)
+    reason: str | None = _field(_raw_text)
+    test_type: str | None = _field(_raw_text)
+    resume: ParsedResume | None = _field(_versioned(ParsedResume))
+    responses: dict | None = _field(_text_map)
+    evaluations: dict | None = _field(_text_map)
+    final_evaluation: str | None = _field(_raw_text)
+    resume_synthesis: str | None = _field(_raw_text)
+    primary_evaluator_output: str | None = _field(_raw_text)
+    skeptic_evaluator_output: str | None = _field(_raw_text)
+    overall_assessment: str | None = _field(_raw_text)
+    prompt_versions: dict | None = _field(_text_map)
+    evaluated_at: str | None = _field(_raw_text)
+    evaluation_history: list[EvaluationRun] | None = _field(_many(EvaluationRun))
+    prescreen: dict | None = _field(_object)
+    pii_purged_at: str | None = _field(_raw_text)
+    extra: dict | None = None
+
+
+def _skills_v1(skills):
+    """Version 1 skills are [{"category", "items"}]; the parser sometimes returns a flat list or a dict."""
+    if isinstance(skills, dict):
+        return [{"category": category, "items": items} for category, items in skills.items()]
+    if isinstance(skills, list) and skills and all(isinstance(item, str) for item in skills):
+        return [{"category": "Skills", "items": skills}]
+    return skills
+
+
+def _resume_v0_to_v1(data):
+    if "skills" in data:
+        data["skills"] = _skills_v1(data["skills"])
+    return data
+
+
+# Upgrades from each version to the next, applied to a copy of the dict
+_UPGRADES = {
+    ParsedResume: {0: _resume_v0_to_v1},
+    CandidateRecord: {},
+}
+
+
+def _upgrade(model, data, build="_decode"):
+    """Decode a versioned dict (or with build="_canonical", canonicalize it), running the upgrades from its version first."""
+    if data is None:
+        return None
+    if not isinstance(data, dict):
+        raise SchemaError(f": expected an object, got {type(data).__name__}")
+    version = _integer(data.get("schema_version")) or 0
+    if version > SCHEMA_VERSION:
+        raise SchemaError(f": schema version {version} is newer than {SCHEMA_VERSION}")
+    data = dict(data)
+    for step in range(version, SCHEMA_VERSION):
+        upgrade = _UPGRADES[model].get(step)
+        if upgrade is not None:
+            data = upgrade(data)
+    data["schema_version"] = SCHEMA_VERSION
+    return getattr(model, build)(data)
+
+
+def _decode_versioned(model, data, build="_decode"):
+    try:
+        return _upgrade(model, data, build)
+    except SchemaError as e:
+        raise SchemaError(f"{model.__name__}{e}") from None
+
+
+def decode_resume(data):
+    """ParsedResume from parser output or a stored resume; raises SchemaError."""
+    return _decode_versioned(ParsedResume, data)
+
+
+def decode_record(data):
+    """CandidateRecord from a stored record; raises SchemaError."""
+    return _decode_versioned(CandidateRecord, data)
+
+
+def canonical_resume(parsed_data):
+    """A parsed resume in canonical form; anything but a dict (None, an error string) is returned as is."""
+    if not isinstance(parsed_data, dict):
+        return parsed_data
+    return _decode_versioned(ParsedResume, parsed_data, "_canonical")
+
+
+def encode_record(candidate_data):
+    """Canonical compact JSON for a candidate record; raises SchemaError."""
+    return dumps(_decode_versioned(CandidateRecord, candidate_data, "_canonical"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candidate record data model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("check", help="Decode every stored record and report the ones that fail")
+    parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    from store import iter_candidates
+    from tenancy import set_tenant
+
+    if args.tenant:
+        set_tenant(args.tenant)
+    versions = Counter()
+    failures = 0
+    for candidate_data in iter_candidates():
+        versions[candidate_data.get("schema_version", 0)] += 1
+        try:
+            decode_record(candidate_data)
+        except SchemaError as e:
+            failures += 1
+            print(json.dumps({"candidate_id": candidate_data.get("candidate_id"), "error": str(e)}))
+    print(json.dumps({"records_by_version": dict(sorted(versions.items())), "failures": failures}))
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""OCR fallback for scanned (image-only) PDF resumes.
+
+Pages whose text layer holds fewer than OMNISIGHT_OCR_MIN_PAGE_CHARS
+characters are rendered and read with Tesseract in a bounded process pool,
+one task per page, so a long scan uses several cores and a stuck page cannot
+hold up the rest. Each page is limited to OMNISIGHT_OCR_PAGE_TIMEOUT seconds
+and the whole document to OMNISIGHT_OCR_DOCUMENT_TIMEOUT. Results are cached
+with the rest of the extracted text by upload hash (see upload_cache.py).
+
+OCR needs the Tesseract binary plus pytesseract and pypdfium2
+(pip install pytesseract pypdfium2). Without them, scanned PDFs extract to
+whatever text layer they have.
+"""
+import functools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from app_logging import get_logger
+from extraction import PDF_LAYOUT, _read_bytes, extract_pdf_pages
+from instrumentation import span
+
+# "auto" OCRs low-text pages when the OCR packages are installed; "off" never does
+OCR_MODE = os.environ.get("OMNISIGHT_OCR", "auto")
+OCR_WORKERS = int(os.environ.get("OMNISIGHT_OCR_WORKERS", min(4, os.cpu_count() or 1)))
+OCR_MIN_PAGE_CHARS = int(os.environ.get("OMNISIGHT_OCR_MIN_PAGE_CHARS", 50))
+OCR_PAGE_TIMEOUT = float(os.environ.get("OMNISIGHT_OCR_PAGE_TIMEOUT", 30))
+OCR_DOCUMENT_TIMEOUT = float(os.environ.get("OMNISIGHT_OCR_DOCUMENT_TIMEOUT", 120))
+# Resumes are short; pages past this are left to their text layer
+OCR_MAX_PAGES = int(os.environ.get("OMNISIGHT_OCR_MAX_PAGES", 10))
+OCR_DPI = int(os.environ.get("OMNISIGHT_OCR_DPI", 300))
+OCR_LANG = os.environ.get("OMNISIGHT_OCR_LANG", "eng")
+# Less text than this (ignoring whitespace) is treated as no text, so the
+# parser is never asked to make a resume out of a few stray fragments
+MIN_RESUME_CHARS = 100
+
+logger = get_logger("ocr")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _char_count(text):
+    return len("".join(text.split()))
+
+
+@functools.lru_cache(maxsize=None)
+def ocr_available():
+    """Whether the OCR packages and the Tesseract binary are installed."""
+    try:
+        import pypdfium2  # noqa: F401
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return True
+
+
+def low_text_pages(pages):
+    """Indexes of pages whose text layer is too thin to be the page's real content."""
+    return [i for i, text in enumerate(pages) if _char_count(text) < OCR_MIN_PAGE_CHARS]
+
+
+def needs_ocr(pdf_file):
+    """Whether a PDF has low-text pages that OCR would be run on."""
+    if OCR_MODE == "off" or not ocr_available():
+        return False
+    return bool(low_text_pages(extract_pdf_pages(pdf_file)[:OCR_MAX_PAGES]))
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the UI and API processes run threads
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _ocr_page(data, index, dpi, lang, timeout):
+    """Render one PDF page and read it with Tesseract (runs in a pool process)."""
+    import pypdfium2
+    import pytesseract
+
+    document = pypdfium2.PdfDocument(data)
+    try:
+        image = document[index].render(scale=dpi / 72).to_pil()
+    finally:
+        document.close()
+    # pytesseract kills the tesseract process once the timeout passes
+    return pytesseract.image_to_string(image, lang=lang, timeout=timeout)
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def ocr_pages(data, indexes):
+    """OCR text of the given pages, {index: text}; pages that fail or time out are left out."""
+    pool = _get_pool()
+    futures = {pool.submit(_ocr_page, data, i, OCR_DPI, OCR_LANG, OCR_PAGE_TIMEOUT): i for i in indexes}
+    done, not_done = wait(futures, timeout=OCR_DOCUMENT_TIMEOUT)
+    for future in not_done:
+        future.cancel()
+    results = {}
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except BrokenProcessPool:
+            # A pool process died (e.g. out of memory); start a fresh pool next time
+            _discard_pool(pool)
+        except Exception:
+            logger.warning("OCR failed for page", exc_info=True, extra={"page": futures[future]})
+    if not_done:
+        logger.warning("OCR timed out", extra={"pages": sorted(futures[f] for f in not_done)})
+    return results
+
+
+def extract_pdf_text_with_ocr(pdf_file, layout=None):
+    """PDF text with low-text pages replaced by their OCR text when that reads more.
+
+    Returns "" when the document still has almost no text, so callers report
+    an unreadable resume instead of parsing fragments.
+    """
+    data = _read_bytes(pdf_file)
+    pages = list(extract_pdf_pages(data, layout or PDF_LAYOUT))
+    low = low_text_pages(pages[:OCR_MAX_PAGES]) if OCR_MODE != "off" else []
+    if low:
+        if ocr_available():
+            with span("ocr", pages=len(low)) as current:
+                ocr_text = ocr_pages(data, low)
+                current.set("pages_read", len(ocr_text))
+            for i, text in ocr_text.items():
+                if _char_count(text) > _char_count(pages[i]):
+                    pages[i] = text.strip()
+        else:
+            logger.warning("PDF has pages without a text layer and OCR is not installed", extra={"pages": low})
+    text = "\n".join(pages).strip()
+    return text if _char_count(text) >= MIN_RESUME_CHARS else ""
+
+
+def cache_variant():
+    """Extracted-text cache variant, so text read before OCR was available is not reused."""
+    return f"{PDF_LAYOUT}:ocr" if OCR_MODE != "off" and ocr_available() else PDF_LAYOUT
@@ -0,0 +1,1049 @@
+import os
+from openai import OpenAI
+import re
+import json
+import hashlib
+import functools
+import admission
+from app_logging import get_logger, is_debug_mode
+from instrumentation import span
+from entities import pedigree_summary, strip_annotations
+from models import SchemaError, decode_resume, dumps
+from timeline import timeline_summary
+from extraction import extract_docx_text
+from ocr import extract_pdf_text_with_ocr
+
+logger = get_logger("pipeline")
+
+# Model used by every pipeline stage
+MODEL = "gpt-4o-mini"
+
+# Reasoning answers longer than this many tokens are trimmed in the overall assessment's context
+OVERALL_ANSWER_TOKEN_BUDGET = 300
+# Bump when build_overall_assessment_context changes what the model sees
+OVERALL_CONTEXT_VERSION = "3"
+# Bump when the resume JSON given to the resume agents changes (1 was pretty-printed)
+RESUME_CONTEXT_VERSION = "2"
+# Bump when the pedigree summary given to the primary evaluator changes
+PEDIGREE_CONTEXT_VERSION = "1"
+# Bump when the timeline given to the primary evaluator and the skeptic changes
+TIMELINE_CONTEXT_VERSION = "1"
+
+# System prompts for resume evaluation agents
+PRIMARY_EVALUATOR_PROMPT = '''You are a detailed, structured resume reviewer.
+
+Evaluate the candidate based on the parsed resume JSON. The Timeline after it is computed from the resume's dates; use it for dates, overlaps and gaps instead of working them out yourself. Assess them using the following categories:
+
+1. **Believability** — Are the listed roles, timelines, and skills plausible given age and background?
+2. **Role Depth & Function** — Did the candidate do real work (e.g. SWE vs warehouse)? Ignore fluff.
+  - For upcoming internships (e.g., "Incoming Intern at X"), the candidate has not yet started the role. Evaluate based on company and expected role alone, as detailed responsibilities are unlikely to be included.
+3. **Pedigree (Contextualized)** — Are the schools or firms impressive given the specific role (e.g. Harvard certificate ≠ Harvard degree)?
+4. **Impact & Specificity** — Do bullets show ownership, measurable results, or vague participation?
+5. **Writing & Communication** — Is the resume coherent, well-structured, and sharp?
+6. **Consistency** — Do listed skills match experiences? Are roles and trajectory aligned?
+7. **Trajectory** — Are they leveling up? Increasing complexity, responsibility, or firm quality over time?
+8. **Recommended Role Fit** — Suggest 1–2 ideal job types based on their background.
+
+  - Ignore summary sections unless they contain significant new information not already found in education or experience.
+
+  Use the following scale for all ratings:
+- 1–3: Very weak — clear issues, low relevance or credibility
+- 4–5: Below average — limited signal or serious gaps
+- 6–7: Solid — typical for a reasonable candidate
+- 8–9: Strong — clearly above average with strong supporting evidence
+- 10: Exceptional — rare quality, top 1% signal in this dimension
+
+Detailed guidance per category:
+
+**Believability (1–10):**
+- 1–3: Resume feels inflated or implausible; red flags around timelines or claims.
+- 4–5: Some questionable experiences or resume "padding."
+- 6–7: Believable for someone at this stage; no major concerns.
+- 8–9: Well-supported timeline, logical progression, and credible claims.
+- 10: Everything fits perfectly with no fluff; impeccable consistency.
+
+**Role Depth & Function (1–10):**
+- 1–3: Fluffy roles with unclear responsibilities (e.g. "interned at startup" with no substance).
+- 4–5: Some work done, but hard to assess real contributions.
+- 6–7: Describes real responsibilities aligned with title.
+- 8–9: Clear ownership of real work, often with outcomes.
+- 10: Demonstrated impact or leadership well beyond role expectations.
+
+**Pedigree (Contextualized) (1–10):**
+- 1–3: No signal from school or firms.
+- 4–5: Mid-tier school or unknown companies.
+- 6–7: Strong university or decent firm in a relevant role.
+- 8–9: Top-tier school and/or name-brand firms in relevant roles.
+- 10: Multiple elite institutions and top firms (e.g. Stanford + Goldman + Meta SWE).
+- The Pedigree list after the resume matches each school and employer to a reference list with a tier (1 = most selective or best known, 3 = widely recognised). Use it as a reference, but judge the name as written (an extension school or certificate is not a degree), and do not treat names that are not listed as weak.
+
+**Impact & Specificity (1–10):**
+- 1–3: Vague bullets with no action or result.
+- 4–5: Some action verbs, but little detail or metrics.
+- 6–7: Specific contributions with some results or insight.
+- 8–9: Bullets that reflect real impact with data or complexity.
+- 10: Clear, quantified results that show outstanding impact.
+
+**Writing & Communication (1–10):**
+- 1–3: Hard to follow, inconsistent formatting, grammar errors.
+- 4–5: Some structure, but unclear or clunky.
+- 6–7: Clear and competent writing.
+- 8–9: Clean, sharp phrasing throughout.
+- 10: Elite clarity, polish, and professionalism.
+
+**Consistency (1–10):**
+- 1–3: Skills, roles, and claims don't line up at all.
+- 4–5: Some contradictions or resume feels patched together.
+- 6–7: Reasonably aligned story and skill use.
+- 8–9: Well-integrated experiences and skills that reinforce each other.
+- 10: Extremely coherent and consistent across the entire resume.
+
+**Trajectory (1–10):**
+- 1–3: Flat or declining; no signs of growth.
+- 4–5: Some movement, but slow or unclear.
+- 6–7: Standard upward progression.
+- 8–9: Accelerated growth, stronger firms, or increased scope over time.
+- 10: Steep trajectory with clear signals of rapid development.
+
+**Recommended Role Fit:**
+Base this on demonstrated skills, prior roles, and communication—not just company names.
+
+Respond in this format:
+
+### Resume Evaluation
+**Believability (1–10):**  
+**Role Depth & Function (1–10):**  
+**Pedigree (Contextualized) (1–10):**  
+**Impact & Specificity (1–10):**  
+**Writing & Communication (1–10):**  
+**Consistency (1–10):**  
+**Trajectory (1–10):**  
+**Recommended Role Types:** [list of 1–2 roles]
+
+### Summary
+Write 2–3 sentences explaining your overall opinion of this candidate based on the resume.'''
+
+SKEPTIC_PROMPT = '''You are a resume red teamer.
+
+Your job is to review a candidate's parsed resume AND the primary evaluation output to identify anything that seems suspicious, exaggerated, vague, or implausible.
+The Timeline after the resume is computed from its dates. Its flags are the only date problems: do not recompute dates, and raise overlaps and gaps only if they are flagged there.
+  - Incoming roles have not started and are normal to list, even at prestigious firms. Judge them by company and role alone; do not question how the offer was secured, their general descriptions or workload, unless the candidate claims achievements in them.
+  - Internship titles such as ‘Summer Associate’ are not seniority or fast progression.
+
+Return the following:
+
+### Skepticism Score (1–10)
+- 1–3: Very suspicious; likely exaggerated or dishonest
+- 4–6: Mixed; some questionable elements
+- 7–8: Generally believable with some minor stretch
+- 9–10: Highly believable and well supported
+
+### Summary
+Write a 1–2 sentence summary explaining your skepticism score.
+
+### Red Flags
+List 2–4 resume elements that seem suspicious. Be specific and explain why.
+- Bullet points that lack context or results
+- Titles too senior for candidate's age
+- Skills listed but never used
+- Overlaps and gaps flagged in the Timeline'''
+
+SYNTHESIZER_PROMPT = '''You are a hiring manager making a final judgment.
+
+You've received the primary resume evaluation and the skeptic's critique. Your task is to summarize both perspectives and produce:
+- Do not penalize candidates for omitting a summary section unless the resume is otherwise sparse. Most real-world evaluators do not prioritize this section.
+- Do not question progression from internship to incoming role at the same firm unless there are clear contradictions. This is a common pattern and not inherently suspicious.
+
+### Final Resume Score (20–80)
+Use this scale:
+- 20–30: Weak; little credible or relevant experience
+- 31–50: Below average or inconsistent
+- 51–65: Solid; some strengths but room for doubt or growth
+- 66–75: Very strong; high confidence in capabilities
+- 76–80: Exceptional; rare clarity, credibility, and fit
+
+### Final Summary
+Write a short paragraph summarizing the candidate's perceived quality based on the full picture.
+
+### Follow-Up Questions
+List 1–3 probing questions you would ask the candidate in an interview to clarify doubts or explore interesting claims.'''
+
+OVERALL_ASSESSMENT_PROMPT = '''You are a senior hiring manager making a final, comprehensive assessment of a candidate.
+
+You have access to:
+1. The candidate's resume evaluation (including primary evaluator, skeptic, and synthesizer outputs)
+2. Their reasoning assessment results
+3. Their complete candidate profile
+
+Your task is to synthesize all this information into a final, holistic assessment that prioritizes the resume evaluation and reasoning assessment, while considering the full context.
+
+Provide your assessment in this format:
+
+### Overall Candidate Score (20–80)
+Weight the resume evaluation at 60% and the reasoning assessment at 40% in determining this score.
+
+### Key Strengths
+List 2-3 major strengths demonstrated across both the resume and reasoning assessment.
+
+### Areas for Development
+List 2-3 areas where the candidate could improve or develop further.
+
+### Role Recommendations
+Based on the complete picture, suggest 1-2 specific roles where this candidate would excel.
+
+### Interview Focus Areas
+List 3-4 key areas to explore in an interview, including:
+- Any inconsistencies or gaps in the resume
+- Specific reasoning responses that warrant deeper discussion
+- Areas where more context is needed
+
+### Final Recommendation
+Provide a clear, concise recommendation on whether to proceed with this candidate, including any specific concerns or reservations.'''
+
+COMBINED_EVALUATION_PROMPT = """You are analyzing a candidate's responses to multiple reasoning questions to create a comprehensive profile.
+Your task is to synthesize insights across all answers to identify patterns, strengths, and areas for improvement.
+
+Consider:
+1. Overall reasoning style and approach
+2. Consistency in thinking across different scenarios
+3. Key strengths demonstrated (if any)
+4. Areas where thinking could be improved (if any)
+5. Potential implications for real-world problem-solving
+6. Note any skipped questions and their impact on the overall assessment
+
+Format your response as follows:
+    
+### Final Score (20–80)
+Provide a single numerical score between 20 and 80 based on your holistic evaluation of the candidate's reasoning skills across all responses. Use the following rough guide:
+- 20–30: Weak reasoning; unclear, inconsistent, or superficial thinking.
+- 31–40: Below average; some logic present but lacks clarity, originality, or specificity.
+- 41–50: Average; competent but unremarkable reasoning, may lack depth or structure.
+- 51–60: Strong reasoning; clear, structured, and generally thoughtful responses.
+- 61–70: Very strong reasoning; insightful, well-structured, and original thinking.
+- 71–80: Exceptional reasoning; rare clarity, depth, and creativity in responses.
+
+Note: For skipped questions, adjust the score range downward by 5-10 points depending on the number of skips and their importance to the overall assessment.
+
+### Score Rationale
+Explain why you assigned this score using examples from the candidate's responses. Identify any consistent patterns in reasoning quality, strengths, and weaknesses. Note any skipped questions and how they affected your evaluation.
+
+Be specific and evidence-based, referencing particular aspects of the candidate's responses to support your analysis.
+If the candidate skipped questions, explain how this impacts your ability to fully assess their reasoning capabilities."""
+
+GRADER_PROMPT = """You are evaluating a job candidate's response to a high-level reasoning prompt. 
+Your job is to assess the quality of their thinking using the rubric below.
+
+Score the answer from 0–10 in each of the following categories:
+1. **Clarity** — Is the response clearly written, well-structured, and easy to follow?
+2. **Logical Reasoning** — Is the argument internally consistent, and are the assumptions coherent?
+3. **Originality** — Does the response show creativity, non-obvious ideas, or unique perspectives?
+4. **Specificity and Realism of Strategy** — Does the candidate present a specific, implementable, and realistic plan given the scenario constraints?
+
+Use this exact format for output:
+Clarity: [score]
+Logical reasoning: [score]
+Originality: [score]
+Specificity and realism of strategy: [score]
+
+Feedback: [short paragraph, 2–4 sentences]
+
+Be honest and specific—do not inflate scores. A 7 or 8 reflects strong thinking. A 10 should be rare and exceptional. Penalize responses that:
+- Avoid answering the question directly
+- Make claims without any reasoning or justification
+- Focus on tangents like fairness, emotional appeal, or vague opinions instead of directly addressing the objective in the prompt
+Reward answers that support their approach with logic, data proxies, or clear prioritization.
+
+Here are example answers to the following prompt used in the Olympic Games context:
+"You are designing a PED testing strategy for the Olympic Games. You have access to a 100%-accurate drug test, but due to budget constraints, you can only test 30% of athletes. Design a strategy to maximize the probability of detecting PED users.""
+
+--- Good Answer ---
+"I would prioritize testing athletes with statistically abnormal improvements in performance over time, especially in sports with high historical PED usage. Additionally, I would create a model based on risk indicators like training location, previous suspicions, or affiliations with known violators. This approach focuses resources where the probability of catching a cheater is highest."
+
+Clarity: 9
+Logical reasoning: 9
+Originality: 8
+Specificity and realism of strategy: 7
+
+--- Mediocre Answer ---
+"I would focus on top performers and some random athletes from high-risk sports. This would probably catch a few cheaters."
+
+Clarity: 6
+Logical reasoning: 4
+Originality: 3
+Specificity and realism of strategy: 3
+
+--- Poor Answer ---
+"I would randomly test athletes because that's the fairest way to do it. Everyone should have the same chance of being tested."
+
+Clarity: 2
+Logical reasoning: 1
+Originality: 2
+Specificity and realism of strategy: 1
+
+--- Insightful but Unstructured Answer ---
+"I think people often cheat when there's high financial or national pressure. So, I'd look at the countries with the most to gain—those who win disproportionately or host events. Also, I'd scan for outliers in bio-passport data and prioritize those with unexplained anomalies."
+
+Clarity: 5
+Logical reasoning: 7
+Originality: 8
+Specificity and realism of strategy: 5
+
+--- Jargon-Heavy but Underdeveloped Answer ---
+"I would apply a Bayesian decision network to athlete training logs, combined with latent class analysis to infer hidden variables indicating PED probability. The top 30% posterior scores would be targeted. This would be optimized weekly using dynamic reinforcement modeling."
+
+Clarity: 3
+Logical reasoning: 4
+Originality: 5
+Specificity and realism of strategy: 4
+"""
+
+RESUME_PARSER_PROMPT = """You are a resume parser. Your task is to analyze the resume text and extract structured information.
+Please identify and organize the following information:
+
+1. Contact Information:
+   - Full name
+   - Email address
+   - Phone number
+   - Location (city, state)
+
+2. Professional Summary:
+   - Look for a brief summary of the candidate's background and objectives
+   - This may be labeled as "Summary", "Professional Summary", "Objective", "Career Objective", or similar
+   - If no explicit summary section exists, use the first paragraph if it appears to be a summary
+   - If no suitable summary is found, leave this field empty
+
+3. Education:
+   - List each educational institution with:
+     * Institution name
+     * Location (city, state)
+     * Degree and major(s) (include all majors and minors if multiple)
+     * Expected graduation date (ONLY include the end date, not the start date or "Present". If no end date is found, leave this field empty)
+     * GPA (if available)
+     * Test scores (if available)
+     * Relevant coursework (if available)
+     * Honors and awards (if available)
+
+4. Professional Experience:
+   - List each job with:
+     * Company name
+     * Location (city, state)
+     * Position title
+     * Dates
+     * Key responsibilities as bullet points
+     - IMPORTANT: Each bullet point must be clearly associated with its specific experience
+     - Do not mix or combine bullet points from different experiences
+     - If a bullet point's context is unclear, do not include it
+
+5. Projects:
+   - List any significant projects with:
+     * Project name
+     * Description
+     * Technologies used
+     * Key achievements or outcomes
+
+6. Extracurricular Activities:
+   - List any leadership roles or significant involvement in:
+     * Clubs
+     * Organizations
+     * Student government
+     * Other activities
+   - Include role, dates, and key responsibilities/achievements
+
+7. Sports & Athletics:
+   - List any sports participation or athletic achievements
+   - Include level of participation, achievements, and dates
+
+8. Skills & Additional Information:
+   - List technical skills, tools, and technologies
+   - Group related skills together
+   - Include interests and hobbies if listed
+   - Preserve the original section labels from the resume
+   - Make sure bullet points are correctly attributed to their respective experiences
+
+IMPORTANT: Your response must be a valid JSON object. Do not include any text before or after the JSON object.
+Do not use markdown code blocks or any other formatting. Just output the raw JSON.
+
+Example format:
+{
+    "contact_info": {
+        "name": "John Doe",
+        "email": "john@example.com",
+        "phone": "123-456-7890",
+        "location": "New York, NY"
+    },
+    "summary": "Experienced software engineer...",
+    "education": [
+        {
+            "institution": "University of Example",
+            "location": "Boston, MA",
+            "degree": "Bachelor of Science",
+            "major": "Computer Science",
+            "graduation_date": "2024",
+            "gpa": "3.8",
+            "test_scores": "SAT: 1500",
+            "relevant_coursework": ["Data Structures", "Algorithms"],
+            "honors": ["Dean's List"]
+        }
+    ],
+    "experience": [
+        {
+            "company": "Tech Corp",
+            "location": "San Francisco, CA",
+            "position": "Software Engineer",
+            "dates": "2020-2023",
+            "responsibilities": ["Developed web applications"]
+        }
+    ],
+    "projects": [
+        {
+            "name": "Project X",
+            "description": "Description here",
+            "technologies": ["Python", "React"],
+            "achievements": ["Achievement 1"]
+        }
+    ],
+    "extracurriculars": [
+        {
+            "organization": "Club Name",
+            "role": "President",
+            "dates": "2022-2023",
+            "achievements": ["Achievement 1"]
+        }
+    ],
+    "sports": [
+        {
+            "activity": "Soccer",
+            "level": "Varsity",
+            "dates": "2020-2023",
+            "achievements": ["Team Captain"]
+        }
+    ],
+    "skills": [
+        {
+            "category": "Programming Languages",
+            "items": ["Python", "Java"]
+        },
+        {
+            "category": "Interests",
+            "items": ["Photography", "Travel"]
+        }
+    ]
+}"""
+
+# Define the reasoning questions
+reasoning_questions = [
+    {
+        "id": "ped_testing",
+        "text": """You are designing a PED testing strategy for the Olympic Games. You have access to a 100%-accurate drug test, but due to budget constraints, you can only test 30% of athletes. 
+
+Design a strategy to maximize the probability of detecting PED users. Be specific: what data would you use, what criteria would drive your selection, and what are potential drawbacks to your strategy?
+
+Assume this strategy will be implemented exactly as described—do not rely on follow-up clarification or future adjustments. This is not about what system the Olympics should implement in practice—it is purely about designing the system that would catch the most PED users."""
+    },
+    {
+        "id": "iphone_rebuild",
+        "text": """The entire modern human population is suddenly transported 10,000 years into the past. Everyone retains their memories, knowledge, and skills—but no modern tools, infrastructure, or devices make the trip.
+
+Assume that over time, humanity begins rebuilding civilization. Your task is to estimate how long it would take for someone to build a fully functioning iPhone from scratch.
+
+Consider the major scientific and technological milestones required, what resources would need to be discovered and refined, and what steps would be essential before manufacturing could even begin. Be realistic and specific—focus on bottlenecks, necessary prerequisites, and potential acceleration strategies."""
+    }
+]
+
+def _prompt_hash(*parts):
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:12]
+
+def current_prompt_versions():
+    """Version hash per evaluation stage.
+
+    Each stage's hash covers its own prompt and the hashes of the stages it
+    consumes, so changing PRIMARY_EVALUATOR_PROMPT also marks the skeptic,
+    synthesizer and overall assessment as stale.
+    """
+    primary = _prompt_hash(MODEL, PRIMARY_EVALUATOR_PROMPT, RESUME_CONTEXT_VERSION, PEDIGREE_CONTEXT_VERSION,
+                           TIMELINE_CONTEXT_VERSION)
+    skeptic = _prompt_hash(MODEL, SKEPTIC_PROMPT, primary, TIMELINE_CONTEXT_VERSION)
+    synthesizer = _prompt_hash(MODEL, SYNTHESIZER_PROMPT, primary, skeptic)
+    grade = _prompt_hash(MODEL, GRADER_PROMPT)
+    combined = _prompt_hash(MODEL, COMBINED_EVALUATION_PROMPT, grade, *(q["text"] for q in reasoning_questions))
+    overall = _prompt_hash(MODEL, OVERALL_ASSESSMENT_PROMPT, OVERALL_CONTEXT_VERSION, str(OVERALL_ANSWER_TOKEN_BUDGET),
+                           primary, skeptic, synthesizer, combined)
+    return {
+        "primary": primary,
+        "skeptic": skeptic,
+        "synthesizer": synthesizer,
+        "grade": grade,
+        "combined": combined,
+        "overall": overall,
+    }
+
+def parser_version():
+    """Version hash of the resume parser, used to key cached parses."""
+    return _prompt_hash(MODEL, RESUME_PARSER_PROMPT)
+
+def stamp_prompt_versions(candidate_data):
+    """Record the prompt version of every stage whose output is present in the record."""
+    versions = current_prompt_versions()
+    fields = {
+        "primary": "primary_evaluator_output",
+        "skeptic": "skeptic_evaluator_output",
+        "synthesizer": "resume_synthesis",
+        "grade": "evaluations",
+        "combined": "final_evaluation",
+        "overall": "overall_assessment",
+    }
+    stamped = candidate_data.setdefault("prompt_versions", {})
+    for stage, field in fields.items():
+        if candidate_data.get(field):
+            stamped[stage] = versions[stage]
+    return candidate_data
+
+def _combined_evaluation_messages(responses, evaluations):
+    # Format the responses and evaluations for GPT
+    context = "Here are the candidate's responses and evaluations:\n\n"
+    for q_id, response in responses.items():
+        question = next(q for q in reasoning_questions if q["id"] == q_id)
+        context += f"Question: {question['text']}\n"
+        context += f"Response: {response}\n"
+        context += f"Evaluation: {evaluations[q_id]}\n\n"
+    return [
+        {"role": "system", "content": COMBINED_EVALUATION_PROMPT},
+        {"role": "user", "content": context}
+    ]
+
+def generate_combined_evaluation(responses, evaluations):
+    """Generate a synthesized evaluation of the candidate based on all responses."""
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        return "Error: OPENAI_API_KEY environment variable not found."
+
+    try:
+        client = OpenAI(api_key=api_key)
+        messages = _combined_evaluation_messages(responses, evaluations)
+        with span("combined_evaluation") as s, _admit(messages, 800) as ticket:
+            completion = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=800  # Reduced from 1000 to encourage more concise responses
+            )
+            s.record_usage(completion)
+            ticket.record_usage(completion)
+        return completion.choices[0].message.content.strip()
+    except Exception as e:
+        return f"Error generating combined evaluation: {str(e)}"
+
+def stream_combined_evaluation(responses, evaluations):
+    """Streaming generate_combined_evaluation; see _stream_completion."""
+    return (yield from _stream_completion(
+        "combined_evaluation", _combined_evaluation_messages(responses, evaluations), 800,
+        "Error generating combined evaluation"))
+
+# If you encounter "Client.init() got an unexpected keyword argument 'proxies'",
+# ensure you have the latest version of the openai library installed:
+# pip install --upgrade openai
+
+def extract_text_from_pdf(pdf_file):
+    """Extract text from PDF file, reading multi-column layouts column by column and OCRing scanned pages."""
+    with span("extract_pdf"):
+        return extract_pdf_text_with_ocr(pdf_file)
+
+def extract_text_from_docx(docx_file):
+    """Extract text from DOCX file, including tables, text boxes, headers and footers."""
+    with span("extract_docx"):
+        return extract_docx_text(docx_file)
+
+def parse_resume_with_gpt(text):
+    """Use GPT to parse resume text into structured sections."""
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        return "Error: OPENAI_API_KEY environment variable not found."
+
+    try:
+        # Initialize client with minimal configuration
+        client = OpenAI(
+            api_key=api_key,
+            http_client=None
+        )
+        
+        messages = [
+            {"role": "system", "content": RESUME_PARSER_PROMPT},
+            {"role": "user", "content": text}
+        ]
+        logger.info("Parsing resume", extra={"text_chars": len(text)})
+        if is_debug_mode():
+            logger.debug("Messages being sent to GPT", extra={"messages": messages})
+        
+        with span("parse_resume") as s, _admit(messages, 2000) as ticket:
+            completion = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=2000  # Increased token limit
+            )
+            s.record_usage(completion)
+            ticket.record_usage(completion)
+        
+        # Get the response content
+        response_content = completion.choices[0].message.content.strip()
+        logger.debug("GPT response", extra={"response": response_content})
+        
+        # Clean the response content
+        cleaned_content = response_content
+        # Remove any markdown code block markers
+        cleaned_content = cleaned_content.replace("```json", "").replace("```", "").strip()
+        
+        # Try to find JSON content between curly braces
+        json_match = re.search(r'\{[\s\S]*\}', cleaned_content)
+        if json_match:
+            cleaned_content = json_match.group(0)
+        
+        # Clean up any trailing commas
+        cleaned_content = re.sub(r',(\s*[}\]])', r'\1', cleaned_content)
+        
+        if cleaned_content != response_content:
+            logger.debug("Cleaned JSON content (changes detected)", extra={"cleaned": cleaned_content})
+        
+        try:
+            parsed_data = json.loads(cleaned_content)
+            logger.info("JSON parsing successful")
+            return parsed_data
+        except json.JSONDecodeError as e:
+            logger.warning(
+                "JSON parsing error, retrying with fixes",
+                extra={"error": str(e), "line": e.lineno, "pos": e.pos, "response": response_content}
+            )
+            # Try to fix common JSON issues
+            try:
+                # Remove any trailing commas
+                cleaned_content = re.sub(r',(\s*[}\]])', r'\1', cleaned_content)
+                # Ensure all quotes are properly escaped
+                cleaned_content = cleaned_content.replace('"', '\\"').replace('\\"', '"')
+                parsed_data = json.loads(cleaned_content)
+                logger.info("JSON parsing successful after fixes")
+                return parsed_data
+            except json.JSONDecodeError:
+                logger.error("Failed to parse even after fixes", extra={"response": response_content})
+                return None
+
+    except Exception:
+        logger.exception("GPT API error while parsing resume")
+        return None
+
+def parse_resume(text):
+    """Parse resume text into structured sections using GPT, validated and in canonical form."""
+    parsed_data = parse_resume_with_gpt(text)
+    if parsed_data is None:
+        logger.error("Failed to parse resume with GPT")
+        return None
+    if isinstance(parsed_data, str):
+        return parsed_data
+    try:
+        return decode_resume(parsed_data).to_dict()
+    except SchemaError as e:
+        logger.error("Parsed resume does not match the data model", extra={"error": str(e)})
+        return None
+
+def _bullets(items):
+    return "".join(f"  * {item}\n" for item in items or [])
+
+def format_resume(parsed_data):
+    """Format parsed resume data into markdown."""
+    if parsed_data is None:
+        return "Error: Failed to parse resume"
+    try:
+        resume = decode_resume(parsed_data)
+    except SchemaError:
+        logger.exception("Cannot format resume")
+        return "Error: Failed to parse resume"
+
+    output = "### Resume Summary\n\n"
+
+    # Contact Information
+    contact_info = resume.contact_info
+    if contact_info and (contact_info.name or contact_info.email or contact_info.phone or contact_info.location):
+        output += "#### Contact Information\n"
+        if contact_info.name:
+            output += f"- **Name:** {contact_info.name}\n"
+        if contact_info.email:
+            output += f"- **Email:** {contact_info.email}\n"
+        if contact_info.phone:
+            output += f"- **Phone:** {contact_info.phone}\n"
+        if contact_info.location:
+            output += f"- **Location:** {contact_info.location}\n"
+        output += "\n"
+
+    # Summary
+    if resume.summary:
+        output += "#### Professional Summary\n"
+        output += resume.summary + "\n\n"
+
+    # Education
+    if resume.education:
+        output += "#### Education\n"
+        for edu in resume.education:
+            output += f"**{edu.institution or ''}**\n"
+            if edu.location:
+                output += f"- Location: {edu.location}\n"
+
+            # Handle degree and majors/minors
+            if edu.degree:
+                output += f"- {edu.degree}"
+                if edu.major:
+                    output += f" in {edu.major}"
+                if edu.minor:
+                    output += f" with a minor in {edu.minor}"
+                if edu.additional_majors:
+                    output += f" and {', '.join(edu.additional_majors)}"
+                if edu.additional_minors:
+                    output += f" with additional minors in {', '.join(edu.additional_minors)}"
+                output += "\n"
+
+            # Only show graduation date if it's not "Present" or a date range
+            grad_date = edu.graduation_date
+            if grad_date and grad_date.lower() != "present" and "-" not in grad_date:
+                output += f"- Expected Graduation: {grad_date}\n"
+            if edu.gpa:
+                output += f"- GPA: {edu.gpa}\n"
+            if edu.test_scores:
+                output += f"- Test Scores: {edu.test_scores}\n"
+            if edu.relevant_coursework:
+                output += "- Relevant Coursework:\n" + _bullets(edu.relevant_coursework)
+            if edu.honors:
+                output += "- Honors & Awards:\n" + _bullets(edu.honors)
+            output += "\n"
+
+    # Experience
+    if resume.experience:
+        output += "#### Professional Experience\n"
+        for exp in resume.experience:
+            output += f"**{exp.company or ''}**\n"
+            if exp.location:
+                output += f"- Location: {exp.location}\n"
+            if exp.position:
+                output += f"- Position: {exp.position}\n"
+            if exp.dates:
+                output += f"- Dates: {exp.dates}\n"
+            if exp.responsibilities:
+                output += "- Key Responsibilities:\n" + _bullets(exp.responsibilities)
+            output += "\n"
+
+    # Projects
+    if resume.projects:
+        output += "#### Projects\n"
+        for proj in resume.projects:
+            output += f"**{proj.name or ''}**\n"
+            if proj.description:
+                output += f"- {proj.description}\n"
+            if proj.technologies:
+                output += "- Technologies:\n" + _bullets(proj.technologies)
+            if proj.achievements:
+                output += "- Key Achievements:\n" + _bullets(proj.achievements)
+            output += "\n"
+
+    # Extracurriculars
+    if resume.extracurriculars:
+        output += "#### Extracurricular Activities\n"
+        for extra in resume.extracurriculars:
+            output += f"**{extra.organization or ''}**\n"
+            if extra.role:
+                output += f"- Role: {extra.role}\n"
+            if extra.dates:
+                output += f"- Dates: {extra.dates}\n"
+            if extra.achievements:
+                output += "- Key Achievements:\n" + _bullets(extra.achievements)
+            output += "\n"
+
+    # Sports
+    if resume.sports:
+        output += "#### Sports & Athletics\n"
+        for sport in resume.sports:
+            output += f"**{sport.activity or ''}**\n"
+            if sport.level:
+                output += f"- Level: {sport.level}\n"
+            if sport.dates:
+                output += f"- Dates: {sport.dates}\n"
+            if sport.achievements:
+                output += "- Achievements:\n" + _bullets(sport.achievements)
+            output += "\n"
+
+    # Skills & Additional Information
+    if resume.skills:
+        output += "#### Skills & Additional Information\n"
+        for skill_group in resume.skills:
+            if skill_group.category:
+                output += f"**{skill_group.category}**\n"
+                for item in skill_group.items or []:
+                    output += f"- {item}\n"
+                output += "\n"
+
+    return output
+
+def _grader_messages(response):
+    return [
+        {"role": "system", "content": GRADER_PROMPT},
+        {"role": "user", "content": response}
+    ]
+
+def get_completion_evaluation(response):
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        return "Error: OPENAI_API_KEY environment variable not found."
+
+    try:
+        # Create a client object with your API key
+        client = OpenAI(api_key=api_key)
+
+        # Use chat.completions instead of completions
+        messages = _grader_messages(response)
+        with span("grade_response") as s, _admit(messages, 300) as ticket:
+            completion = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=300
+            )
+            s.record_usage(completion)
+            ticket.record_usage(completion)
+        evaluated_text = completion.choices[0].message.content.strip()
+        return evaluated_text
+
+    except Exception as e:
+        return f"Error during evaluation: {str(e)}"
+
+def stream_completion_evaluation(response):
+    """Streaming get_completion_evaluation; see _stream_completion."""
+    return (yield from _stream_completion("grade_response", _grader_messages(response), 300, "Error during evaluation"))
+
+def _stream_completion(stage, messages, max_tokens, error_prefix):
+    """Stream a chat completion, yielding text as it arrives.
+
+    The generator's return value is the full text, or an "Error..." string if
+    the call failed at any point; text streamed before a failure is discarded.
+    """
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        return "Error: OPENAI_API_KEY environment variable not found."
+
+    parts = []
+    try:
+        client = OpenAI(api_key=api_key)
+        with span(stage, streamed=True) as s, _admit(messages, max_tokens) as ticket:
+            stream = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                # Usage arrives on a final chunk without choices
+                if getattr(chunk, "usage", None) is not None:
+                    s.record_usage(chunk)
+                    ticket.record_usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+    except Exception as e:
+        return f"{error_prefix}: {str(e)}"
+    return "".join(parts).strip()
+
+def is_error_result(result):
+    """Pipeline functions report failures as strings starting with "Error"."""
+    return isinstance(result, str) and result.startswith("Error")
+
+def _run_resume_agent(stage, system_prompt, user_content):
+    """Run a single resume evaluation agent and return its output."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return "Error: OPENAI_API_KEY environment variable not found."
+
+    try:
+        client = OpenAI(api_key=api_key)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ]
+        with span(stage) as s, _admit(messages, 1000) as ticket:
+            completion = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=1000
+            )
+            s.record_usage(completion)
+            ticket.record_usage(completion)
+        return completion.choices[0].message.content.strip()
+    except Exception as e:
+        return f"Error during evaluation: {str(e)}"
+
+def _resume_for_model(parsed_resume_data):
+    """The parsed resume in canonical form, without the local entity, timeline and version annotations."""
+    if not isinstance(parsed_resume_data, dict):
+        return parsed_resume_data
+    try:
+        return decode_resume(parsed_resume_data).to_dict(annotations=False)
+    except SchemaError:
+        # Resumes stored before validation go out as they are, minus empty values and annotations
+        resume = _prune_empty(strip_annotations(parsed_resume_data))
+        resume.pop("schema_version", None)
+        resume.pop("timeline", None)
+        return resume
+
+def run_primary_evaluator(parsed_resume_data):
+    """Run the primary evaluator agent on the parsed resume, its timeline and pedigree summary."""
+    user_content = dumps(_resume_for_model(parsed_resume_data))
+    user_content += f"\n\nTimeline:\n{timeline_summary(parsed_resume_data)}"
+    pedigree = pedigree_summary(parsed_resume_data)
+    if pedigree:
+        user_content += f"\n\nPedigree:\n{pedigree}"
+    return _run_resume_agent("primary_evaluator", PRIMARY_EVALUATOR_PROMPT, user_content)
+
+def run_skeptic_evaluator(parsed_resume_data, primary_output):
+    """Run the skeptic agent against the resume, its timeline and the primary evaluation."""
+    return _run_resume_agent(
+        "skeptic_evaluator",
+        SKEPTIC_PROMPT,
+        f"Resume Data:\n{dumps(_resume_for_model(parsed_resume_data))}\n\n"
+        f"Timeline:\n{timeline_summary(parsed_resume_data)}\n\nPrimary Evaluation:\n{primary_output}"
+    )
+
+def run_synthesizer(parsed_resume_data, primary_output, skeptic_output):
+    """Run the synthesizer agent with resume data and both prior evaluations."""
+    return _run_resume_agent(
+        "synthesizer",
+        SYNTHESIZER_PROMPT,
+        f"Resume Data:\n{dumps(_resume_for_model(parsed_resume_data))}\n\nPrimary Evaluation:\n{primary_output}\n\nSkeptic Evaluation:\n{skeptic_output}"
+    )
+
+def run_resume_evaluation_agents(parsed_resume_data):
+    """Run the three resume evaluation agents and return their outputs."""
+    primary_output = run_primary_evaluator(parsed_resume_data)
+    if is_error_result(primary_output):
+        return primary_output, "", ""
+
+    skeptic_output = run_skeptic_evaluator(parsed_resume_data, primary_output)
+    if is_error_result(skeptic_output):
+        return skeptic_output, "", ""
+
+    synthesizer_output = run_synthesizer(parsed_resume_data, primary_output, skeptic_output)
+    if is_error_result(synthesizer_output):
+        return synthesizer_output, "", ""
+
+    return primary_output, skeptic_output, synthesizer_output
+
+@functools.lru_cache(maxsize=None)
+def _token_encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def estimate_tokens(text):
+    """Token count of text: exact when tiktoken is installed, otherwise about four characters per token."""
+    encoding = _token_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+def _admit(messages, max_tokens):
+    """Wait for admission (see admission.py) for a call charged its prompt plus max_tokens."""
+    return admission.admit(sum(estimate_tokens(m["content"]) for m in messages) + max_tokens)
+
+def _trim_to_budget(text, budget):
+    """Shorten text to about budget tokens, keeping its opening and its conclusion."""
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    words = text.split()
+    keep = max(2, len(words) * budget // tokens)
+    if keep >= len(words):
+        # Too few words to cut (one long URL or code line): keep it whole
+        return text
+    head = keep * 2 // 3
+    return f"{' '.join(words[:head])} [... {len(words) - keep} words omitted ...] {' '.join(words[head - keep:])}"
+
+def _prune_empty(value):
+    """Drop empty strings, lists and dicts from parsed resume data."""
+    if isinstance(value, dict):
+        pruned = {k: _prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in ("", None, [], {})}
+    if isinstance(value, list):
+        pruned = [_prune_empty(v) for v in value]
+        return [v for v in pruned if v not in ("", None, [], {})]
+    return value
+
+def build_overall_assessment_context(candidate_data, answer_budget=OVERALL_ANSWER_TOKEN_BUDGET):
+    """Assemble the overall assessment's user message, each part of the record exactly once.
+
+    Bookkeeping fields (ids, timestamps, reason, prompt versions), entity and
+    timeline annotations and any previous overall assessment are left out;
+    answers longer than answer_budget tokens are trimmed (answer_budget=None
+    keeps them whole).
+    """
+    resume = _resume_for_model(candidate_data.get("resume") or {})
+    sections = [
+        f"Resume:\n{dumps(resume) if resume else 'Not available'}",
+        "Resume Evaluation:\n"
+        f"Primary Evaluator: {candidate_data.get('primary_evaluator_output') or 'Not available'}\n"
+        f"Skeptic: {candidate_data.get('skeptic_evaluator_output') or 'Not available'}\n"
+        f"Synthesizer: {candidate_data.get('resume_synthesis') or 'Not available'}",
+    ]
+
+    answers = []
+    evaluations = candidate_data.get("evaluations") or {}
+    for number, (q_id, response) in enumerate((candidate_data.get("responses") or {}).items(), 1):
+        answers.append(
+            f"Question {number} ({q_id}):\n"
+            f"Response: {response if answer_budget is None else _trim_to_budget(response, answer_budget)}\n"
+            f"Evaluation: {evaluations.get(q_id) or 'Not available'}"
+        )
+    answers.append(f"Final Evaluation: {candidate_data.get('final_evaluation') or 'Not available'}")
+    sections.append("Reasoning Assessment:\n" + "\n\n".join(answers))
+    return "\n\n".join(sections)
+
+def _overall_assessment_messages(candidate_data):
+    context = build_overall_assessment_context(candidate_data)
+    logger.info("Overall assessment context", extra={
+        "context_tokens": estimate_tokens(context),
+        "untrimmed_tokens": estimate_tokens(build_overall_assessment_context(candidate_data, answer_budget=None)),
+    })
+    return [
+        {"role": "system", "content": OVERALL_ASSESSMENT_PROMPT},
+        {"role": "user", "content": context}
+    ]
+
+def generate_overall_assessment(candidate_data):
+    """Generate a comprehensive assessment of the candidate using all available data."""
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        return "Error: OPENAI_API_KEY environment variable not found."
+
+    try:
+        client = OpenAI(api_key=api_key)
+
+        messages = _overall_assessment_messages(candidate_data)
+        with span("overall_assessment") as s, _admit(messages, 1500) as ticket:
+            completion = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=1500
+            )
+            s.record_usage(completion)
+            ticket.record_usage(completion)
+        return completion.choices[0].message.content.strip()
+        
+    except Exception as e:
+        return f"Error generating overall assessment: {str(e)}"
+
+def stream_overall_assessment(candidate_data):
+    """Streaming generate_overall_assessment; see _stream_completion."""
+    return (yield from _stream_completion(
+        "overall_assessment", _overall_assessment_messages(candidate_data), 1500,
+        "Error generating overall assessment"))
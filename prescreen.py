@@ -0,0 +1,313 @@
+"""Local resume score predictor for early rejection of clear rejects.
+
+A ridge regression (NumPy only, CPU) is trained per tenant on features of the
+parsed resume to predict the synthesizer's Final Resume Score. Its error is
+estimated out of fold, so a prediction comes with the probability that the
+real score would fall below the pass mark (analytics.PASS_SCORE). When that
+probability reaches OMNISIGHT_PRESCREEN_CONFIDENCE, queued jobs act on
+OMNISIGHT_PRESCREEN:
+
+    off     always run the resume agents (default)
+    skip    skip the three resume agents and the overall assessment
+    defer   move the job to the low-priority "deferred" batch, which workers
+            only claim when nothing else is queued
+
+    python prescreen.py evaluate                # cross-validated calibration report
+    python prescreen.py train                   # fit on the store and save the model
+    python prescreen.py predict CANDIDATE_ID
+"""
+import argparse
+import json
+import math
+import os
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+from analytics import PASS_SCORE
+from app_logging import get_logger
+from scoring import extract_resume_score
+from store import iter_candidates, load_candidate_data
+from tenancy import set_tenant, tenant_path
+
+SCORE_MODEL_PATH = os.environ.get("OMNISIGHT_SCORE_MODEL", "score_model.json")
+PRESCREEN_POLICY = os.environ.get("OMNISIGHT_PRESCREEN", "off")
+PRESCREEN_CONFIDENCE = float(os.environ.get("OMNISIGHT_PRESCREEN_CONFIDENCE", 0.95))
+# A model trained on fewer records never rejects
+PRESCREEN_MIN_RECORDS = int(os.environ.get("OMNISIGHT_PRESCREEN_MIN_RECORDS", 50))
+
+RUN = "run"
+SKIP = "skip"
+DEFER = "defer"
+POLICIES = ("off", SKIP, DEFER)
+
+FEATURES = [
+    "education_count", "max_gpa", "graduate_degree", "experience_count", "bullet_count", "mean_bullet_words",
+    "quantified_bullet_share", "experience_years", "latest_year", "project_count", "extracurricular_count",
+    "sports_count", "skill_count", "summary_words", "contact_fields",
+]
+
+# Upper edges of the predicted-confidence bins in the calibration report
+CALIBRATION_BINS = [0.5, 0.8, 0.9, 0.95, 0.99, 1.0]
+
+_YEAR = re.compile(r"\b(19[5-9]\d|20\d\d)\b")
+_NUMBER = re.compile(r"\d")
+_GRADUATE = re.compile(r"\b(master|m\.s\.|ms|mba|ph\.?d|doctor|j\.d\.|m\.d\.)\b", re.IGNORECASE)
+
+logger = get_logger("prescreen")
+
+_models = {}
+
+
+def _items(value):
+    return [item for item in value if item] if isinstance(value, list) else []
+
+
+def _strings(value):
+    """Every string inside a parsed-resume value."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _strings(v)
+
+
+def _gpa(value):
+    try:
+        gpa = float(str(value).split("/")[0].strip())
+    except ValueError:
+        return 0.0
+    return gpa if 0 < gpa <= 4.0 else 0.0
+
+
+def resume_features(parsed_data):
+    """Feature vector (ordered as FEATURES) for a parsed resume."""
+    parsed_data = parsed_data or {}
+    education = [e for e in _items(parsed_data.get("education")) if isinstance(e, dict)]
+    experience = [e for e in _items(parsed_data.get("experience")) if isinstance(e, dict)]
+    bullets = [b for e in experience for b in _items(e.get("responsibilities")) if isinstance(b, str)]
+    skills = [s for group in _items(parsed_data.get("skills")) if isinstance(group, dict)
+              for s in _items(group.get("items"))]
+    years = [int(y) for e in experience + education for y in _YEAR.findall(" ".join(_strings(e)))]
+    contact = parsed_data.get("contact_info") if isinstance(parsed_data.get("contact_info"), dict) else {}
+
+    values = {
+        "education_count": len(education),
+        "max_gpa": max([_gpa(e.get("gpa")) for e in education] or [0.0]),
+        "graduate_degree": float(any(_GRADUATE.search(str(e.get("degree") or "")) for e in education)),
+        "experience_count": len(experience),
+        "bullet_count": len(bullets),
+        "mean_bullet_words": float(np.mean([len(b.split()) for b in bullets])) if bullets else 0.0,
+        "quantified_bullet_share": sum(bool(_NUMBER.search(b)) for b in bullets) / len(bullets) if bullets else 0.0,
+        "experience_years": (max(years) - min(years)) if years else 0.0,
+        # Relative to the current year, so the feature does not drift as time passes
+        "latest_year": (datetime.now().year - max(years)) if years else 10.0,
+        "project_count": len(_items(parsed_data.get("projects"))),
+        "extracurricular_count": len(_items(parsed_data.get("extracurriculars"))),
+        "sports_count": len(_items(parsed_data.get("sports"))),
+        "skill_count": len(skills),
+        "summary_words": len(str(parsed_data.get("summary") or "").split()),
+        "contact_fields": sum(bool(contact.get(k)) for k in ("name", "email", "phone", "location")),
+    }
+    return np.array([float(values[name]) for name in FEATURES])
+
+
+def training_data(records):
+    """(X, y) from candidate records that have a parsed resume and a resume score."""
+    rows, targets = [], []
+    for candidate_data in records:
+        score = extract_resume_score(candidate_data.get("resume_synthesis"))
+        if score is None or not candidate_data.get("resume"):
+            continue
+        rows.append(resume_features(candidate_data["resume"]))
+        targets.append(score)
+    if not rows:
+        return np.empty((0, len(FEATURES))), np.empty(0)
+    return np.vstack(rows), np.array(targets)
+
+
+def _fit(X, y, alpha):
+    """Ridge regression on standardized features; the intercept is not penalized."""
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Z = (X - mean) / scale
+    weights = np.linalg.solve(Z.T @ Z + alpha * np.eye(Z.shape[1]), Z.T @ (y - y.mean()))
+    return {"mean": mean, "scale": scale, "weights": weights, "intercept": float(y.mean())}
+
+
+def _predict(params, X):
+    return (X - params["mean"]) / params["scale"] @ params["weights"] + params["intercept"]
+
+
+def reject_confidence(predicted, sigma, pass_score=PASS_SCORE):
+    """Probability that the real score is below pass_score, with Gaussian error sigma."""
+    return 0.5 * (1 + math.erf((pass_score - predicted) / (sigma * math.sqrt(2))))
+
+
+def cross_validate(X, y, alpha=1.0, folds=5, seed=0):
+    """Out-of-fold predictions for every record."""
+    order = np.random.default_rng(seed).permutation(len(y))
+    predictions = np.empty(len(y))
+    for fold in np.array_split(order, folds):
+        train = np.setdiff1d(order, fold)
+        predictions[fold] = _predict(_fit(X[train], y[train], alpha), X[fold])
+    return predictions
+
+
+def calibration_report(y, predictions, threshold=PRESCREEN_CONFIDENCE, pass_score=PASS_SCORE):
+    """Error, reliability of the reject confidence and the effect of threshold, from out-of-fold predictions."""
+    residuals = y - predictions
+    sigma = float(residuals.std()) or 1.0
+    confidence = np.array([reject_confidence(p, sigma, pass_score) for p in predictions])
+    failed = y < pass_score
+
+    bins = []
+    low = 0.0
+    for high in CALIBRATION_BINS:
+        in_bin = (confidence >= low) & ((confidence < high) | (high == 1.0))
+        if in_bin.any():
+            bins.append({"confidence": f"{low:.2f}-{high:.2f}", "count": int(in_bin.sum()),
+                         "predicted": round(float(confidence[in_bin].mean()), 3),
+                         "observed": round(float(failed[in_bin].mean()), 3)})
+        low = high
+
+    flagged = confidence >= threshold
+    total_variance = float(((y - y.mean()) ** 2).sum()) or 1.0
+    return {
+        "records": int(len(y)),
+        "mae": round(float(np.abs(residuals).mean()), 2),
+        "rmse": round(float(np.sqrt((residuals ** 2).mean())), 2),
+        "r2": round(1 - float((residuals ** 2).sum()) / total_variance, 3),
+        "sigma": round(sigma, 3),
+        # Share of scores inside the central 90% interval; near 0.9 means sigma is honest
+        "interval_90_coverage": round(float((np.abs(residuals) <= 1.645 * sigma).mean()), 3),
+        "reliability": bins,
+        "threshold": threshold,
+        "flagged": int(flagged.sum()),
+        "flagged_share": round(float(flagged.mean()), 3),
+        "flagged_precision": round(float(failed[flagged].mean()), 3) if flagged.any() else None,
+        # Candidates who would have passed but were rejected early
+        "false_rejects": int((flagged & ~failed).sum()),
+    }
+
+
+def train(records, alpha=1.0, folds=5, threshold=PRESCREEN_CONFIDENCE):
+    """Fit the model on records; returns (model dict, out-of-fold calibration report)."""
+    X, y = training_data(records)
+    if len(y) < max(folds, 2):
+        raise ValueError(f"Need at least {max(folds, 2)} scored candidates to train, found {len(y)}")
+    report = calibration_report(y, cross_validate(X, y, alpha, folds), threshold)
+    params = _fit(X, y, alpha)
+    model = {
+        "features": FEATURES,
+        "mean": params["mean"].tolist(),
+        "scale": params["scale"].tolist(),
+        "weights": params["weights"].tolist(),
+        "intercept": params["intercept"],
+        "sigma": report["sigma"],
+        "alpha": alpha,
+        "records": report["records"],
+        "trained_at": time.time(),
+    }
+    return model, report
+
+
+def save_model(model):
+    path = tenant_path(SCORE_MODEL_PATH)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(model, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_model():
+    """The current tenant's model, or None if none was trained (reloaded when the file changes)."""
+    path = tenant_path(SCORE_MODEL_PATH)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _models.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            model = json.load(f)
+        if model.get("features") != FEATURES:
+            logger.warning("Score model was trained on different features; retrain it", extra={"path": path})
+            model = None
+        _models[path] = cached = (mtime, model)
+    return cached[1]
+
+
+def predict(parsed_data, model=None):
+    """(predicted resume score, reject confidence) for a parsed resume, or None without a model."""
+    model = model or load_model()
+    if model is None:
+        return None
+    params = {key: np.array(model[key]) for key in ("mean", "scale", "weights")}
+    params["intercept"] = model["intercept"]
+    predicted = float(_predict(params, resume_features(parsed_data)[None, :])[0])
+    return predicted, reject_confidence(predicted, model["sigma"])
+
+
+def prescreen(parsed_data, policy=None, threshold=None):
+    """Decide whether a queued job runs the resume agents: {"action": run|skip|defer, ...}."""
+    policy = policy or PRESCREEN_POLICY
+    threshold = PRESCREEN_CONFIDENCE if threshold is None else threshold
+    model = load_model() if policy != "off" else None
+    if model is None or model["records"] < PRESCREEN_MIN_RECORDS:
+        return {"action": RUN}
+    predicted, confidence = predict(parsed_data, model)
+    action = policy if confidence >= threshold else RUN
+    return {"action": action, "predicted_score": round(predicted, 1), "reject_confidence": round(confidence, 4),
+            "model_trained_at": model["trained_at"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local resume score predictor for early rejection")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("train", "Fit on the candidate store and save the model"),
+                            ("evaluate", "Cross-validated calibration report without saving")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--alpha", type=float, default=1.0, help="Ridge penalty")
+        sub.add_argument("--folds", type=int, default=5)
+        sub.add_argument("--threshold", type=float, default=PRESCREEN_CONFIDENCE,
+                         help="Reject confidence to report flagged candidates at")
+    predict_parser = subparsers.add_parser("predict", help="Predict a stored candidate's resume score")
+    predict_parser.add_argument("candidate_id")
+    parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    if args.tenant:
+        set_tenant(args.tenant)
+
+    if args.command == "predict":
+        candidate_data = load_candidate_data(args.candidate_id)
+        if candidate_data is None:
+            parser.error(f"Candidate {args.candidate_id} not found")
+        prediction = predict(candidate_data.get("resume"))
+        if prediction is None:
+            parser.error("No score model trained yet; run: python prescreen.py train")
+        predicted, confidence = prediction
+        print(json.dumps({"predicted_score": round(predicted, 1), "reject_confidence": round(confidence, 4),
+                          "actual_score": extract_resume_score(candidate_data.get("resume_synthesis"))}, indent=2))
+        return
+
+    try:
+        model, report = train(iter_candidates(), args.alpha, args.folds, args.threshold)
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(report, indent=2))
+    if args.command == "train":
+        print(f"Saved model trained on {model['records']} candidates to {save_model(model)}")
+
+
+if __name__ == "__main__":
+    main()
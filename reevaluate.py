@@ -0,0 +1,245 @@
+"""Re-score stored candidates after prompt or rubric changes.
+
+Every evaluation is stamped with per-stage prompt version hashes
+(pipeline.current_prompt_versions). This command streams over the candidate
+store, re-runs only the stages whose hash no longer matches, keeps the
+previous outputs in each record's `evaluation_history`, and reports score
+deltas.
+
+    python reevaluate.py --dry-run
+    python reevaluate.py --workers 8 --report deltas.jsonl
+"""
+import argparse
+import contextvars
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+from admission import BULK, use_priority
+from app_logging import configure_logging, get_logger
+import prescreen
+from pipeline import (
+    current_prompt_versions,
+    generate_combined_evaluation,
+    generate_overall_assessment,
+    get_completion_evaluation,
+    is_error_result,
+    run_primary_evaluator,
+    run_skeptic_evaluator,
+    run_synthesizer,
+)
+from scoring import extract_scores
+from store import iter_candidates, load_candidate_data, save_candidate_to_file
+from tenancy import set_tenant
+from versions import compact
+
+# Stages in dependency order and the record field each one writes
+STAGE_FIELDS = {
+    "primary": "primary_evaluator_output",
+    "skeptic": "skeptic_evaluator_output",
+    "synthesizer": "resume_synthesis",
+    "grade": "evaluations",
+    "combined": "final_evaluation",
+    "overall": "overall_assessment",
+}
+RESUME_STAGES = ("primary", "skeptic", "synthesizer")
+REASONING_STAGES = ("grade", "combined")
+# Stages a prescreen SKIP leaves out (see jobqueue._process_job)
+PRESCREEN_SKIPPED_STAGES = ("primary", "skeptic", "synthesizer", "overall")
+DELTA_SCORES = ("resume_score", "reasoning_score", "overall_score")
+
+logger = get_logger("reevaluate")
+
+
+def stale_stages(candidate_data, versions, only=None):
+    """Stages whose stored prompt version differs from the current one."""
+    stored = candidate_data.get("prompt_versions") or {}
+    skipped = (candidate_data.get("prescreen") or {}).get("action") == prescreen.SKIP
+    stages = []
+    for stage in STAGE_FIELDS:
+        if only and stage not in only:
+            continue
+        if stored.get(stage) == versions[stage]:
+            continue
+        # Stages without their inputs, or skipped by the prescreen, were never run for this record
+        if skipped and stage in PRESCREEN_SKIPPED_STAGES:
+            continue
+        if stage in RESUME_STAGES and not candidate_data.get("resume"):
+            continue
+        if stage in REASONING_STAGES and not candidate_data.get("responses"):
+            continue
+        stages.append(stage)
+    return stages
+
+
+def _checked(result, stage):
+    if result is None or is_error_result(result):
+        raise RuntimeError(f"{stage} failed: {result}")
+    return result
+
+
+def rerun_stages(candidate_data, stages):
+    """Return a copy of the record with the given stages re-run in dependency order."""
+    updated = dict(candidate_data)
+    resume = updated.get("resume")
+
+    if "primary" in stages:
+        updated["primary_evaluator_output"] = _checked(run_primary_evaluator(resume), "primary")
+    if "skeptic" in stages:
+        updated["skeptic_evaluator_output"] = _checked(
+            run_skeptic_evaluator(resume, updated["primary_evaluator_output"]), "skeptic")
+    if "synthesizer" in stages:
+        updated["resume_synthesis"] = _checked(
+            run_synthesizer(resume, updated["primary_evaluator_output"], updated["skeptic_evaluator_output"]),
+            "synthesizer")
+    if "grade" in stages:
+        updated["evaluations"] = {
+            q_id: _checked(get_completion_evaluation(answer), "grade")
+            for q_id, answer in updated["responses"].items()
+        }
+    if "combined" in stages:
+        updated["final_evaluation"] = _checked(
+            generate_combined_evaluation(updated["responses"], updated["evaluations"]), "combined")
+    if "overall" in stages:
+        context = {k: v for k, v in updated.items() if k not in ("evaluation_history", "overall_assessment")}
+        updated["overall_assessment"] = _checked(generate_overall_assessment(context), "overall")
+    return updated
+
+
+def reevaluate_candidate(candidate_id, stages, versions):
+    """Re-run stale stages for one candidate and append the old outputs to its history."""
+    # Reload so the record is current and only one full record per worker is in memory
+    record = load_candidate_data(candidate_id)
+    if record is None:
+        raise RuntimeError("candidate disappeared")
+
+    updated = rerun_stages(record, stages)
+    evaluated_at = datetime.now(timezone.utc).isoformat()
+    history_entry = {
+        "evaluated_at": record.get("evaluated_at", record.get("timestamp")),
+        "superseded_at": evaluated_at,
+        "prompt_versions": record.get("prompt_versions") or {},
+        "outputs": {STAGE_FIELDS[stage]: record.get(STAGE_FIELDS[stage]) for stage in stages},
+    }
+    updated["evaluation_history"] = list(record.get("evaluation_history") or []) + [history_entry]
+    updated["prompt_versions"] = {**(record.get("prompt_versions") or {}), **{stage: versions[stage] for stage in stages}}
+    updated["evaluated_at"] = evaluated_at
+    save_candidate_to_file(updated)
+
+    before, after = extract_scores(record), extract_scores(updated)
+    deltas = {
+        key: (after[key] - before[key]) if before[key] is not None and after[key] is not None else None
+        for key in DELTA_SCORES
+    }
+    return {"before": {k: before[k] for k in DELTA_SCORES}, "after": {k: after[k] for k in DELTA_SCORES}, "delta": deltas}
+
+
+def reevaluate_all(workers=4, dry_run=False, limit=None, only=None, report=None):
+    """Stream over the store and re-evaluate stale records with bounded concurrency."""
+    versions = current_prompt_versions()
+    summary = {"scanned": 0, "stale": 0, "reevaluated": 0, "failed": 0, "stage_counts": {}}
+    delta_sums = {key: [0.0, 0.0, 0] for key in DELTA_SCORES}  # sum, sum of abs, count
+
+    def record_result(candidate_id, stages, result=None, error=None):
+        line = {"candidate_id": candidate_id, "stages": stages}
+        if error is not None:
+            summary["failed"] += 1
+            line["error"] = error
+        elif result is not None:
+            summary["reevaluated"] += 1
+            line.update(result)
+            for key, delta in result["delta"].items():
+                if delta is not None:
+                    delta_sums[key][0] += delta
+                    delta_sums[key][1] += abs(delta)
+                    delta_sums[key][2] += 1
+        if report:
+            report.write(json.dumps(line) + "\n")
+
+    # Re-scoring yields model call slots and budget to UI sessions and API uploads
+    with use_priority(BULK), ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+
+        def drain(block_until):
+            # Wait until fewer than block_until tasks are in flight
+            while len(pending) >= block_until and pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    candidate_id, stages = pending.pop(future)
+                    try:
+                        record_result(candidate_id, stages, result=future.result())
+                    except Exception as e:
+                        logger.exception("Re-evaluation failed", extra={"candidate_id": candidate_id})
+                        record_result(candidate_id, stages, error=str(e))
+
+        for candidate_data in iter_candidates():
+            summary["scanned"] += 1
+            stages = stale_stages(candidate_data, versions, only)
+            if not stages:
+                continue
+            summary["stale"] += 1
+            for stage in stages:
+                summary["stage_counts"][stage] = summary["stage_counts"].get(stage, 0) + 1
+
+            candidate_id = candidate_data["candidate_id"]
+            del candidate_data
+            if dry_run:
+                record_result(candidate_id, stages)
+            else:
+                drain(workers * 2)
+                # Run in a copy of this context so worker threads see the active tenant
+                future = executor.submit(
+                    contextvars.copy_context().run, reevaluate_candidate, candidate_id, stages, versions)
+                pending[future] = (candidate_id, stages)
+
+            if limit and summary["stale"] >= limit:
+                break
+        drain(1)
+
+    summary["score_deltas"] = {
+        key: {
+            "count": count,
+            "mean": round(total / count, 2) if count else None,
+            "mean_abs": round(total_abs / count, 2) if count else None,
+        }
+        for key, (total, total_abs, count) in delta_sums.items()
+    }
+    if summary["reevaluated"]:
+        # Re-scoring is what lengthens version chains; snapshot the long ones now
+        summary["snapshotted"] = compact()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-evaluate candidates whose prompts have changed")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent candidates being re-evaluated")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which records are stale")
+    parser.add_argument("--limit", type=int, help="Stop after this many stale records")
+    parser.add_argument("--stages", help="Comma-separated subset of stages to consider, e.g. synthesizer,overall")
+    parser.add_argument("--report", help="Write one JSON line per stale candidate to this file")
+    parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.tenant:
+        set_tenant(args.tenant)
+    only = set(args.stages.split(",")) if args.stages else None
+    if only and not only <= set(STAGE_FIELDS):
+        parser.error(f"--stages must be among {', '.join(STAGE_FIELDS)}")
+
+    started = time.perf_counter()
+    report = open(args.report, "w") if args.report else None
+    try:
+        summary = reevaluate_all(args.workers, args.dry_run, args.limit, only, report)
+    finally:
+        if report:
+            report.close()
+    summary["elapsed_s"] = round(time.perf_counter() - started, 1)
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
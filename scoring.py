@@ -0,0 +1,101 @@
+import re
+
+# Rating scales such as "(20–80)" that appear next to score headings
+_SCALE = re.compile(r"\(\s*\d+\s*[–-]\s*\d+\s*\)")
+_NUMBER = re.compile(r"\d{1,3}(?:\.\d+)?")
+
+RESUME_SCORE_HEADING = re.compile(r"Final Resume Score", re.IGNORECASE)
+REASONING_SCORE_HEADING = re.compile(r"Final Score", re.IGNORECASE)
+OVERALL_SCORE_HEADING = re.compile(r"Overall Candidate Score", re.IGNORECASE)
+SKEPTICISM_SCORE_HEADING = re.compile(r"Skepticism Score", re.IGNORECASE)
+
+# Category ratings written by the primary evaluator and the reasoning grader
+PRIMARY_CATEGORIES = {
+    "believability": r"Believability",
+    "role_depth": r"Role Depth & Function",
+    "pedigree": r"Pedigree \(Contextualized\)",
+    "impact": r"Impact & Specificity",
+    "writing": r"Writing & Communication",
+    "consistency": r"Consistency",
+    "trajectory": r"Trajectory",
+}
+GRADER_CATEGORIES = {
+    "clarity": r"Clarity",
+    "logic": r"Logical reasoning",
+    "originality": r"Originality",
+    "specificity": r"Specificity and realism of strategy",
+}
+
+
+def _score_after(heading, text, low, high, same_line=False):
+    """First in-range number following a heading, e.g. "### Final Resume Score (20–80)\n72"."""
+    if not isinstance(text, str) or not text:
+        return None
+    match = heading.search(text)
+    if not match:
+        return None
+    tail = text[match.end():match.end() + 120]
+    if same_line:
+        tail = tail.split("\n", 1)[0]
+    tail = _SCALE.sub("", tail)
+    number = _NUMBER.search(tail)
+    if not number:
+        return None
+    value = float(number.group(0))
+    return value if low <= value <= high else None
+
+
+def extract_resume_score(synthesis):
+    """Final Resume Score (20–80) from the synthesizer output."""
+    return _score_after(RESUME_SCORE_HEADING, synthesis, 20, 80)
+
+
+def extract_reasoning_score(final_evaluation):
+    """Final Score (20–80) from the combined reasoning evaluation."""
+    return _score_after(REASONING_SCORE_HEADING, final_evaluation, 20, 80)
+
+
+def extract_overall_score(overall_assessment):
+    """Overall Candidate Score (20–80) from the overall assessment."""
+    return _score_after(OVERALL_SCORE_HEADING, overall_assessment, 20, 80)
+
+
+def extract_skepticism_score(skeptic_output):
+    """Skepticism Score (1–10) from the skeptic output."""
+    return _score_after(SKEPTICISM_SCORE_HEADING, skeptic_output, 1, 10)
+
+
+def _category_scores(text, categories, low, high):
+    scores = {}
+    for key, label in categories.items():
+        # "**Believability (1–10):** 7" or "Clarity: 7"
+        scores[key] = _score_after(re.compile(label, re.IGNORECASE), text, low, high, same_line=True)
+    return scores
+
+
+def extract_primary_scores(primary_output):
+    """Per-category 1–10 ratings from the primary evaluator output."""
+    return _category_scores(primary_output, PRIMARY_CATEGORIES, 1, 10)
+
+
+def extract_grader_scores(evaluation):
+    """Clarity/Logic/Originality/Specificity 0–10 scores from one graded answer."""
+    return _category_scores(evaluation, GRADER_CATEGORIES, 0, 10)
+
+
+def extract_scores(candidate_data):
+    """All numeric scores of a candidate record, None where a score is missing."""
+    scores = {
+        "resume_score": extract_resume_score(candidate_data.get("resume_synthesis")),
+        "reasoning_score": extract_reasoning_score(candidate_data.get("final_evaluation")),
+        "overall_score": extract_overall_score(candidate_data.get("overall_assessment")),
+        "skepticism_score": extract_skepticism_score(candidate_data.get("skeptic_evaluator_output")),
+    }
+    scores.update(extract_primary_scores(candidate_data.get("primary_evaluator_output")))
+
+    # Average each grader category over the answered questions
+    per_question = [extract_grader_scores(e) for e in (candidate_data.get("evaluations") or {}).values()]
+    for key in GRADER_CATEGORIES:
+        values = [q[key] for q in per_question if q[key] is not None]
+        scores[key] = sum(values) / len(values) if values else None
+    return scores
@@ -0,0 +1,121 @@
+"""Bounded in-process cache for the bodies Streamlit sessions display.
+
+Session state keeps only ids (the job id, question ids, the selected
+candidate); parsed resumes, agent outputs, evaluations and candidate records
+are fetched through this cache. Memory per process is then bounded by the
+cache size instead of growing with the number of open sessions.
+
+Job checkpoints never change once written, so they stay cached until evicted,
+except the extracted text and parse, which a PII purge (see archive.py) can
+delete from another process. Those, and candidate records, which can be
+re-saved (re-scoring, a late overall assessment, a purge), expire after
+OMNISIGHT_SESSION_CACHE_TTL seconds. Cached values are shared
+between sessions and must not be mutated; copy them first.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import jobqueue
+from pipeline import format_resume
+from store import iter_candidate_summaries, load_candidate_data
+from tenancy import current_tenant
+
+SESSION_CACHE_SIZE = int(os.environ.get("OMNISIGHT_SESSION_CACHE_SIZE", 256))
+SESSION_CACHE_TTL = float(os.environ.get("OMNISIGHT_SESSION_CACHE_TTL", 30))
+
+# Checkpoints holding the raw resume, which a PII purge deletes
+PII_STAGES = ("extract", "parse")
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _cached(key, fn, ttl=None):
+    """Return the cached value for key, or run fn and cache a non-None result."""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and (entry[1] is None or entry[1] > now):
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[0]
+        _stats["misses"] += 1
+    value = fn()
+    if value is None:
+        return None
+    with _lock:
+        _entries[key] = (value, now + ttl if ttl else None)
+        _entries.move_to_end(key)
+        while len(_entries) > SESSION_CACHE_SIZE:
+            _entries.popitem(last=False)
+    return value
+
+
+def checkpoint(job_id, stage_key):
+    """A job's stage result, or None if the stage has not completed."""
+    if not job_id:
+        return None
+    return _cached(("checkpoint", job_id, stage_key), lambda: jobqueue.get_checkpoint(job_id, stage_key),
+                   SESSION_CACHE_TTL if stage_key in PII_STAGES else None)
+
+
+def formatted_resume(job_id):
+    """Markdown for a job's parsed resume, or None before parsing."""
+    parsed_data = checkpoint(job_id, "parse")
+    if parsed_data is None:
+        return None
+    return _cached(("formatted", job_id), lambda: format_resume(parsed_data), SESSION_CACHE_TTL)
+
+
+def candidate(candidate_id):
+    """A stored candidate record of the current tenant, or None."""
+    return _cached(("candidate", current_tenant(), candidate_id),
+                   lambda: load_candidate_data(candidate_id), SESSION_CACHE_TTL)
+
+
+def formatted_candidate_resume(candidate_id):
+    """Markdown for a stored candidate's resume, or None if the record does not exist."""
+    candidate_data = candidate(candidate_id)
+    if candidate_data is None:
+        return None
+    return _cached(("formatted_candidate", current_tenant(), candidate_id),
+                   lambda: format_resume(candidate_data.get("resume")), SESSION_CACHE_TTL)
+
+
+def candidate_summaries():
+    """(candidate_id, timestamp) of every candidate of the current tenant, newest first."""
+    def load():
+        summaries = [s for s in iter_candidate_summaries() if s[1]]
+        summaries.sort(key=lambda s: s[1], reverse=True)
+        return summaries
+
+    return _cached(("summaries", current_tenant()), load, SESSION_CACHE_TTL)
+
+
+def invalidate_candidate(candidate_id):
+    """Drop a candidate (and the candidate list) after it was saved from this process."""
+    with _lock:
+        _entries.pop(("candidate", current_tenant(), candidate_id), None)
+        _entries.pop(("formatted_candidate", current_tenant(), candidate_id), None)
+        _entries.pop(("summaries", current_tenant()), None)
+
+
+def invalidate_job(job_id):
+    """Drop a job's cached raw resume after it was purged."""
+    with _lock:
+        for stage_key in PII_STAGES:
+            _entries.pop(("checkpoint", job_id, stage_key), None)
+        _entries.pop(("formatted", job_id), None)
+
+
+def cache_stats():
+    with _lock:
+        return {"entries": len(_entries), "max_entries": SESSION_CACHE_SIZE, **_stats}
+
+
+def clear():
+    with _lock:
+        _entries.clear()
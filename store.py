@@ -0,0 +1,423 @@
+"""Candidate record storage.
+
+Records are stored per tenant (see tenancy.py) through a pluggable backend,
+selected with OMNISIGHT_STORE_BACKEND:
+
+    files    one JSON file per candidate under <tenant root>/candidates (default)
+    sqlite   one SQLite file per tenant, safe for many processes on one host
+    pkg.module:ClassName
+             any CandidateStore implementation, e.g. a network store shared
+             by several hosts
+
+The module-level functions below are what the rest of the app calls; they
+always act on the current tenant's store, falling back to its archive of old
+records (see archive.py). The local backends write records as canonical,
+compact JSON (see models.py).
+"""
+import os
+import re
+import json
+import uuid
+import sqlite3
+import threading
+import importlib
+from datetime import datetime, timezone
+import archive
+from analytics import update_rollups
+from app_logging import get_logger
+from models import SchemaError, dumps, encode_record
+from tenancy import tenant_root
+from versions import record_version
+
+logger = get_logger("store")
+
+STORE_BACKEND = os.environ.get("OMNISIGHT_STORE_BACKEND", "files")
+CANDIDATES_DIR = "candidates"
+CANDIDATES_DB = "candidates.sqlite3"
+# Canonical records (see models.py) start with schema_version, candidate_id and timestamp
+_CANONICAL_HEAD = re.compile(r'^\{"schema_version":\d+,"candidate_id":"[^"]*"(?:,"timestamp":"([^"]*)")?')
+SUMMARY_HEAD_BYTES = 512
+
+
+def _encode(candidate_data):
+    """Canonical compact JSON for a record (see models.py)."""
+    try:
+        return encode_record(candidate_data)
+    except SchemaError:
+        # Records saved before validation are kept as they are rather than lost
+        logger.warning("Record does not match the data model", exc_info=True,
+                       extra={"candidate_id": candidate_data.get("candidate_id")})
+        return dumps(candidate_data)
+
+
+class CandidateStore:
+    """Interface a candidate store backend implements.
+
+    A backend is constructed with the tenant's root path (a directory for
+    local backends; network backends may use it only as a namespace key) and
+    must be safe to call from several threads and processes at once. Records
+    are JSON-serializable dicts keyed by their "candidate_id".
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def save(self, candidate_data):
+        """Insert or replace a record atomically; readers never see a partial record."""
+        raise NotImplementedError
+
+    def load(self, candidate_id):
+        """Return the record, or None if it does not exist."""
+        raise NotImplementedError
+
+    def delete(self, candidate_id):
+        """Remove a record if it exists."""
+        raise NotImplementedError
+
+    def delete_if_unchanged(self, candidate_id, candidate_data):
+        """Remove the record only if it still equals candidate_data, atomically; returns whether it did.
+
+        Backends that cannot compare and delete atomically keep the record.
+        """
+        return False
+
+    def save_if_unchanged(self, candidate_data, expected):
+        """Replace the record with candidate_data only if it still equals expected, atomically; returns whether it did.
+
+        Backends that cannot compare and replace atomically keep the record.
+        """
+        return False
+
+    def ids(self):
+        """Return the ids of all stored records."""
+        raise NotImplementedError
+
+    def iter_records(self):
+        """Yield every record, holding one at a time in memory."""
+        for candidate_id in self.ids():
+            candidate_data = self.load(candidate_id)
+            if candidate_data is not None:
+                yield candidate_data
+
+    def summaries(self):
+        """Yield (candidate_id, timestamp) for every record without keeping the records."""
+        for candidate_data in self.iter_records():
+            yield candidate_data["candidate_id"], candidate_data.get("timestamp")
+
+
+class FileCandidateStore(CandidateStore):
+    """One JSON file per candidate."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.directory = os.path.join(root, CANDIDATES_DIR)
+
+    def _path(self, candidate_id):
+        return os.path.join(self.directory, f"{candidate_id}.json")
+
+    def save(self, candidate_data):
+        os.makedirs(self.directory, exist_ok=True)
+        file_path = self._path(candidate_data["candidate_id"])
+        # Write to a temp file and rename so concurrent readers (UI, API) never see a partial record
+        tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(_encode(candidate_data))
+        os.replace(tmp_path, file_path)
+
+    def load(self, candidate_id):
+        try:
+            with open(self._path(candidate_id), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def delete(self, candidate_id):
+        try:
+            os.remove(self._path(candidate_id))
+        except FileNotFoundError:
+            pass
+
+    def delete_if_unchanged(self, candidate_id, candidate_data):
+        # Move the file aside first, so a save after the move is never the one deleted
+        file_path = self._path(candidate_id)
+        moved_path = f"{file_path}.{uuid.uuid4().hex}.deleting"
+        try:
+            os.replace(file_path, moved_path)
+        except FileNotFoundError:
+            return False
+        try:
+            with open(moved_path, 'r') as f:
+                if json.load(f) == candidate_data:
+                    return True
+            # Re-saved before the move: put it back, unless an even newer save is already there
+            try:
+                os.link(moved_path, file_path)
+            except FileExistsError:
+                pass
+            return False
+        finally:
+            os.remove(moved_path)
+
+    def save_if_unchanged(self, candidate_data, expected):
+        file_path = self._path(candidate_data["candidate_id"])
+        tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(_encode(candidate_data))
+        # As in delete_if_unchanged: a save after the move is never the one overwritten
+        moved_path = f"{file_path}.{uuid.uuid4().hex}.saving"
+        try:
+            try:
+                os.replace(file_path, moved_path)
+            except FileNotFoundError:
+                return False
+            try:
+                with open(moved_path, 'r') as f:
+                    unchanged = json.load(f) == expected
+                try:
+                    os.link(tmp_path if unchanged else moved_path, file_path)
+                except FileExistsError:
+                    # An even newer save landed meanwhile and is kept
+                    return False
+                return unchanged
+            finally:
+                os.remove(moved_path)
+        finally:
+            os.remove(tmp_path)
+
+    def ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [name[:-len(".json")] for name in names if name.endswith(".json")]
+
+    def summaries(self):
+        # Canonical files are read only up to the timestamp; older files are parsed whole
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path, 'rb') as f:
+                        head = f.read(SUMMARY_HEAD_BYTES)
+                        match = _CANONICAL_HEAD.match(head.decode("utf-8", "ignore"))
+                        if match:
+                            yield entry.name[:-len(".json")], match.group(1)
+                            continue
+                        f.seek(0)
+                        candidate_data = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    continue
+                yield candidate_data["candidate_id"], candidate_data.get("timestamp")
+
+    def iter_records(self):
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path, 'r') as f:
+                        yield json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    # Deleted or replaced while iterating
+                    continue
+
+
+class SQLiteCandidateStore(CandidateStore):
+    """All of a tenant's candidates in one SQLite file (WAL, one connection per thread)."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS candidates (
+        candidate_id TEXT PRIMARY KEY,
+        timestamp TEXT,
+        data TEXT NOT NULL
+    );
+    """
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.path = os.path.join(root, CANDIDATES_DB)
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def save(self, candidate_data):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO candidates (candidate_id, timestamp, data) VALUES (?, ?, ?)",
+            (candidate_data["candidate_id"], candidate_data.get("timestamp"), _encode(candidate_data)),
+        )
+
+    def load(self, candidate_id):
+        row = self._connect().execute(
+            "SELECT data FROM candidates WHERE candidate_id = ?", (candidate_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, candidate_id):
+        self._connect().execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,))
+
+    def delete_if_unchanged(self, candidate_id, candidate_data):
+        conn = self._connect()
+        # The write lock keeps saves out between the compare and the delete
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM candidates WHERE candidate_id = ?", (candidate_id,)).fetchone()
+            unchanged = row is not None and json.loads(row[0]) == candidate_data
+            if unchanged:
+                conn.execute("DELETE FROM candidates WHERE candidate_id = ?", (candidate_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return unchanged
+
+    def save_if_unchanged(self, candidate_data, expected):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM candidates WHERE candidate_id = ?", (candidate_data["candidate_id"],)
+            ).fetchone()
+            unchanged = row is not None and json.loads(row[0]) == expected
+            if unchanged:
+                conn.execute(
+                    "UPDATE candidates SET timestamp = ?, data = ? WHERE candidate_id = ?",
+                    (candidate_data.get("timestamp"), _encode(candidate_data), candidate_data["candidate_id"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return unchanged
+
+    def ids(self):
+        return [row[0] for row in self._connect().execute("SELECT candidate_id FROM candidates")]
+
+    def iter_records(self):
+        # Cursor iteration streams rows instead of fetching the whole table
+        for (data,) in self._connect().execute("SELECT data FROM candidates"):
+            yield json.loads(data)
+
+    def summaries(self):
+        return self._connect().execute("SELECT candidate_id, timestamp FROM candidates").fetchall()
+
+
+BACKENDS = {"files": FileCandidateStore, "sqlite": SQLiteCandidateStore}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _backend_class(spec):
+    if spec in BACKENDS:
+        return BACKENDS[spec]
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown store backend {spec!r}; use one of {sorted(BACKENDS)} or 'module:ClassName'")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def get_store():
+    """Return the current tenant's store, creating it on first use."""
+    root = tenant_root()
+    key = (STORE_BACKEND, root)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = _backend_class(STORE_BACKEND)(root)
+        return _stores[key]
+
+
+def save_candidate_to_file(candidate_data):
+    """Save candidate data to the current tenant's store."""
+    # Generate a UUID for the candidate if not provided
+    if "candidate_id" not in candidate_data:
+        candidate_data["candidate_id"] = str(uuid.uuid4())
+
+    # Add timestamp if not provided
+    if "timestamp" not in candidate_data:
+        candidate_data["timestamp"] = datetime.now(timezone.utc).isoformat()
+
+    # Set default reason if not provided
+    if "reason" not in candidate_data:
+        candidate_data["reason"] = "TESTING"
+
+    # Ensure test_type is provided
+    if "test_type" not in candidate_data:
+        candidate_data["test_type"] = "reasoning"
+
+    get_store().save(candidate_data)
+
+    # A re-saved archived candidate is served from the hot store again
+    try:
+        archive.forget(candidate_data["candidate_id"])
+    except Exception:
+        logger.exception("Failed to drop archived copy", extra={"candidate_id": candidate_data["candidate_id"]})
+
+    # Keep the overwritten evaluation in the version history; like the rollups, a failure must not lose the record
+    try:
+        record_version(candidate_data)
+    except Exception:
+        logger.exception("Failed to record candidate version", extra={"candidate_id": candidate_data["candidate_id"]})
+
+    # Keep the analytics rollups current; a rollup failure must not lose the saved record
+    try:
+        update_rollups(candidate_data)
+    except Exception:
+        logger.exception("Failed to update analytics rollups", extra={"candidate_id": candidate_data["candidate_id"]})
+
+    return candidate_data["candidate_id"]
+
+
+def load_candidate_data(candidate_id):
+    """Load a candidate record, or None if it does not exist."""
+    candidate_data = get_store().load(candidate_id)
+    if candidate_data is None:
+        candidate_data = archive.load(candidate_id)
+    return candidate_data
+
+
+def get_all_candidates():
+    """Get a list of all candidate ids."""
+    ids = get_store().ids()
+    hot = set(ids)
+    return ids + [candidate_id for candidate_id, _ in archive.summaries() if candidate_id not in hot]
+
+
+def iter_candidates():
+    """Yield candidate records one at a time without loading the whole store; archived records come last."""
+    # A record caught in both tiers (archived while being re-saved) is served from the hot store
+    hot = set()
+    for candidate_data in get_store().iter_records():
+        hot.add(candidate_data["candidate_id"])
+        yield candidate_data
+    for candidate_data in archive.iter_records():
+        if candidate_data["candidate_id"] not in hot:
+            yield candidate_data
+
+
+def iter_candidate_summaries():
+    """Yield (candidate_id, timestamp) for every candidate, cheaper than loading the records."""
+    hot = set()
+    for candidate_id, timestamp in get_store().summaries():
+        hot.add(candidate_id)
+        yield candidate_id, timestamp
+    for candidate_id, timestamp in archive.summaries():
+        if candidate_id not in hot:
+            yield candidate_id, timestamp
@@ -0,0 +1,156 @@
+"""Streamed completions and background stages for the UI that survive reruns.
+
+Each streamed completion runs in a background thread that owns the model
+call; the Streamlit script only follows it with st.write_stream. A rerun
+(the user clicks away and back, or submits twice) reattaches to the running
+call and replays the text so far instead of starting a duplicate call.
+
+Results are persisted by an on_complete callback in the thread, so a
+completion finishes and is saved even if no session is still watching.
+Failed or interrupted streams are never persisted. Blocking calls (such as
+the resume agents) run the same way through start_background.
+"""
+import contextvars
+import os
+import threading
+import time
+
+import jobqueue
+from app_logging import get_logger
+from pipeline import is_error_result
+
+# How long a finished stream stays attached to its key, so reruns racing the
+# final save see the result instead of starting the call again
+FINISHED_STREAM_TTL_SECONDS = float(os.environ.get("OMNISIGHT_FINISHED_STREAM_TTL", 120))
+
+logger = get_logger("streaming")
+
+_streams = {}
+_lock = threading.Lock()
+
+
+class CompletionStream:
+    """The text of one streamed completion, shared by every rerun following it."""
+
+    def __init__(self):
+        self.chunks = []
+        # Final result once finished: the persisted value, or an "Error..." string
+        self.result = None
+        self.finished_at = None
+        self._cond = threading.Condition()
+
+    def _append(self, text):
+        with self._cond:
+            self.chunks.append(text)
+            self._cond.notify_all()
+
+    def _finish(self, result):
+        with self._cond:
+            self.result = result
+            self.finished_at = time.monotonic()
+            self._cond.notify_all()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def follow(self):
+        """Yield the text received so far, then new text as it arrives, until the stream finishes."""
+        seen = 0
+        while True:
+            with self._cond:
+                while seen == len(self.chunks) and not self.done:
+                    self._cond.wait()
+                new = self.chunks[seen:]
+                finished = self.done
+            seen += len(new)
+            if new:
+                yield "".join(new)
+            if finished and seen == len(self.chunks):
+                return
+
+    def wait(self, timeout=None):
+        """Block until the stream finishes and return its result."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.done, timeout)
+        return self.result
+
+
+def _run(key, stream, stream_fn, on_complete):
+    result = None
+    try:
+        generator = stream_fn()
+        while True:
+            try:
+                stream._append(next(generator))
+            except StopIteration as stop:
+                result = stop.value
+                break
+        if result and not is_error_result(result) and on_complete is not None:
+            result = on_complete(result)
+    except Exception as e:
+        logger.exception("Streamed completion failed", extra={"key": str(key)})
+        result = f"Error: {e}"
+    finally:
+        stream._finish(result)
+        if not result or is_error_result(result):
+            # Let the next attempt start a fresh call
+            with _lock:
+                if _streams.get(key) is stream:
+                    del _streams[key]
+
+
+def start(key, stream_fn, on_complete=None):
+    """Return the stream running for key, starting stream_fn() in a background thread if there is none.
+
+    stream_fn returns a generator that yields text and returns the full text
+    or an "Error..." string (see pipeline._stream_completion). on_complete is
+    called in the thread with a successful result and returns the value to
+    expose as stream.result.
+    """
+    now = time.monotonic()
+    with _lock:
+        for stale in [k for k, s in _streams.items() if s.done and now - s.finished_at > FINISHED_STREAM_TTL_SECONDS]:
+            del _streams[stale]
+        stream = _streams.get(key)
+        if stream is not None:
+            return stream
+        stream = _streams[key] = CompletionStream()
+    # Run in a copy of the caller's context so the thread sees the same tenant
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(_run, key, stream, stream_fn, on_complete), daemon=True).start()
+    return stream
+
+
+def get(key):
+    """The stream running (or recently finished) for key, or None."""
+    with _lock:
+        return _streams.get(key)
+
+
+def start_background(key, fn, on_complete=None):
+    """Like start, for a blocking fn that returns its result without streaming text."""
+    def run():
+        return fn()
+        yield
+
+    return start(key, run, on_complete)
+
+
+def stream_checkpoint(job_id, stage_key, stream_fn, to_checkpoint=None, on_complete=None):
+    """Start (or rejoin) a streamed job stage whose result is checkpointed once complete.
+
+    to_checkpoint turns the completion text into the stored value; on_complete
+    then runs with the stored value.
+    """
+    def complete(text):
+        result = jobqueue.put_checkpoint(job_id, stage_key, to_checkpoint(text) if to_checkpoint else text)
+        if on_complete is not None:
+            on_complete(result)
+        return result
+
+    def run():
+        jobqueue.set_stage(job_id, stage_key)
+        return (yield from stream_fn())
+
+    return start(("checkpoint", job_id, stage_key), run, complete)
@@ -0,0 +1,75 @@
+"""Storage root and per-tenant namespaces.
+
+All on-disk state lives under OMNISIGHT_DATA_DIR. Each tenant gets its own
+namespace for candidates, rollups and the upload cache; the default tenant
+uses the data root itself, so single-tenant installs keep their layout:
+
+    <data dir>/jobs.sqlite3                      job queue, shared by all tenants
+    <data dir>/candidates/, rollups.sqlite3 ...  default tenant
+    <data dir>/tenants/<tenant>/...              every other tenant
+
+The active tenant is a context variable, set per API request, per UI session
+and per queued job, so every process serving a tenant resolves the same paths.
+"""
+import contextlib
+import contextvars
+import os
+import re
+
+DATA_DIR = os.environ.get("OMNISIGHT_DATA_DIR", ".")
+DEFAULT_TENANT = os.environ.get("OMNISIGHT_TENANT", "default")
+# Header a reverse proxy sets to select the tenant (UI and API)
+TENANT_HEADER = "X-Omnisight-Tenant"
+
+_TENANT_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+_current = contextvars.ContextVar("omnisight_tenant", default=None)
+
+
+def validate_tenant(tenant):
+    """Return the tenant id, or raise ValueError if it is not a safe namespace name."""
+    if not isinstance(tenant, str) or not _TENANT_RE.match(tenant):
+        raise ValueError(f"Invalid tenant id: {tenant!r}")
+    return tenant
+
+
+def current_tenant():
+    return _current.get() or DEFAULT_TENANT
+
+
+def set_tenant(tenant):
+    """Make tenant active for the rest of the current context (e.g. a Streamlit rerun)."""
+    return _current.set(validate_tenant(tenant))
+
+
+@contextlib.contextmanager
+def use_tenant(tenant):
+    """Run a block with tenant active."""
+    token = _current.set(validate_tenant(tenant))
+    try:
+        yield tenant
+    finally:
+        _current.reset(token)
+
+
+def data_path(name):
+    """Resolve a path shared by all tenants; absolute paths are kept as they are."""
+    return os.path.join(DATA_DIR, name)
+
+
+def tenant_root(tenant=None):
+    tenant = tenant or current_tenant()
+    if tenant == DEFAULT_TENANT:
+        return DATA_DIR
+    return os.path.join(DATA_DIR, "tenants", tenant)
+
+
+def tenant_path(name, tenant=None):
+    """Resolve a path inside the tenant's namespace; absolute paths are kept as they are."""
+    return os.path.join(tenant_root(tenant), name)
+
+
+def list_tenants():
+    """Default tenant plus every tenant with a namespace on disk."""
+    tenants_dir = os.path.join(DATA_DIR, "tenants")
+    others = sorted(os.listdir(tenants_dir)) if os.path.isdir(tenants_dir) else []
+    return [DEFAULT_TENANT] + [t for t in others if t != DEFAULT_TENANT and _TENANT_RE.match(t)]
@@ -0,0 +1,41 @@
+import threading
+import time
+
+import pytest
+
+import admission
+import tenancy
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenancy, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(admission, "_local", threading.local())
+
+
+def test_waiting_calls_never_exceed_the_slot_limit(monkeypatch):
+    monkeypatch.setattr(admission, "LLM_CONCURRENCY", 2)
+    monkeypatch.setattr(admission, "INTERACTIVE_RESERVE", 0)
+    lock = threading.Lock()
+    inflight, peak, errors = [0], [0], []
+
+    def call():
+        try:
+            with admission.admit(100):
+                with lock:
+                    inflight[0] += 1
+                    peak[0] = max(peak[0], inflight[0])
+                time.sleep(0.05)
+                with lock:
+                    inflight[0] -= 1
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == [] and peak[0] == 2
+    assert admission.status()["classes"][admission.UPLOAD]["admitted"] == 6
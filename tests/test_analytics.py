@@ -0,0 +1,44 @@
+import json
+import sqlite3
+
+import pytest
+
+import analytics
+import tenancy
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenancy, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(analytics, "_local", analytics.threading.local())
+
+
+def _record(candidate_id, day, score):
+    return {"candidate_id": candidate_id, "timestamp": f"{day}T12:00:00+00:00", "reason": "TESTING",
+            "resume": {"skills": ["python"]},
+            "resume_synthesis": f"FINAL RESUME SCORE: {score}"}
+
+
+def test_score_distribution_respects_since():
+    analytics.update_rollups(_record("old", "2024-01-01", 30))
+    analytics.update_rollups(_record("new", "2024-06-01", 70))
+    everyone = analytics.score_distribution("resume_score")
+    recent = analytics.score_distribution("resume_score", since="2024-03-01")
+    assert sum(everyone["counts"]) == 2
+    assert recent["buckets"] == [70.0] and recent["counts"] == [1]
+
+
+def test_histograms_without_days_are_rebuilt_from_contributions(tmp_path):
+    conn = sqlite3.connect(tmp_path / analytics.ROLLUP_DB_PATH)
+    conn.executescript("""
+        CREATE TABLE contributions (candidate_id TEXT PRIMARY KEY, day TEXT NOT NULL, reason TEXT NOT NULL,
+                                    metrics TEXT NOT NULL);
+        CREATE TABLE histograms (reason TEXT NOT NULL, metric TEXT NOT NULL, bucket REAL NOT NULL,
+                                 count INTEGER NOT NULL, PRIMARY KEY (reason, metric, bucket));
+    """)
+    conn.execute("INSERT INTO contributions VALUES ('c1', '2024-06-01', 'TESTING', ?)",
+                 (json.dumps({"resume_score": 62.0}),))
+    conn.commit()
+    conn.close()
+    assert analytics.score_distribution("resume_score", since="2024-05-01")["counts"] == [1]
+    assert analytics.score_distribution("resume_score", since="2024-07-01")["counts"] == []
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+import archive
+import jobqueue
+import session_cache
+import tenancy
+import upload_cache
+from store import FileCandidateStore, SQLiteCandidateStore, get_store
+
+
+def test_conditional_delete_keeps_a_resaved_record(tmp_path):
+    for backend in (FileCandidateStore, SQLiteCandidateStore):
+        store = backend(str(tmp_path / backend.__name__))
+        store.save({"candidate_id": "c1", "timestamp": "2024-01-01T00:00:00+00:00", "reason": "TESTING"})
+        original = store.load("c1")
+        store.save({**original, "final_evaluation": "re-graded"})
+        resaved = store.load("c1")
+        assert not store.delete_if_unchanged("c1", original)
+        assert store.load("c1") == resaved
+        assert store.delete_if_unchanged("c1", resaved)
+        assert store.load("c1") is None
+        assert not store.delete_if_unchanged("c1", resaved)
+
+
+def test_conditional_save_keeps_a_resaved_record(tmp_path):
+    for backend in (FileCandidateStore, SQLiteCandidateStore):
+        store = backend(str(tmp_path / backend.__name__))
+        store.save({"candidate_id": "c1", "timestamp": "2024-01-01T00:00:00+00:00", "reason": "TESTING"})
+        original = store.load("c1")
+        store.save({**original, "final_evaluation": "re-graded"})
+        resaved = store.load("c1")
+        assert not store.save_if_unchanged({**original, "pii_purged_at": "now"}, original)
+        assert store.load("c1") == resaved
+        assert store.save_if_unchanged({**resaved, "pii_purged_at": "now"}, resaved)
+        assert store.load("c1")["pii_purged_at"] == "now"
+        assert not store.save_if_unchanged({"candidate_id": "c2"}, resaved)
+        assert store.load("c2") is None
+        assert sorted(store.ids()) == ["c1"]
+
+
+def test_record_kept_hot_by_a_resave_is_not_purged(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenancy, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(archive, "PII_RETENTION_DAYS", 30)
+    store = get_store()
+    store.save({"candidate_id": "c1", "timestamp": "2024-01-01T00:00:00+00:00",
+                "resume": {"contact_info": {"name": "Jane Doe"}}})
+    monkeypatch.setattr(store, "delete_if_unchanged", lambda candidate_id, candidate_data: False)
+
+    assert archive.archive_old(now=datetime(2025, 1, 1, tzinfo=timezone.utc)) == 0
+
+    assert archive.summaries() == []
+    assert archive.status()["pii_purged"] == 0
+    assert store.load("c1")["resume"]["contact_info"] == {"name": "Jane Doe"}
+
+
+def test_purge_removes_upload_cache_and_session_copies(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenancy, "DATA_DIR", str(tmp_path))
+    data = b"%PDF resume bytes"
+    upload_hash = upload_cache.content_hash(data)
+    text = "Jane Doe, jane@example.com"
+    job_id = jobqueue.enqueue({"reason": "TESTING"}, status=jobqueue.INTERACTIVE)
+    jobqueue.put_checkpoint(job_id, jobqueue.UPLOAD_HASH_STAGE, upload_hash)
+    jobqueue.put_checkpoint(job_id, "extract", text)
+    jobqueue.put_checkpoint(job_id, "parse", {"contact_info": {"name": "Jane Doe"}})
+    upload_cache.put(upload_cache.text_key(upload_hash, "ocr"), text)
+    upload_cache.put(upload_cache.parse_key(text, "v1"), {"contact_info": {"name": "Jane Doe"}})
+    upload_cache.put(upload_cache.parse_key("someone else", "v1"), {"contact_info": {"name": "Other"}})
+    assert session_cache.checkpoint(job_id, "parse") is not None
+
+    assert jobqueue.purge_candidate_inputs(job_id) == [job_id]
+    session_cache.invalidate_job(job_id)
+
+    assert upload_cache.get(upload_cache.text_key(upload_hash, "ocr")) is None
+    assert upload_cache.get(upload_cache.parse_key(text, "v1")) is None
+    assert upload_cache.get(upload_cache.parse_key("someone else", "v1")) is not None
+    assert session_cache.checkpoint(job_id, "parse") is None
+    assert jobqueue.get_checkpoint(job_id, jobqueue.UPLOAD_HASH_STAGE) is None
+
+
+def test_file_store_summaries_match_the_records(tmp_path):
+    store = FileCandidateStore(str(tmp_path))
+    store.save({"candidate_id": "c1", "timestamp": "2024-01-01T00:00:00+00:00", "resume": {"skills": ["go"]}})
+    # Written before records were canonical
+    with open(tmp_path / "candidates" / "c2.json", "w") as f:
+        f.write('{\n  "resume": {},\n  "timestamp": "2023-05-01T00:00:00",\n  "candidate_id": "c2"\n}')
+    expected = sorted((r["candidate_id"], r.get("timestamp")) for r in store.iter_records())
+    assert sorted(store.summaries()) == expected == [("c1", "2024-01-01T00:00:00+00:00"), ("c2", "2023-05-01T00:00:00")]
@@ -0,0 +1,30 @@
+import pytest
+
+import jobqueue
+import tenancy
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenancy, "DATA_DIR", str(tmp_path))
+
+
+def test_expired_lease_on_last_attempt_fails_the_job():
+    job_id = jobqueue.enqueue({"resume_text": "text"})
+    for attempt in range(1, 3):
+        job = jobqueue.claim(f"w{attempt}", lease_seconds=-1, max_attempts=2)
+        assert job["job_id"] == job_id and job["attempts"] == attempt
+    assert jobqueue.claim("w3", max_attempts=2) is None
+    assert jobqueue.get_job(job_id)["status"] == jobqueue.FAILED
+
+
+def test_worker_that_lost_its_lease_cannot_finish_the_job():
+    job_id = jobqueue.enqueue({"resume_text": "text"})
+    jobqueue.claim("old", lease_seconds=-1)
+    jobqueue.claim("new")
+    assert not jobqueue.complete(job_id, "c1", worker_id="old")
+    assert jobqueue.fail(job_id, "boom", worker_id="old") is None
+    job = jobqueue.get_job(job_id)
+    assert (job["status"], job["lease_owner"]) == (jobqueue.RUNNING, "new")
+    assert jobqueue.complete(job_id, "c1", worker_id="new")
+    assert jobqueue.get_job(job_id)["status"] == jobqueue.COMPLETED
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+import models
+import reevaluate
+import store
+import tenancy
+from pipeline import current_prompt_versions
+
+
+def test_record_with_rescoring_history_encodes(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenancy, "DATA_DIR", str(tmp_path))
+    store.save_candidate_to_file({
+        "candidate_id": "c1",
+        "resume": {"skills": ["python"]},
+        "responses": {"q1": "An answer"},
+        "evaluations": {"q1": "CLARITY: 3/5"},
+        "final_evaluation": "Final",
+        "prompt_versions": {"grade": "old", "combined": "old"},
+    })
+    monkeypatch.setattr(reevaluate, "get_completion_evaluation", lambda answer: "CLARITY: 4/5")
+    monkeypatch.setattr(reevaluate, "generate_combined_evaluation", lambda responses, evaluations: "Re-graded")
+    reevaluate.reevaluate_candidate("c1", ["grade", "combined"], current_prompt_versions())
+
+    record = store.load_candidate_data("c1")
+    assert record["evaluation_history"][0]["outputs"]["evaluations"] == {"q1": "CLARITY: 3/5"}
+    assert json.loads(models.encode_record(record)) == record
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", float("nan"), float("inf"), "1.5"])
+def test_non_integers_are_schema_errors(value):
+    with pytest.raises(models.SchemaError, match=r"education\[0\]\.entity\.tier"):
+        models.decode_resume({"education": [{"entity": {"name": "MIT", "tier": value}}]})
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), -float("inf")])
+def test_non_finite_numbers_are_not_text(value):
+    with pytest.raises(models.SchemaError, match=r"contact_info\.phone"):
+        models.decode_resume({"contact_info": {"name": "Jane Doe", "phone": value}})
@@ -0,0 +1,25 @@
+import pipeline
+
+
+def test_trim_keeps_short_answers_whole():
+    # Two long "words" over budget: nothing to cut between them
+    answer = "x" * 400 + " " + "y" * 400
+    assert pipeline._trim_to_budget(answer, 10) == answer
+    assert pipeline._trim_to_budget("z" * 400, 10) == "z" * 400
+
+
+def test_trim_never_repeats_words():
+    words = [f"w{i}" for i in range(50)]
+    trimmed = pipeline._trim_to_budget(" ".join(words), 5)
+    kept = [word for word in trimmed.split() if word.startswith("w") and word[1:].isdigit()]
+    assert len(kept) == len(set(kept))
+    omitted = int(trimmed.split("[... ")[1].split()[0])
+    assert omitted > 0 and omitted + len(kept) == len(words)
+
+
+def test_context_without_budget_keeps_answers():
+    record = {"responses": {"q1": "word " * 2000}}
+    trimmed = pipeline.build_overall_assessment_context(record, answer_budget=50)
+    untrimmed = pipeline.build_overall_assessment_context(record, answer_budget=None)
+    assert "words omitted" in trimmed and "words omitted" not in untrimmed
+    assert pipeline.estimate_tokens(trimmed) < pipeline.estimate_tokens(untrimmed)
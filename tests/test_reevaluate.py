@@ -0,0 +1,20 @@
+import prescreen
+import reevaluate
+from pipeline import current_prompt_versions
+
+
+def _record(**fields):
+    return {"candidate_id": "c1", "resume": {"skills": ["python"]}, "responses": {"q1": "answer"}, **fields}
+
+
+def test_prescreen_skip_runs_only_reasoning_stages():
+    versions = current_prompt_versions()
+    record = _record(prescreen={"action": prescreen.SKIP, "predicted_score": 20})
+    assert reevaluate.stale_stages(record, versions) == ["grade", "combined"]
+
+    record["prompt_versions"] = {"grade": versions["grade"], "combined": versions["combined"]}
+    assert reevaluate.stale_stages(record, versions) == []
+
+
+def test_unscreened_record_is_fully_stale():
+    assert reevaluate.stale_stages(_record(), current_prompt_versions()) == list(reevaluate.STAGE_FIELDS)
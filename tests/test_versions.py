@@ -0,0 +1,28 @@
+import pytest
+
+import tenancy
+import versions
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tenancy, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(versions, "_local", type(versions._local)())
+
+
+def _chunk_count():
+    return versions._connect().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+
+def test_redact_deletes_chunks_no_version_references():
+    shared = "Shared paragraph. " * 20
+    versions.record_version({"candidate_id": "c1", "resume_text": "Private one. " * 30, "notes": shared})
+    versions.record_version({"candidate_id": "c1", "resume_text": "Private two. " * 30, "notes": shared})
+    versions.record_version({"candidate_id": "c2", "resume_text": shared})
+    assert _chunk_count() == 3
+
+    versions.redact("c1", ["resume_text"])
+
+    assert _chunk_count() == 1
+    assert versions.load_version("c1", 1) == {"candidate_id": "c1", "notes": shared}
+    assert versions.load_version("c2")["resume_text"] == shared
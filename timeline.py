@@ -0,0 +1,343 @@
+"""Resume timelines: date ranges parsed locally, with overlaps, gaps and incoming roles flagged.
+
+The parser copies `dates` and `graduation_date` from the resume as written
+("Jun 2021 - Present", "Summer 2024", "2020-2023", "Expected May 2026").
+Each one is read with python-dateutil to month precision. A bare year or a
+season is kept as the range of months it could mean, and flags are only
+raised when they hold for every reading:
+
+- overlap: two full-time roles at different employers overlap by at least
+  OMNISIGHT_TIMELINE_OVERLAP_MONTHS (2). Internships, part-time and incoming
+  roles never count.
+- gap: at least OMNISIGHT_TIMELINE_GAP_MONTHS (9) without a role or a degree
+  program since the candidate's first graduation (or first full-time role).
+- incoming: a role that has not started.
+- end_before_start: a range that ends before it starts.
+- undated: a role whose dates could not be read (no gaps are flagged then).
+
+Parsed resumes get a `timeline` with the date they were analyzed as of and
+their flags. The primary evaluator and the skeptic get timeline_summary()
+next to the resume instead of working out the dates themselves.
+
+    python timeline.py parse "Jun 2021 - Present" "Summer 2024"
+    python timeline.py show CANDIDATE_ID
+"""
+import argparse
+import json
+import os
+import re
+from datetime import date, datetime
+
+from dateutil import parser as date_parser
+
+OVERLAP_MIN_MONTHS = int(os.environ.get("OMNISIGHT_TIMELINE_OVERLAP_MONTHS", 2))
+GAP_MIN_MONTHS = int(os.environ.get("OMNISIGHT_TIMELINE_GAP_MONTHS", 9))
+
+OVERLAP = "overlap"
+GAP = "gap"
+INCOMING = "incoming"
+END_BEFORE_START = "end_before_start"
+UNDATED = "undated"
+FLAGS = (OVERLAP, GAP, INCOMING, END_BEFORE_START, UNDATED)
+
+# Months a season covers, when a range starts or ends with one
+_SEASONS = {"spring": (1, 5), "summer": (6, 8), "fall": (9, 12), "autumn": (9, 12), "winter": (1, 2)}
+_SEASON = re.compile(r"\b(spring|summer|fall|autumn|winter)\b", re.IGNORECASE)
+_YEAR = re.compile(r"\b(19|20)\d{2}\b")
+_SHORT_YEAR = re.compile(r"['’](\d{2})\b")
+_MONTH_SHORT_YEAR = re.compile(r"^(\d{1,2})\s*/\s*(\d{2})$")
+_PRESENT = re.compile(r"\b(present|current|now|ongoing|today)\b", re.IGNORECASE)
+_INCOMING = re.compile(r"\b(incoming|upcoming|future|starting)\b", re.IGNORECASE)
+# "2020 - 2023", "Jun 2021 – Aug 2021", "2021-Present", "Jun-Aug 2021", "2019 to 2021", "6/21-8/21"
+_SEPARATOR = re.compile(
+    r"\s+(?:-|to|through|until)\s+|\s*[–—]\s*|(?<=\d{4})-(?=\s*[A-Za-z\d]{3})|(?<=[A-Za-z])-(?=[A-Za-z])"
+    r"|(?<=\d)-(?=\d{1,2}/\d)",
+    re.IGNORECASE)
+# "2020-23"
+_YEAR_RANGE = re.compile(r"\b((?:19|20)\d{2})\s*-\s*(\d{2})\b(?!\s*[-/])")
+# Roles that commonly run alongside a full-time role or school
+_PART_TIME = re.compile(
+    r"\b(intern(ship)?|summer|co-?op|part[- ]time|teaching assistant|research assistant|tutor|volunteer"
+    r"|fellow(ship)?|extern(ship)?|freelance|contract(or)?|advis[eo]r|board)\b",
+    re.IGNORECASE)
+_GRADUATE = re.compile(r"\b(master|m\.s\.|ms|mba|ph\.?d|doctor|j\.d\.|m\.d\.)\b", re.IGNORECASE)
+# Assumed program length when only the graduation date is given
+_PROGRAM_MONTHS = {True: 24, False: 48}
+
+
+def _month(year, month):
+    return year * 12 + month - 1
+
+
+def _format_month(index):
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def _format_bound(bound):
+    """A (first, last) month range as written back: "2021", "2021-06" or "2021-06..2021-08"."""
+    first, last = bound
+    if first == last:
+        return _format_month(first)
+    if first % 12 == 0 and last == first + 11:
+        return str(first // 12)
+    return f"{_format_month(first)}..{_format_month(last)}"
+
+
+def _as_of(today):
+    today = today or date.today()
+    return _month(today.year, today.month)
+
+
+def _point(text, months=(1, 12)):
+    """(first, last) month a single date could mean, "present", or None.
+
+    A bare year means any month from months[0] to months[1].
+    """
+    text = text.strip(" ,.;:()[]")
+    if not text:
+        return None
+    if _PRESENT.search(text):
+        return "present"
+    text = _SHORT_YEAR.sub(lambda m: f"20{m.group(1)}", text)
+    short = _MONTH_SHORT_YEAR.match(text)
+    if short:
+        text = f"{short.group(1)}/20{short.group(2)}"
+    year = _YEAR.search(text)
+    if not year:
+        return None
+    season = _SEASON.search(text)
+    if season:
+        first, last = _SEASONS[season.group(1).lower()]
+        return _month(int(year.group(0)), first), _month(int(year.group(0)), last)
+    try:
+        # A bare year reads the default month back, so parse with both ends
+        parsed = date_parser.parse(text, default=datetime(2000, months[0], 1), fuzzy=True)
+        other = date_parser.parse(text, default=datetime(2000, months[1], 1), fuzzy=True)
+    except (ValueError, OverflowError):
+        return None
+    first, last = sorted((_month(parsed.year, parsed.month), _month(other.year, other.month)))
+    return first, last
+
+
+def parse_range(text, today=None):
+    """(start, end, ongoing) for a date range, each bound a (first, last) month index pair, or None."""
+    if not isinstance(text, str) or not text.strip():
+        return None
+    now = _as_of(today)
+    text = _YEAR_RANGE.sub(lambda m: f"{m.group(1)} - {m.group(1)[:2]}{m.group(2)}"
+                           if int(m.group(2)) > 12 else m.group(0), text)
+    parts = [part for part in _SEPARATOR.split(text, maxsplit=1) if part.strip(" ,.;:()[]")]
+    if len(parts) == 1:
+        start = end = _point(parts[0])
+    else:
+        start_text, end_text = parts
+        end = _point(end_text)
+        year = _YEAR.search(end_text)
+        # "Jun - Aug 2021": the start borrows the end's year
+        if year and not _YEAR.search(start_text) and not _PRESENT.search(start_text):
+            start_text = f"{start_text} {year.group(0)}"
+        start = _point(start_text)
+    if start is None or end is None or start == "present":
+        return None
+    ongoing = end == "present"
+    # An ongoing range that starts later (an incoming role) ends where it starts
+    return start, ((max(now, start[0]),) * 2 if ongoing else end), ongoing
+
+
+def _label(*parts):
+    return ", ".join(str(part).strip() for part in parts if isinstance(part, str) and part.strip()) or "Untitled"
+
+
+def _entries(parsed_data, today):
+    """Dated entries per section; undated experience entries have start None."""
+    now = _as_of(today)
+    entries = []
+    for entry in (parsed_data or {}).get("experience") or []:
+        if not isinstance(entry, dict):
+            continue
+        position = str(entry.get("position") or "")
+        parsed = parse_range(entry.get("dates"), today)
+        start, end, ongoing = parsed or (None, None, False)
+        entries.append({
+            "section": "experience",
+            "label": _label(entry.get("company"), position),
+            "company": str(entry.get("company") or "").strip().lower(),
+            "start": start, "end": end, "ongoing": ongoing,
+            "part_time": bool(_PART_TIME.search(position)),
+            "incoming": bool(_INCOMING.search(position) or _INCOMING.search(str(entry.get("dates") or ""))
+                             or (start is not None and start[0] > now)),
+        })
+    for entry in (parsed_data or {}).get("education") or []:
+        if not isinstance(entry, dict):
+            continue
+        parsed = parse_range(entry.get("dates"), today)
+        estimated = ongoing = False
+        if parsed is None:
+            # Graduating "2024" most likely means May or June
+            graduation = _point(str(entry.get("graduation_date") or ""), months=(5, 6))
+            if graduation is None or graduation == "present":
+                continue
+            length = _PROGRAM_MONTHS[bool(_GRADUATE.search(str(entry.get("degree") or "")))]
+            start, end, estimated = (graduation[0] - length, graduation[0] - length), graduation, True
+        else:
+            start, end, ongoing = parsed
+        entries.append({"section": "education", "label": _label(entry.get("institution"), entry.get("degree")),
+                        "start": start, "end": end, "ongoing": ongoing, "estimated": estimated})
+    for entry in (parsed_data or {}).get("extracurriculars") or []:
+        if not isinstance(entry, dict):
+            continue
+        parsed = parse_range(entry.get("dates"), today)
+        if parsed is None:
+            continue
+        start, end, ongoing = parsed
+        entries.append({"section": "extracurriculars", "label": _label(entry.get("organization"), entry.get("role")),
+                        "start": start, "end": end, "ongoing": ongoing})
+    return entries
+
+
+def _overlaps(roles):
+    flags = []
+    for i, first in enumerate(roles):
+        for second in roles[i + 1:]:
+            if first["company"] and first["company"] == second["company"]:
+                continue
+            # Latest possible start to earliest possible end
+            months = min(first["end"][0], second["end"][0]) - max(first["start"][1], second["start"][1]) + 1
+            if months >= OVERLAP_MIN_MONTHS:
+                flags.append({"type": OVERLAP, "detail": f"{first['label']} and {second['label']} overlap by "
+                              f"{months} months"})
+    return flags
+
+
+def _gaps(entries, roles, now):
+    """Stretches without a role or degree program since the first graduation or full-time role."""
+    graduations = [e["end"][1] for e in entries if e["section"] == "education" and e["end"][1] <= now]
+    starts = [role["start"][0] for role in roles]
+    if graduations:
+        anchor = min(graduations) + 1
+    elif starts:
+        anchor = min(starts)
+    else:
+        return []
+    # Widest reading of every range, so a gap holds for any reading of the dates
+    covered = sorted((e["start"][0], e["end"][1]) for e in entries
+                     if e["section"] != "extracurriculars" and not e.get("incoming") and e["start"] is not None)
+    flags = []
+    cursor = anchor
+    for start, end in covered + [(now + 1, now + 1)]:
+        if start - cursor >= GAP_MIN_MONTHS:
+            until = "present" if start > now else _format_month(start - 1)
+            flags.append({"type": GAP, "detail": f"{start - cursor} months without a role or program "
+                          f"({_format_month(cursor)} to {until})"})
+        cursor = max(cursor, end + 1)
+    return flags
+
+
+def analyze(parsed_data, today=None):
+    """{"as_of", "entries", "flags"} for a parsed resume, as of today (a date; default: the current date)."""
+    now = _as_of(today)
+    entries = _entries(parsed_data, today)
+    flags = []
+    for entry in entries:
+        if entry["start"] is None:
+            flags.append({"type": UNDATED, "detail": entry["label"]})
+        elif entry["end"][1] < entry["start"][0]:
+            flags.append({"type": END_BEFORE_START, "detail": entry["label"]})
+        elif entry.get("incoming"):
+            flags.append({"type": INCOMING, "detail": entry["label"]})
+    valid = [e for e in entries if e["start"] is not None and e["end"][1] >= e["start"][0]]
+    full_time = [e for e in valid if e["section"] == "experience" and not e["part_time"] and not e["incoming"]]
+    flags.extend(_overlaps(full_time))
+    if not any(flag["type"] == UNDATED for flag in flags):
+        flags.extend(_gaps(valid, full_time, now))
+    return {"as_of": _format_month(now), "entries": entries, "flags": flags}
+
+
+def _describe(entry):
+    if entry["start"] is None:
+        return f"{entry['label']}: dates not readable"
+    if entry["section"] == "education" and entry.get("estimated"):
+        span = f"graduation {_format_bound(entry['end'])}"
+    else:
+        span = _format_bound(entry["start"])
+        if entry["ongoing"]:
+            span += " to present"
+        elif entry["end"] != entry["start"]:
+            span += f" to {_format_bound(entry['end'])}"
+    notes = [note for note, present in (("incoming", entry.get("incoming")), ("part-time or internship",
+             entry.get("part_time") and not entry.get("incoming"))) if present]
+    return f"{entry['label']}: {span}" + (f" ({', '.join(notes)})" if notes else "")
+
+
+def _annotated_as_of(parsed_data):
+    """The month a parsed resume was analyzed as of at parse time, if annotated."""
+    as_of = ((parsed_data or {}).get("timeline") or {}).get("as_of") if isinstance(parsed_data, dict) else None
+    try:
+        return datetime.strptime(as_of, "%Y-%m").date() if as_of else None
+    except (TypeError, ValueError):
+        return None
+
+
+def timeline_summary(parsed_data, today=None):
+    """Compact timeline for the resume agents: one line per dated section, then the flags.
+
+    It is as of the month the resume was parsed in when it is annotated, else
+    as of today (default: the current date). Re-scoring then sees the same
+    timeline as the first evaluation.
+    """
+    result = analyze(parsed_data, _annotated_as_of(parsed_data) or today)
+    lines = [f"As of {result['as_of']}:"]
+    for section, title in (("experience", "Experience"), ("education", "Education"),
+                           ("extracurriculars", "Extracurriculars")):
+        described = [_describe(entry) for entry in result["entries"] if entry["section"] == section]
+        if described:
+            lines.append(f"- {title}: " + "; ".join(described))
+    flags = [f"{flag['type']}: {flag['detail']}" for flag in result["flags"]]
+    lines.append("- Flags: " + ("; ".join(flags) if flags else "none"))
+    return "\n".join(lines)
+
+
+def timeline_flags(parsed_data, today=None):
+    """Sorted flag types of a parsed resume, as of the same date as timeline_summary."""
+    return sorted({flag["type"] for flag in analyze(parsed_data, _annotated_as_of(parsed_data) or today)["flags"]})
+
+
+def annotate_resume(parsed_data, today=None):
+    """Copy of a parsed resume with a `timeline`: the month it was analyzed as of and its flags."""
+    if not isinstance(parsed_data, dict):
+        return parsed_data
+    result = analyze(parsed_data, today)
+    annotated = dict(parsed_data)
+    annotated["timeline"] = {"as_of": result["as_of"], "flags": sorted({flag["type"] for flag in result["flags"]})}
+    return annotated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume date ranges, overlaps and gaps")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parse_parser = subparsers.add_parser("parse", help="Show how date ranges are read")
+    parse_parser.add_argument("ranges", nargs="+")
+    show_parser = subparsers.add_parser("show", help="A stored candidate's timeline")
+    show_parser.add_argument("candidate_id")
+    show_parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    if args.command == "parse":
+        for text in args.ranges:
+            parsed = parse_range(text)
+            print(json.dumps({"dates": text, "start": parsed and _format_bound(parsed[0]),
+                              "end": parsed and ("present" if parsed[2] else _format_bound(parsed[1]))}))
+        return
+
+    from store import load_candidate_data
+    from tenancy import set_tenant
+    if args.tenant:
+        set_tenant(args.tenant)
+    candidate_data = load_candidate_data(args.candidate_id)
+    if candidate_data is None:
+        raise SystemExit(f"No candidate {args.candidate_id}")
+    print(timeline_summary(candidate_data.get("resume")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Content-addressed cache of extracted resume text and parsed resumes.
+
+Uploads are keyed by the SHA-256 of their bytes and parsed resumes by the
+SHA-256 of the extracted text, so resubmitting an identical file skips both
+extraction and the parsing model call. The cache is a SQLite file shared by
+every session, worker and replica on the host, bounded by total size with
+least-recently-used eviction.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app_logging import get_logger
+from pipeline import is_error_result
+from tenancy import tenant_path
+
+UPLOAD_CACHE_DB_PATH = os.environ.get("OMNISIGHT_UPLOAD_CACHE_DB", "upload_cache.sqlite3")
+UPLOAD_CACHE_MAX_BYTES = int(os.environ.get("OMNISIGHT_UPLOAD_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+logger = get_logger("upload_cache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru_idx ON entries (last_used);
+"""
+
+_local = threading.local()
+
+
+def _connect():
+    """Return this thread's connection to the current tenant's cache database."""
+    path = tenant_path(UPLOAD_CACHE_DB_PATH)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+def content_hash(data):
+    """SHA-256 hex digest of bytes or text."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def get(key):
+    """Return the cached value for key (marking it recently used), or None."""
+    conn = _connect()
+    row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+    conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+    return json.loads(row[0])
+
+
+def put(key, value):
+    """Store a value and evict least-recently-used entries beyond the size bound."""
+    encoded = json.dumps(value)
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, encoded, len(encoded), time.time()),
+        )
+        # Keep the newest entries whose running size fits the bound
+        conn.execute(
+            """DELETE FROM entries WHERE key IN (
+                   SELECT key FROM (
+                       SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running FROM entries
+                   ) WHERE running > ?
+               )""",
+            (UPLOAD_CACHE_MAX_BYTES,),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return value
+
+
+def cached(key, fn):
+    """Return the cached value for key, or run fn and cache its result.
+
+    Failed results (None, empty or "Error..." strings) are returned but not cached.
+    """
+    value = get(key)
+    if value is not None:
+        logger.info("Upload cache hit", extra={"key": key})
+        return value
+    value = fn()
+    if not value or is_error_result(value):
+        return value
+    return put(key, value)
+
+
+def text_key(upload_hash, variant=""):
+    return f"text:{upload_hash}:{variant}"
+
+
+def parse_key(text, parser_version):
+    return f"parse:{content_hash(text)}:{parser_version}"
+
+
+def purge(upload_hash=None, texts=()):
+    """Delete an upload's cached text and the cached parses of it and of texts; returns how many entries."""
+    conn = _connect()
+    texts = list(texts)
+    prefixes = []
+    if upload_hash:
+        prefix = text_key(upload_hash)
+        # Every extraction variant of the upload, and the parses of what it extracted to
+        texts += [json.loads(value) for (value,) in conn.execute(
+            "SELECT value FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))]
+        prefixes.append(prefix)
+    prefixes += [parse_key(text, "") for text in texts if isinstance(text, str)]
+    return sum(conn.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)).rowcount
+               for prefix in prefixes)
+
+
+def cache_stats():
+    row = _connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+    return {"entries": row[0], "bytes": row[1], "max_bytes": UPLOAD_CACHE_MAX_BYTES}
+
+
+def clear():
+    _connect().execute("DELETE FROM entries")
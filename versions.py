@@ -0,0 +1,405 @@
+"""Version history of candidate records, stored as deltas.
+
+Every call to store.save_candidate_to_file records a new version of the
+record in a per-tenant SQLite database. The candidate store keeps serving the
+latest record as before; this module keeps what it overwrites:
+
+- Large strings (agent outputs, evaluations, answers) are split at
+  paragraph breaks into chunks stored once per content hash, zlib-compressed. A record is kept
+  as a skeleton that references those chunks, so text unchanged between
+  versions, or repeated in evaluation_history, is never stored twice.
+- The first version is a snapshot of the skeleton; later versions are a list
+  of changed paths against the previous one. The current skeleton is kept in
+  its own table, so the latest version is one row away.
+- Older versions are rebuilt on demand from the nearest snapshot. compact()
+  turns the head of every chain longer than OMNISIGHT_VERSION_SNAPSHOT_EVERY
+  into a snapshot, which bounds the rebuild cost; re-scoring runs call it at
+  the end.
+
+    python versions.py history CANDIDATE_ID
+    python versions.py show CANDIDATE_ID --version 2
+    python versions.py compact
+    python versions.py backfill     # version 1 for candidates saved before this existed
+    python versions.py stats
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from tenancy import set_tenant, tenant_path
+
+VERSIONS_DB_PATH = os.environ.get("OMNISIGHT_VERSIONS_DB", "versions.sqlite3")
+SNAPSHOT_EVERY = int(os.environ.get("OMNISIGHT_VERSION_SNAPSHOT_EVERY", 10))
+# Strings at least this long are stored as deduplicated chunks
+CHUNK_MIN_CHARS = 256
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+# Split after blank lines so the separators stay with their paragraph
+_PARAGRAPH = re.compile(r"(?<=\n\n)")
+_CHUNKS = "$chunks"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS heads (
+    candidate_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    skeleton TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    candidate_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    body TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (candidate_id, version)
+);
+"""
+
+_local = threading.local()
+
+
+def _connect():
+    """Return this thread's connection to the current tenant's version database."""
+    path = tenant_path(VERSIONS_DB_PATH)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+def _skeleton(conn, value):
+    """The value with every long string replaced by references to stored chunks."""
+    if isinstance(value, dict):
+        return {key: _skeleton(conn, v) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_skeleton(conn, v) for v in value]
+    if isinstance(value, str) and len(value) >= CHUNK_MIN_CHARS:
+        hashes = []
+        for chunk in _chunks(value):
+            data = chunk.encode()
+            digest = hashlib.sha256(data).hexdigest()[:32]
+            conn.execute("INSERT OR IGNORE INTO chunks (hash, data) VALUES (?, ?)", (digest, zlib.compress(data)))
+            hashes.append(digest)
+        return {_CHUNKS: hashes}
+    return value
+
+
+def _chunks(text):
+    """Split text at paragraph breaks into chunks of at least CHUNK_MIN_CHARS (the last may be shorter).
+
+    Boundaries depend only on the text around them, so an edited paragraph
+    changes its own chunk and leaves the others shared with earlier versions.
+    """
+    chunk = ""
+    for paragraph in _PARAGRAPH.split(text):
+        chunk += paragraph
+        if len(chunk) >= CHUNK_MIN_CHARS:
+            yield chunk
+            chunk = ""
+    if chunk:
+        yield chunk
+
+
+def _hydrate(conn, value, cache):
+    if isinstance(value, dict):
+        if _CHUNKS in value and len(value) == 1:
+            parts = []
+            for digest in value[_CHUNKS]:
+                if digest not in cache:
+                    row = conn.execute("SELECT data FROM chunks WHERE hash = ?", (digest,)).fetchone()
+                    cache[digest] = zlib.decompress(row[0]).decode()
+                parts.append(cache[digest])
+            return "".join(parts)
+        return {key: _hydrate(conn, v, cache) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_hydrate(conn, v, cache) for v in value]
+    return value
+
+
+def diff(old, new, path=()):
+    """Changes turning old into new: [path, value] to set a value, [path] to delete a key.
+
+    Dicts are compared key by key; any other changed value (including lists)
+    is replaced whole.
+    """
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append([list(path) + [key]])
+    for key, value in new.items():
+        if key not in old:
+            ops.append([list(path) + [key], value])
+        elif old[key] != value:
+            if isinstance(old[key], dict) and isinstance(value, dict):
+                ops.extend(diff(old[key], value, path + (key,)))
+            else:
+                ops.append([list(path) + [key], value])
+    return ops
+
+
+def patch(document, ops):
+    """Apply diff() output to document in place and return it."""
+    for op in ops:
+        *parents, key = op[0]
+        target = document
+        for parent in parents:
+            target = target[parent]
+        if len(op) == 1:
+            del target[key]
+        else:
+            target[key] = copy.deepcopy(op[1])
+    return document
+
+
+def record_version(candidate_data):
+    """Store the record as the candidate's next version; returns the version number.
+
+    Saving an unchanged record does not create a version.
+    """
+    conn = _connect()
+    candidate_id = candidate_data["candidate_id"]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        skeleton = _skeleton(conn, candidate_data)
+        head = conn.execute("SELECT version, skeleton FROM heads WHERE candidate_id = ?", (candidate_id,)).fetchone()
+        if head is None:
+            version, kind, body = 1, SNAPSHOT, skeleton
+        else:
+            ops = diff(json.loads(head[1]), skeleton)
+            if not ops:
+                conn.execute("COMMIT")
+                return head[0]
+            version, kind, body = head[0] + 1, DELTA, ops
+        conn.execute(
+            "INSERT INTO versions (candidate_id, version, kind, body, saved_at) VALUES (?, ?, ?, ?, ?)",
+            (candidate_id, version, kind, json.dumps(body, separators=(",", ":")), time.time()),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO heads (candidate_id, version, skeleton) VALUES (?, ?, ?)",
+            (candidate_id, version, json.dumps(skeleton, separators=(",", ":"))),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return version
+
+
+def latest_version(candidate_id):
+    """The candidate's current version number, or None if no version was recorded."""
+    row = _connect().execute("SELECT version FROM heads WHERE candidate_id = ?", (candidate_id,)).fetchone()
+    return row[0] if row else None
+
+
+def load_version(candidate_id, version=None):
+    """The record as it was at version (default: latest), or None if there is no such version."""
+    conn = _connect()
+    if version is None:
+        row = conn.execute("SELECT skeleton FROM heads WHERE candidate_id = ?", (candidate_id,)).fetchone()
+        return _hydrate(conn, json.loads(row[0]), {}) if row else None
+
+    snapshot = conn.execute(
+        """SELECT version, body FROM versions WHERE candidate_id = ? AND kind = ? AND version <= ?
+           ORDER BY version DESC LIMIT 1""",
+        (candidate_id, SNAPSHOT, version),
+    ).fetchone()
+    if snapshot is None or latest_version(candidate_id) < version:
+        return None
+    skeleton = json.loads(snapshot[1])
+    for (body,) in conn.execute(
+        "SELECT body FROM versions WHERE candidate_id = ? AND version > ? AND version <= ? ORDER BY version",
+        (candidate_id, snapshot[0], version),
+    ):
+        patch(skeleton, json.loads(body))
+    return _hydrate(conn, skeleton, {})
+
+
+def history(candidate_id):
+    """Every recorded version of a candidate, oldest first, without the record bodies."""
+    rows = _connect().execute(
+        "SELECT version, kind, saved_at, LENGTH(body) FROM versions WHERE candidate_id = ? ORDER BY version",
+        (candidate_id,),
+    ).fetchall()
+    return [{"version": v, "kind": kind, "saved_at": saved_at, "bytes": size} for v, kind, saved_at, size in rows]
+
+
+def compact(snapshot_every=SNAPSHOT_EVERY):
+    """Snapshot the head of every delta chain at least snapshot_every versions long; returns how many."""
+    conn = _connect()
+    rows = conn.execute(
+        """SELECT h.candidate_id, h.version, h.skeleton FROM heads h
+           WHERE h.version - (SELECT MAX(v.version) FROM versions v
+                              WHERE v.candidate_id = h.candidate_id AND v.kind = ?) >= ?""",
+        (SNAPSHOT, snapshot_every),
+    ).fetchall()
+    for candidate_id, version, skeleton in rows:
+        # The head's delta is replaced by the full skeleton; both describe the same version
+        conn.execute(
+            "UPDATE versions SET kind = ?, body = ? WHERE candidate_id = ? AND version = ? AND kind = ?",
+            (SNAPSHOT, skeleton, candidate_id, version, DELTA),
+        )
+    return len(rows)
+
+
+def _remove(document, path):
+    """Delete path from document if present."""
+    *parents, key = path
+    for parent in parents:
+        document = document.get(parent) if isinstance(document, dict) else None
+    if isinstance(document, dict):
+        document.pop(key, None)
+
+
+def _redact_op(op, path):
+    """op with path removed from what it sets, or None if the op only touched path."""
+    op_path = op[0]
+    if op_path[:len(path)] == path:
+        return None
+    if len(op) == 2 and path[:len(op_path)] == op_path:
+        if isinstance(op[1], dict):
+            _remove(op[1], path[len(op_path):])
+    return op
+
+
+def _chunk_refs(value, refs):
+    """Add the chunk hashes referenced anywhere in a skeleton or delta to refs."""
+    if isinstance(value, dict):
+        if _CHUNKS in value and len(value) == 1:
+            refs.update(value[_CHUNKS])
+        else:
+            for v in value.values():
+                _chunk_refs(v, refs)
+    elif isinstance(value, list):
+        for v in value:
+            _chunk_refs(v, refs)
+    return refs
+
+
+def redact(candidate_id, path):
+    """Remove the value at path (a list of keys) from every version of a candidate, e.g. for a PII purge.
+
+    Chunks that held the removed text are deleted too, unless another
+    version still references them.
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            "SELECT version, kind, body FROM versions WHERE candidate_id = ?", (candidate_id,)
+        ).fetchall()
+        before, after = set(), set()
+        for version, kind, body in rows:
+            body = json.loads(body)
+            _chunk_refs(body, before)
+            if kind == SNAPSHOT:
+                _remove(body, path)
+            else:
+                body = [op for op in (_redact_op(op, path) for op in body) if op is not None]
+            _chunk_refs(body, after)
+            conn.execute(
+                "UPDATE versions SET body = ? WHERE candidate_id = ? AND version = ?",
+                (json.dumps(body, separators=(",", ":")), candidate_id, version),
+            )
+        head = conn.execute("SELECT skeleton FROM heads WHERE candidate_id = ?", (candidate_id,)).fetchone()
+        if head is not None:
+            skeleton = json.loads(head[0])
+            _chunk_refs(skeleton, before)
+            _remove(skeleton, path)
+            _chunk_refs(skeleton, after)
+            conn.execute(
+                "UPDATE heads SET skeleton = ? WHERE candidate_id = ?",
+                (json.dumps(skeleton, separators=(",", ":")), candidate_id),
+            )
+        for digest in before - after:
+            # Chunks are shared across candidates; hashes appear verbatim in the JSON rows
+            if conn.execute("SELECT 1 FROM versions WHERE instr(body, ?) LIMIT 1", (digest,)).fetchone():
+                continue
+            if conn.execute("SELECT 1 FROM heads WHERE instr(skeleton, ?) LIMIT 1", (digest,)).fetchone():
+                continue
+            conn.execute("DELETE FROM chunks WHERE hash = ?", (digest,))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def storage_stats():
+    """Bytes stored for version history, and what full JSON copies of every version would take."""
+    conn = _connect()
+    stats = {
+        "candidates": conn.execute("SELECT COUNT(*) FROM heads").fetchone()[0],
+        "versions": conn.execute("SELECT COUNT(*) FROM versions").fetchone()[0],
+        "version_bytes": conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM versions").fetchone()[0],
+        "chunk_bytes": conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM chunks").fetchone()[0],
+    }
+    stats["stored_bytes"] = stats["version_bytes"] + stats["chunk_bytes"]
+    return stats
+
+
+def backfill():
+    """Record a first version for stored candidates that have none; returns how many."""
+    from store import iter_candidates
+
+    count = 0
+    for candidate_data in iter_candidates():
+        if latest_version(candidate_data["candidate_id"]) is None:
+            record_version(candidate_data)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candidate record version history")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    history_parser = subparsers.add_parser("history", help="List a candidate's versions")
+    history_parser.add_argument("candidate_id")
+    show_parser = subparsers.add_parser("show", help="Print a candidate record as of a version")
+    show_parser.add_argument("candidate_id")
+    show_parser.add_argument("--version", type=int, help="Version number (default: latest)")
+    compact_parser = subparsers.add_parser("compact", help="Snapshot long delta chains")
+    compact_parser.add_argument("--snapshot-every", type=int, default=SNAPSHOT_EVERY)
+    subparsers.add_parser("backfill", help="Record version 1 for candidates saved before versioning")
+    subparsers.add_parser("stats", help="Print version storage size")
+    parser.add_argument("--tenant", help="Tenant namespace (default: OMNISIGHT_TENANT)")
+    args = parser.parse_args()
+
+    if args.tenant:
+        set_tenant(args.tenant)
+
+    if args.command == "history":
+        print(json.dumps(history(args.candidate_id), indent=2))
+    elif args.command == "show":
+        candidate_data = load_version(args.candidate_id, args.version)
+        if candidate_data is None:
+            parser.error(f"No such version of candidate {args.candidate_id}")
+        print(json.dumps(candidate_data, indent=2))
+    elif args.command == "compact":
+        print(f"Snapshotted {compact(args.snapshot_every)} delta chains")
+    elif args.command == "backfill":
+        print(f"Recorded {backfill()} candidates")
+    else:
+        print(json.dumps(storage_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()